@@ -0,0 +1,263 @@
+"""백그라운드 알림 엔진
+
+사용자가 등록한 규칙(RSI 과매도, 볼린저 하단 이탈, MACD 교차, 목표가/손절가)을
+주기적으로 평가해 사용자별 outbox(``alert_outbox`` 테이블)에 넣습니다.
+
+- 규칙의 ``symbol`` 이 비어 있으면 그 사용자의 관심 종목 전체에 적용
+- 규칙 수와 상관없이 서로 다른 종목마다 시세 조회(``BarStore.update_many``)와
+  지표 계산(``calculate_indicators_panel``)을 한 번만 하고, 마지막 바가 그대로인
+  종목은 지난 결과를 재사용
+- 규칙은 종류별로 numpy 배열 비교 한 번에 평가
+- 같은 규칙/종목/바는 한 번만 알리고(outbox 의 UNIQUE 키), 마지막 알림 후
+  규칙의 ``cooldown`` 초 안에는 다시 알리지 않음
+
+Streamlit 에 의존하지 않으며 ``start()`` 로 데몬 스레드에서 돌립니다.
+"""
+import threading
+import time
+
+import numpy as np
+
+from indicators import build_panel, calculate_indicators_panel
+from metrics import METRICS
+
+# 평가 주기 (초) - BarStore 갱신 주기와 같음
+ALERT_CHECK_SECONDS = 300
+ALERT_PERIOD = "1y"
+ALERT_LOOKBACK = 250
+
+# {종류: (화면 이름, 기본값)} - 값이 None 인 종류는 기준값을 쓰지 않음
+RULE_KINDS = {
+    "rsi_below": ("RSI 이하", 30.0),
+    "rsi_above": ("RSI 이상", 70.0),
+    "bb_lower_cross": ("볼린저 하단 하향 이탈", None),
+    "bb_upper_cross": ("볼린저 상단 상향 돌파", None),
+    "macd_golden": ("MACD 골든크로스", None),
+    "macd_dead": ("MACD 데드크로스", None),
+    "price_above": ("가격 이상 ($)", None),
+    "price_below": ("가격 이하 ($)", None),
+    "target_gain": ("매수가 대비 수익률 (%)", 10.0),
+    "stop_loss": ("매수가 대비 손실률 (%)", 10.0),
+}
+_KIND_CODES = {kind: code for code, kind in enumerate(RULE_KINDS)}
+# 기준값을 입력받는 종류
+THRESHOLD_KINDS = ("rsi_below", "rsi_above", "price_above", "price_below", "target_gain", "stop_loss")
+
+# 종목별 스냅샷 열 - 마지막 바와 직전 바 값
+SNAPSHOT_FIELDS = ("close", "close_prev", "rsi", "macd_diff", "macd_diff_prev",
+                   "bb_lower", "bb_lower_prev", "bb_upper", "bb_upper_prev")
+_F = {name: i for i, name in enumerate(SNAPSHOT_FIELDS)}
+
+
+def _crossed_below(value, value_prev, line, line_prev):
+    return (value_prev >= line_prev) & (value < line)
+
+
+def _crossed_above(value, value_prev, line, line_prev):
+    return (value_prev <= line_prev) & (value > line)
+
+
+def _conditions(kind, s, value, buy):
+    """종류 하나의 조건 - ``s`` 는 규칙별로 펼친 스냅샷 열 ``{field: 배열}``"""
+    if kind == "rsi_below":
+        return s["rsi"] < value
+    if kind == "rsi_above":
+        return s["rsi"] > value
+    if kind == "bb_lower_cross":
+        return _crossed_below(s["close"], s["close_prev"], s["bb_lower"], s["bb_lower_prev"])
+    if kind == "bb_upper_cross":
+        return _crossed_above(s["close"], s["close_prev"], s["bb_upper"], s["bb_upper_prev"])
+    if kind == "macd_golden":
+        return (s["macd_diff_prev"] <= 0) & (s["macd_diff"] > 0)
+    if kind == "macd_dead":
+        return (s["macd_diff_prev"] >= 0) & (s["macd_diff"] < 0)
+    if kind == "price_above":
+        return s["close"] >= value
+    if kind == "price_below":
+        return s["close"] <= value
+    if kind == "target_gain":
+        return s["close"] >= buy * (1 + value / 100)
+    if kind == "stop_loss":
+        return s["close"] <= buy * (1 - value / 100)
+    raise ValueError(f"알 수 없는 알림 종류: {kind}")
+
+
+def describe(rule):
+    """규칙을 한 줄로 (사이드바 목록용)"""
+    label, _ = RULE_KINDS.get(rule["kind"], (rule["kind"], None))
+    value = f" {rule['value']:g}" if rule.get("value") is not None else ""
+    return f"{rule.get('symbol') or '관심 종목 전체'} · {label}{value}"
+
+
+def _message(kind, symbol, value, buy, row):
+    close, rsi = row[_F["close"]], row[_F["rsi"]]
+    if kind in ("rsi_below", "rsi_above"):
+        detail = f"RSI {rsi:.1f} ({'≤' if kind == 'rsi_below' else '≥'} {value:g})"
+    elif kind in ("target_gain", "stop_loss"):
+        detail = f"매수가 ${buy:,.2f} 대비 {(close / buy - 1) * 100:+.1f}%"
+    elif kind in ("price_above", "price_below"):
+        detail = f"{'≥' if kind == 'price_above' else '≤'} ${value:,.2f}"
+    else:
+        detail = RULE_KINDS[kind][0]
+    return f"{symbol} ${close:,.2f} - {detail}"
+
+
+def expand_rules(rules, watchlists):
+    """규칙을 ``(규칙, 종목)`` 평가 대상으로 펼침 (종목이 빈 규칙은 관심 종목 전체)"""
+    targets = []
+    for rule in rules:
+        if rule["kind"] not in RULE_KINDS:
+            continue
+        symbols = [rule["symbol"]] if rule["symbol"] else watchlists.get(rule["username"], ())
+        targets.extend((rule, symbol) for symbol in symbols)
+    return targets
+
+
+def evaluate(targets, snapshots, buy_prices):
+    """조건을 만족한 ``(규칙, 종목, 메시지, 바 시각)`` 목록
+
+    ``snapshots`` 는 ``{symbol: (바 시각, SNAPSHOT_FIELDS 값 튜플)}``,
+    ``buy_prices`` 는 ``{(username, symbol): 매수가}``
+    """
+    targets = [(rule, symbol) for rule, symbol in targets if symbol in snapshots]
+    if not targets:
+        return []
+    symbols = list(snapshots)
+    position = {symbol: i for i, symbol in enumerate(symbols)}
+    table = np.array([snapshots[s][1] for s in symbols], dtype="float64")
+
+    rows = np.fromiter((position[s] for _, s in targets), dtype=np.intp, count=len(targets))
+    kinds = np.fromiter((_KIND_CODES[r["kind"]] for r, _ in targets), dtype=np.intp, count=len(targets))
+    values = np.array([np.nan if r["value"] is None else r["value"] for r, _ in targets], dtype="float64")
+    buys = np.array([buy_prices.get((r["username"], s), np.nan) for r, s in targets], dtype="float64")
+    # 기준값이 없는 규칙은 종류별 기본값
+    for kind, (_, default) in RULE_KINDS.items():
+        if default is not None:
+            values[(kinds == _KIND_CODES[kind]) & np.isnan(values)] = default
+
+    fired = np.zeros(len(targets), dtype=bool)
+    with np.errstate(invalid="ignore"):
+        for kind, code in _KIND_CODES.items():
+            mask = kinds == code
+            if not mask.any():
+                continue
+            picked = table[rows[mask]]
+            columns = {name: picked[:, i] for name, i in _F.items()}
+            fired[mask] = _conditions(kind, columns, values[mask], buys[mask])
+
+    alerts = []
+    for i in np.flatnonzero(fired):
+        rule, symbol = targets[i]
+        bar_time, row = snapshots[symbol]
+        message = _message(rule["kind"], symbol, values[i], buys[i], row)
+        alerts.append((rule, symbol, message, bar_time))
+    return alerts
+
+
+def snapshot_panel(frames):
+    """``{symbol: OHLCV DataFrame}`` 를 한 번에 계산해 ``{symbol: (바 시각, 값 튜플)}``"""
+    frames = {s: df.iloc[-ALERT_LOOKBACK:] for s, df in frames.items() if not df.empty}
+    symbols, index, panels = build_panel(frames)
+    if not symbols:
+        return {}
+    values = calculate_indicators_panel(panels["Close"], panels["High"], panels["Low"], panels["Volume"])
+    close = panels["Close"]
+    snapshots = {}
+    for row, symbol in enumerate(symbols):
+        valid = np.flatnonzero(np.isfinite(close[row]))
+        if len(valid) == 0:
+            continue
+        last = valid[-1]
+        prev = valid[-2] if len(valid) > 1 else last
+        snapshots[symbol] = (index[last].isoformat(), (
+            close[row, last], close[row, prev],
+            values["RSI"][row, last],
+            values["MACD_diff"][row, last], values["MACD_diff"][row, prev],
+            values["BB_lower"][row, last], values["BB_lower"][row, prev],
+            values["BB_upper"][row, last], values["BB_upper"][row, prev],
+        ))
+    return snapshots
+
+
+class AlertEngine:
+    """전체 사용자의 규칙을 평가해 outbox 에 넣는 백그라운드 작업"""
+
+    def __init__(self, user_store, bar_store, interval=ALERT_CHECK_SECONDS, period=ALERT_PERIOD, clock=time.time):
+        self.user_store = user_store
+        self.bar_store = bar_store
+        self.interval = interval
+        self.period = period
+        self.clock = clock
+        # {symbol: (데이터 버전, 스냅샷)}
+        self._snapshots = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self.stats = {"runs": 0, "rules": 0, "symbols": 0, "computed": 0, "fired": 0,
+                      "queued": 0, "suppressed": 0, "errors": 0}
+
+    @staticmethod
+    def _version(df):
+        return len(df), df.index[-1].value, float(df["Close"].iloc[-1])
+
+    def snapshots(self, symbols):
+        """종목별 스냅샷 - 마지막 바가 바뀐 종목만 다시 계산"""
+        frames = self.bar_store.update_many(list(symbols), "1d", self.period)
+        with self._lock:
+            stale = {
+                symbol: df for symbol, df in frames.items()
+                if not df.empty and self._snapshots.get(symbol, (None,))[0] != self._version(df)
+            }
+        with METRICS.span("alerts.indicators"):
+            computed = snapshot_panel(stale)
+        with self._lock:
+            for symbol, snapshot in computed.items():
+                self._snapshots[symbol] = (self._version(stale[symbol]), snapshot)
+            self.stats["computed"] += len(computed)
+            return {s: self._snapshots[s][1] for s in frames if s in self._snapshots}
+
+    def run_once(self):
+        """규칙 전체를 한 번 평가 - outbox 에 새로 넣은 알림 수 반환"""
+        with METRICS.span("alerts"):
+            rules = self.user_store.alert_rules()
+            targets = expand_rules(rules, self.user_store.watchlists())
+            symbols = list(dict.fromkeys(symbol for _, symbol in targets))
+            snapshots = self.snapshots(symbols) if symbols else {}
+            with METRICS.span("alerts.evaluate"):
+                fired = evaluate(targets, snapshots, self.user_store.buy_prices())
+            queued, suppressed = self.user_store.enqueue_alerts(
+                [(rule["id"], rule["username"], symbol, message, bar_time, rule["cooldown"])
+                 for rule, symbol, message, bar_time in fired],
+                self.clock(),
+            )
+        self.stats["runs"] += 1
+        self.stats["rules"] = len(rules)
+        self.stats["symbols"] = len(symbols)
+        self.stats["fired"] += len(fired)
+        self.stats["queued"] += queued
+        self.stats["suppressed"] += suppressed
+        return queued
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="alert-engine", daemon=True)
+            self._thread.start()
+        return self
+
+    def wake(self):
+        """주기를 기다리지 않고 바로 평가 (규칙이 추가됐을 때)"""
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                self.stats["errors"] += 1
+            self._wake.wait(self.interval)
+            self._wake.clear()
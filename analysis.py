@@ -0,0 +1,154 @@
+"""종목 분석 (기술적 분석 / AI 분석)
+
+AI 분석은 ``LLMScheduler`` 가 속도 제한에 맞춰 백그라운드에서 실행하고,
+생성되는 토큰을 ``AnalysisJob.stream()`` 으로 바로 받아볼 수 있습니다. 완료된 결과는
+요청 내용(모델, 프롬프트) 해시를 키로 TTL/LRU 캐시에 보관하므로 같은
+입력으로 다시 요청하면 LLM 을 호출하지 않습니다.
+
+``client`` 는 Groq 와 같은 ``chat.completions.create(..., stream=True)``
+인터페이스를 가진 객체면 되므로 로컬 가짜 클라이언트로도 동작합니다.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from llm_scheduler import AnalysisJob, LLMScheduler
+from screener import BUY_SIGNAL_THRESHOLD, score_frame
+
+DEFAULT_MODEL = "llama3-8b-8192"
+SYSTEM_PROMPT = "당신은 한국의 투자 전문가입니다."
+
+# 캐시된 AI 분석의 유효 시간(초)과 최대 보관 개수
+ANALYSIS_CACHE_TTL = 6 * 3600
+ANALYSIS_CACHE_SIZE = 512
+AI_WORKERS = 4
+
+
+def perform_technical_analysis(df, symbol):
+    """기본 기술적 분석"""
+    if df.empty:
+        return "데이터가 부족합니다."
+
+    latest = df.iloc[-1]
+    score, signals, _ = score_frame(df)
+    signal_lines = "\n".join(f"- {signal}" for signal in signals) or "- 충족한 조건 없음"
+
+    return f"""
+## {symbol} 기술적 분석
+
+### 현재 지표
+- RSI: {latest.get('RSI', 0):.2f}
+- MACD: {latest.get('MACD', 0):.2f}
+- CCI: {latest.get('CCI', 0):.2f}
+- MFI: {latest.get('MFI', 0):.2f}
+
+### 매수 신호 점수: {score}/5{' (매수 추천)' if score >= BUY_SIGNAL_THRESHOLD else ''}
+{signal_lines}
+
+### 종합 의견
+기술적 지표를 종합한 결과, 현재 {'매수' if latest.get('RSI', 50) < 30 else '매도' if latest.get('RSI', 50) > 70 else '중립'} 신호입니다.
+"""
+
+
+def build_prompt(df, symbol, asset_type="주식"):
+    """AI 분석 프롬프트 - 지표는 소수점 둘째 자리로 반올림되어 들어감"""
+    latest = df.iloc[-1]
+
+    return f"""
+        {symbol} {asset_type} 분석:
+
+        현재가: ${latest['Close']:.2f}
+        RSI: {latest.get('RSI', 0):.2f}
+        MACD: {latest.get('MACD', 0):.2f}
+
+        다음을 한국어로 분석해주세요:
+        1. 현재 기술적 상태
+        2. 단기 전망
+        3. 투자 전략
+        """
+
+
+def build_request(df, symbol, asset_type="주식", model=DEFAULT_MODEL):
+    """chat.completions.create 인자"""
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": build_prompt(df, symbol, asset_type)},
+        ],
+        "temperature": 0.7,
+        "max_tokens": 1000,
+    }
+
+
+def request_key(request):
+    """요청 내용 해시 - 같은 심볼/반올림된 지표/모델이면 같은 키"""
+    payload = json.dumps(request, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class AnalysisCache:
+    """TTL 이 있는 LRU 캐시 (스레드 안전)"""
+
+    def __init__(self, max_entries=ANALYSIS_CACHE_SIZE, ttl=ANALYSIS_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class AIAnalyzer:
+    """LLM 분석 요청을 스케줄러에 넘기고 결과를 캐시"""
+
+    def __init__(self, client, model=DEFAULT_MODEL, max_workers=AI_WORKERS, cache=None, scheduler=None):
+        self.client = client
+        self.model = model
+        self.cache = cache if cache is not None else AnalysisCache()
+        self.scheduler = scheduler if scheduler is not None else (
+            LLMScheduler(client, cache=self.cache, max_workers=max_workers) if client is not None else None
+        )
+
+    def submit(self, df, symbol, asset_type="주식"):
+        """분석 시작 - 캐시에 있으면 완료된 작업을, 진행 중이면 그 작업을 반환"""
+        if self.scheduler is None or df.empty:
+            return AnalysisJob.completed(None, perform_technical_analysis(df, symbol))
+
+        request = build_request(df, symbol, asset_type, self.model)
+        key = request_key(request)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return AnalysisJob.completed(key, cached)
+
+        return self.scheduler.submit(key, request, perform_technical_analysis(df, symbol), symbol)
+
+    def analyze(self, df, symbol, asset_type="주식", timeout=None):
+        """동기 호출 - 완료된 분석 텍스트 반환"""
+        return self.submit(df, symbol, asset_type).result(timeout)
+
+    def metrics(self):
+        """스케줄러 지표 (LLM 을 쓰지 않으면 빈 dict)"""
+        return self.scheduler.metrics() if self.scheduler is not None else {}
@@ -0,0 +1,444 @@
+"""헤드리스 분석 API 와 배치 CLI
+
+Streamlit 스크립트 밖에서 시세 조회 → 지표 계산 → 기술적/AI 분석 → 차트
+파이프라인을 돌립니다. 같은 ``AnalysisService`` 를 로컬 HTTP(JSON) 서비스와
+배치 CLI 가 함께 씁니다.
+
+    python api.py serve --port 8600
+    python api.py analyze AAPL MSFT BTC-USD --period 6mo --format csv -o signals.csv
+
+HTTP 엔드포인트 (GET 은 ``period``, ``interval`` 쿼리 사용)
+
+- ``GET /v1/analysis/{symbol}?ai=1`` - 최신 지표, 매수 신호 점수, 분석 텍스트
+- ``GET /v1/indicators/{symbol}?limit=100`` - 지표 표 (pandas ``split`` 형식)
+- ``GET /v1/chart/{symbol}`` - plotly figure JSON
+- ``POST /v1/batch`` ``{"symbols": [...], "period": "6mo", "ai": false}``
+- ``GET /healthz``, ``GET /metrics`` (Prometheus 텍스트)
+
+응답 본문은 (엔드포인트, 인자, 데이터 버전)을 키로 캐시하므로 새 바가
+들어오기 전까지는 다시 계산하지 않고, 같은 요청이 동시에 들어오면 한 번만
+계산합니다. 요청은 스레드별로 처리하며 ETag 가 같으면 304 를 돌려줍니다.
+AI 분석은 환경 변수 ``GROQ_API_KEY`` 가 있을 때만 사용합니다.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    from groq import Groq
+    GROQ_AVAILABLE = True
+except ImportError:
+    GROQ_AVAILABLE = False
+
+from analysis import AIAnalyzer, AnalysisCache, perform_technical_analysis
+from bar_store import (DEFAULT_INTERVALS, PERIOD_DAYS, BarStore, base_interval, data_version, intervals_for,
+                       slice_period)
+from charts import create_chart
+from indicators import INDICATOR_COLUMNS, IndicatorEngine, calculate_indicators
+from metrics import METRICS
+from screener import BUY_SIGNAL_THRESHOLD, score_frame
+
+API_HOST = "127.0.0.1"
+API_PORT = 8600
+API_PERIOD = "6mo"
+# 응답 캐시 - 키에 데이터 버전이 들어가므로 TTL 은 메모리 회수용
+API_CACHE_SIZE = 1024
+API_CACHE_TTL = 3600
+# 클라이언트/프록시가 재사용해도 되는 시간 (BarStore 갱신 주기 이내)
+API_MAX_AGE = 60
+API_WORKERS = 8
+AI_TIMEOUT = 60
+MAX_BATCH_SYMBOLS = 500
+
+_SYMBOL = re.compile(r"^[A-Z0-9.^=\-]{1,20}$")
+
+
+class ApiError(Exception):
+    """클라이언트에 그대로 돌려줄 오류 (HTTP 상태 코드 포함)"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_value(value):
+    """NaN/inf 는 null, numpy 스칼라는 파이썬 값으로"""
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _dumps(payload):
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class AnalysisService:
+    """시세 → 지표 → 분석/차트 파이프라인과 응답 캐시"""
+
+    def __init__(self, bar_store=None, analyzer=None, engine=None, cache=None, workers=API_WORKERS):
+        self.bar_store = bar_store if bar_store is not None else BarStore()
+        self.analyzer = analyzer if analyzer is not None else AIAnalyzer(None)
+        self.engine = engine if engine is not None else IndicatorEngine()
+        self.cache = cache if cache is not None else AnalysisCache(API_CACHE_SIZE, API_CACHE_TTL)
+        self.cache_stats = METRICS.cache("api")
+        self.workers = workers
+        # 계산 중인 캐시 키별 잠금 - 같은 요청이 동시에 오면 하나만 계산
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+    # 인자 검증
+    @staticmethod
+    def normalize(symbol, period, interval):
+        symbol = AnalysisService.normalize_symbol(symbol)
+        return (symbol,) + AnalysisService.normalize_range(period, interval)
+
+    @staticmethod
+    def normalize_symbol(symbol):
+        symbol = (symbol or "").strip().upper()
+        if not _SYMBOL.match(symbol):
+            raise ApiError(400, f"잘못된 심볼: {symbol!r}")
+        return symbol
+
+    @staticmethod
+    def normalize_range(period, interval):
+        """``(period, interval)`` - 봉이 없으면 기간의 기본 봉"""
+        if period not in PERIOD_DAYS:
+            raise ApiError(400, f"지원하지 않는 기간: {period!r} ({', '.join(PERIOD_DAYS)})")
+        interval = interval or DEFAULT_INTERVALS.get(period, "1d")
+        if interval not in intervals_for(period):
+            raise ApiError(400, f"{period} 기간에 쓸 수 없는 봉: {interval!r} ({', '.join(intervals_for(period))})")
+        return period, interval
+
+    # 파이프라인
+    def indicators(self, symbol, period=API_PERIOD, interval="1d"):
+        """기간 데이터 + 지표 (앱의 ``get_indicator_data`` 와 같은 계산)"""
+        with METRICS.span("data", symbol):
+            df = self.bar_store.get_bars(symbol, period, interval)
+        if df.empty:
+            raise ApiError(404, f"{symbol} 데이터가 없습니다")
+        with METRICS.span("indicators", symbol):
+            history = self.bar_store.history(symbol, interval, period)
+            if history.empty:
+                return calculate_indicators(df)
+            return slice_period(self.engine.update(symbol, interval, history), period, interval)
+
+    def _cached(self, key, build):
+        """응답 본문 캐시 - 없으면 ``build()`` 가 돌려준 ``(본문, 캐시 여부)`` 로 채움"""
+        self.cache_stats.lookup()
+        body = self.cache.get(key)
+        if body is not None:
+            return body
+        with self._inflight_lock:
+            lock = self._inflight.setdefault(key, threading.Lock())
+        with lock:
+            body = self.cache.get(key)
+            if body is None:
+                self.cache_stats.miss(key)
+                body, cacheable = build()
+                if cacheable:
+                    self.cache.put(key, body)
+        with self._inflight_lock:
+            self._inflight.pop(key, None)
+        return body
+
+    def _summary(self, df, symbol, period, interval, ai, asset_type):
+        latest = df.iloc[-1]
+        score, signals, stoch_rsi = score_frame(df)
+        source, text = "technical", perform_technical_analysis(df, symbol)
+        if ai and self.analyzer.scheduler is not None:
+            with METRICS.span("ai", symbol):
+                job = self.analyzer.submit(df, symbol, asset_type)
+                job.result(AI_TIMEOUT)
+            if job.done and job.error is None and job.fallback_reason is None:
+                source, text = "ai", job.text
+            elif not job.done:
+                source = "pending"
+        first_close = df["Close"].iloc[0]
+        indicators = {name: _json_value(latest[name]) for name in INDICATOR_COLUMNS if name in df.columns}
+        indicators["StochRSI"] = _json_value(stoch_rsi)
+        return {
+            "symbol": symbol,
+            "period": period,
+            "interval": interval,
+            "as_of": df.index[-1].isoformat(),
+            "bars": len(df),
+            "close": _json_value(latest["Close"]),
+            "change_pct": _json_value((latest["Close"] / first_close - 1) * 100) if first_close else None,
+            "score": score,
+            "buy_signal": score >= BUY_SIGNAL_THRESHOLD,
+            "signals": signals,
+            "indicators": indicators,
+            "analysis": text,
+            "analysis_source": source,
+        }
+
+    def analysis(self, symbol, period=API_PERIOD, interval=None, ai=False, asset_type="주식"):
+        """분석 결과 JSON 본문 (bytes)"""
+        symbol, period, interval = self.normalize(symbol, period, interval)
+        df = self.indicators(symbol, period, interval)
+
+        def build():
+            summary = self._summary(df, symbol, period, interval, ai, asset_type)
+            # AI 분석이 아직 끝나지 않았으면 캐시하지 않음 (다음 요청에서 완료본을 받도록)
+            return _dumps(summary), summary["analysis_source"] != "pending"
+
+        key = ("analysis", symbol, period, interval, bool(ai), asset_type, data_version(df))
+        with METRICS.span("api.analysis", symbol):
+            return self._cached(key, build)
+
+    def indicator_table(self, symbol, period=API_PERIOD, interval=None, limit=None):
+        """지표 표 JSON 본문 - ``{"columns", "index", "data"}`` (최근 ``limit`` 행)"""
+        symbol, period, interval = self.normalize(symbol, period, interval)
+        df = self.indicators(symbol, period, interval)
+        if limit is not None and limit <= 0:
+            raise ApiError(400, "limit 은 1 이상이어야 합니다")
+
+        def build():
+            table = df.tail(limit) if limit else df
+            return table.to_json(orient="split", date_format="iso").encode(), True
+
+        key = ("indicators", symbol, period, interval, limit, data_version(df))
+        with METRICS.span("api.indicators", symbol):
+            return self._cached(key, build)
+
+    def chart(self, symbol, period=API_PERIOD, interval=None):
+        """plotly figure JSON 본문"""
+        symbol, period, interval = self.normalize(symbol, period, interval)
+        df = self.indicators(symbol, period, interval)
+        key = ("chart", symbol, period, interval, data_version(df))
+        with METRICS.span("api.chart", symbol):
+            return self._cached(key, lambda: (create_chart(df, symbol).to_json().encode(), True))
+
+    def batch(self, symbols, period=API_PERIOD, interval=None, ai=False, asset_type="주식"):
+        """여러 종목 분석 - ``{"results": [...], "errors": {symbol: 메시지}}``
+
+        기준 봉을 ``update_many`` 로 한꺼번에 받아 둔 뒤 종목별 분석을 스레드 풀에서 실행.
+        기간/봉이 잘못되면 전체가 400, 잘못된 심볼은 ``errors`` 에만 넣음
+        """
+        symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+        if not symbols:
+            raise ApiError(400, "symbols 가 비어 있습니다")
+        if len(symbols) > MAX_BATCH_SYMBOLS:
+            raise ApiError(400, f"한 번에 최대 {MAX_BATCH_SYMBOLS}개까지 요청할 수 있습니다")
+        period, interval = self.normalize_range(period, interval)
+
+        errors, valid = {}, []
+        for symbol in symbols:
+            try:
+                valid.append(self.normalize_symbol(symbol))
+            except ApiError as e:
+                errors[symbol] = str(e)
+        if valid:
+            with METRICS.span("api.batch.fetch"):
+                self.bar_store.update_many(valid, base_interval(interval, period), period)
+
+        def run(symbol):
+            try:
+                return symbol, json.loads(self.analysis(symbol, period, interval, ai, asset_type)), None
+            except ApiError as e:
+                return symbol, None, str(e)
+            except Exception as e:
+                return symbol, None, f"{type(e).__name__}: {e}"
+
+        results = []
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(valid)))) as pool:
+            for symbol, result, error in pool.map(run, valid):
+                if error is None:
+                    results.append(result)
+                else:
+                    errors[symbol] = error
+        return {"results": results, "errors": errors}
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """``AnalysisService`` 를 JSON 으로 내보내는 요청 핸들러 (``make_server`` 가 ``service`` 지정)"""
+
+    service = None
+    protocol_version = "HTTP/1.1"
+    server_version = "SmartInvestorAPI/1.0"
+    quiet = False
+
+    def _send(self, status, body, content_type="application/json; charset=utf-8", cache=False):
+        etag = f'"{hashlib.sha1(body).hexdigest()}"' if cache else None
+        if etag is not None and etag in (self.headers.get("If-None-Match") or ""):
+            status, body = 304, b""
+        self.send_response(status)
+        if status != 304:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", f"max-age={API_MAX_AGE}")
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _error(self, status, message):
+        self._send(status, _dumps({"error": message}))
+
+    def _dispatch(self, handler):
+        started = time.perf_counter()
+        try:
+            handler()
+        except ApiError as e:
+            self._error(e.status, str(e))
+        except Exception as e:
+            self._error(500, f"{type(e).__name__}: {e}")
+        finally:
+            METRICS.observe("api.request", time.perf_counter() - started)
+
+    def do_GET(self):
+        self._dispatch(self._get)
+
+    do_HEAD = do_GET
+
+    def do_POST(self):
+        self._dispatch(self._post)
+
+    def _get(self):
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        parts = [p for p in url.path.split("/") if p]
+        period, interval = query.get("period", API_PERIOD), query.get("interval")
+
+        if parts == ["healthz"]:
+            return self._send(200, _dumps({"status": "ok"}))
+        if parts == ["metrics"]:
+            return self._send(200, METRICS.to_prometheus().encode(), "text/plain; version=0.0.4")
+        if len(parts) == 3 and parts[0] == "v1":
+            kind, symbol = parts[1], parts[2]
+            if kind == "analysis":
+                body = self.service.analysis(symbol, period, interval, query.get("ai") in ("1", "true"),
+                                             query.get("asset_type", "주식"))
+            elif kind == "indicators":
+                try:
+                    limit = int(query["limit"]) if "limit" in query else None
+                except ValueError:
+                    raise ApiError(400, "limit 은 정수여야 합니다")
+                body = self.service.indicator_table(symbol, period, interval, limit)
+            elif kind == "chart":
+                body = self.service.chart(symbol, period, interval)
+            else:
+                raise ApiError(404, f"없는 경로: {url.path}")
+            return self._send(200, body, cache=True)
+        raise ApiError(404, f"없는 경로: {url.path}")
+
+    def _post(self):
+        if urlsplit(self.path).path.rstrip("/") != "/v1/batch":
+            raise ApiError(404, f"없는 경로: {self.path}")
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        except ValueError:
+            raise ApiError(400, "본문이 올바른 JSON 이 아닙니다")
+        symbols = request.get("symbols")
+        if not isinstance(symbols, list):
+            raise ApiError(400, "symbols 는 목록이어야 합니다")
+        result = self.service.batch(symbols, request.get("period", API_PERIOD), request.get("interval"),
+                                    bool(request.get("ai")), request.get("asset_type", "주식"))
+        self._send(200, _dumps(result))
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(service, host=API_HOST, port=API_PORT, quiet=False):
+    """요청마다 스레드를 쓰는 HTTP 서버 (``serve_forever()`` 로 시작)"""
+    handler = type("BoundApiHandler", (ApiHandler,), {"service": service, "quiet": quiet})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def make_service(bar_store_dir=None, workers=API_WORKERS):
+    """환경 변수 ``GROQ_API_KEY`` 가 있으면 AI 분석도 쓰는 서비스"""
+    client = None
+    if GROQ_AVAILABLE and os.environ.get("GROQ_API_KEY"):
+        client = Groq(api_key=os.environ["GROQ_API_KEY"])
+    bar_store = BarStore(bar_store_dir) if bar_store_dir else BarStore()
+    return AnalysisService(bar_store, AIAnalyzer(client), workers=workers)
+
+
+CSV_COLUMNS = ["symbol", "as_of", "close", "change_pct", "score", "buy_signal", "signals"]
+
+
+def write_csv(results, out):
+    """분석 결과를 한 종목 한 줄로 (분석 텍스트 제외)"""
+    names = list(dict.fromkeys(name for r in results for name in r["indicators"]))
+    writer = csv.writer(out)
+    writer.writerow(CSV_COLUMNS + names)
+    for r in results:
+        writer.writerow([r[c] if c != "signals" else "; ".join(r[c]) for c in CSV_COLUMNS]
+                        + [r["indicators"].get(name) for name in names])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SmartInvestor 헤드리스 분석 API / 배치 CLI")
+    parser.add_argument("--bar-store", help="바 저장소 디렉터리 (기본: bar_store)")
+    parser.add_argument("--workers", type=int, default=API_WORKERS)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="로컬 HTTP(JSON) 서비스 실행")
+    serve.add_argument("--host", default=API_HOST)
+    serve.add_argument("--port", type=int, default=API_PORT)
+    serve.add_argument("--quiet", action="store_true", help="요청 로그 끄기")
+
+    analyze = commands.add_parser("analyze", help="여러 종목을 한 번에 분석")
+    analyze.add_argument("symbols", nargs="*")
+    analyze.add_argument("--file", help="심볼 목록 파일 (한 줄에 하나, # 주석)")
+    analyze.add_argument("--period", default=API_PERIOD, choices=list(PERIOD_DAYS))
+    analyze.add_argument("--interval")
+    analyze.add_argument("--ai", action="store_true", help="AI 분석 (GROQ_API_KEY 필요)")
+    analyze.add_argument("--format", choices=["json", "csv"], default="json")
+    analyze.add_argument("-o", "--output", help="출력 파일 (기본: 표준 출력)")
+    args = parser.parse_args(argv)
+
+    service = make_service(args.bar_store, args.workers)
+    if args.command == "serve":
+        server = make_server(service, args.host, args.port, args.quiet)
+        print(f"listening on http://{args.host}:{server.server_port}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return 0
+
+    symbols = list(args.symbols)
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            symbols += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    try:
+        result = service.batch(symbols, args.period, args.interval, args.ai)
+    except ApiError as e:
+        parser.error(str(e))
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        if args.format == "csv":
+            write_csv(result["results"], out)
+        else:
+            json.dump(result, out, ensure_ascii=False, indent=2)
+            out.write("\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    for symbol, error in result["errors"].items():
+        print(f"{symbol}: {error}", file=sys.stderr)
+    return 1 if result["errors"] and not result["results"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,31 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import ta
-from datetime import datetime, timedelta
+from datetime import datetime
 from io import BytesIO
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-import os
-import numpy as np
-import json
-import hashlib
-
-try:
-    from groq import Groq
-    GROQ_AVAILABLE = True
-except ImportError:
-    GROQ_AVAILABLE = False
+import importlib.util
+import threading
+import time
+import zipfile
+from market_data import fetch_history
+from bar_store import DEFAULT_INTERVALS, BarStore, data_version, intervals_for, slice_period
+from indicators import IndicatorEngine, calculate_indicators
+from charts import MAX_CHART_POINTS, create_chart, create_correlation_chart, create_treemap
+from user_store import DEFAULT_ADMIN_PORTFOLIOS, UserStore, hash_password
+from analysis import AIAnalyzer, perform_technical_analysis
+from news_store import DEFAULT_FEEDS, SYMBOL_FEED_URL, NewsIndex, NewsIngestor
+from screener import BUY_SIGNAL_THRESHOLD, Screener, load_universe, parse_symbols
+from backtest import (FEE_BPS, SLIPPAGE_BPS, STRATEGIES, STRATEGY_LABELS, SWEEP_GRIDS, Backtester,
+                      ResultCache, param_grid)
+from risk import RISK_PERIOD, ReturnsMatrix, portfolio_risk
+from metrics import METRICS
+from symbol_master import Instrument, SymbolMaster
+from heatmap import ASSET_TYPE_LABELS, HEATMAP_BUCKET_SECONDS, HORIZONS, MarketHeatmap, heatmap_bucket
+from alerts import ALERT_CHECK_SECONDS, RULE_KINDS, THRESHOLD_KINDS, AlertEngine, describe
+from quotes import QUOTE_POLL_INTERVAL, QUOTE_REFRESH_SECONDS, QuoteBus, QuotePoller, SimulatedFeed
+from shared_cache import PYARROW_AVAILABLE, SHARED_CACHE_BYTES, SHARED_CACHE_DIR, SharedFrameCache, cache_key
+
+# reportlab(PDF 리포트)과 groq(AI 분석)는 쓰는 곳에서 처음 불러옴 - 설치 여부만 먼저 확인
+GROQ_AVAILABLE = importlib.util.find_spec("groq") is not None
 
 # 페이지 설정
 st.set_page_config(
@@ -29,6 +35,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# 이번 실행의 단계별 시간 측정 시작 (끝까지 실행되면 맨 아래에서 닫음)
+trace = METRICS.begin_trace()
+
 # 모던 UI CSS
 st.markdown("""
 <style>
@@ -78,38 +87,13 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# 사용자 데이터 파일
-USER_DATA_FILE = "user_data.json"
-ADMIN_USERNAME = "admin"
-
-# 비밀번호 해시
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
-
-# 사용자 데이터 로드
-def load_user_data():
-    if os.path.exists(USER_DATA_FILE):
-        with open(USER_DATA_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    else:
-        return {
-            ADMIN_USERNAME: {
-                "password": hash_password("admin123"),
-                "is_admin": True,
-                "created_at": datetime.now().isoformat(),
-                "portfolios": {
-                    "stocks": ["AAPL", "GOOGL", "MSFT"],
-                    "crypto": ["BTC-USD", "ETH-USD"],
-                    "etf": ["SPY", "QQQ"]
-                },
-                "portfolio": {}
-            }
-        }
-
-# 사용자 데이터 저장
-def save_user_data(data):
-    with open(USER_DATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+# 사용자 저장소 (모든 세션이 공유)
+@st.cache_resource
+def get_user_store():
+    store = UserStore()
+    # 처음 실행 시 user_data.json / users.csv 가져오기
+    store.migrate()
+    return store
 
 # 세션 초기화
 if 'authenticated' not in st.session_state:
@@ -118,8 +102,6 @@ if 'username' not in st.session_state:
     st.session_state.username = None
 if 'is_admin' not in st.session_state:
     st.session_state.is_admin = False
-if 'user_data' not in st.session_state:
-    st.session_state.user_data = load_user_data()
 if 'stock_list' not in st.session_state:
     st.session_state.stock_list = []
 if 'crypto_list' not in st.session_state:
@@ -128,13 +110,13 @@ if 'etf_list' not in st.session_state:
     st.session_state.etf_list = []
 if 'portfolio' not in st.session_state:
     st.session_state.portfolio = {}
+if 'show_heatmap' not in st.session_state:
+    st.session_state.show_heatmap = False
 if 'analysis_results' not in st.session_state:
     st.session_state.analysis_results = {}
 
-# Groq 클라이언트
-groq_client = None
-if GROQ_AVAILABLE and st.secrets.get("GROQ_API_KEY"):
-    groq_client = Groq(api_key=st.secrets["GROQ_API_KEY"])
+# 자산 유형 → 저장소의 관심 종목 분류
+ASSET_KEYS = {"주식": "stocks", "암호화폐": "crypto", "ETF": "etf"}
 
 # 추천 목록
 TRENDING_CRYPTOS = {
@@ -146,25 +128,25 @@ TRENDING_CRYPTOS = {
 
 # 로그인 함수
 def login(username, password):
-    user_data = st.session_state.user_data
-    if username in user_data and user_data[username]["password"] == hash_password(password):
+    user = get_user_store().authenticate(username, password)
+    if user is not None:
         st.session_state.authenticated = True
         st.session_state.username = username
-        st.session_state.is_admin = user_data[username].get("is_admin", False)
+        st.session_state.is_admin = user.get("is_admin", False)
         
-        # 포트폴리오 로드
-        user_portfolio = user_data[username].get("portfolios", {})
+        # 포트폴리오 로드 (세션에는 로그인한 사용자 데이터만 보관)
+        user_portfolio = user.get("portfolios", {})
         st.session_state.stock_list = user_portfolio.get("stocks", [])
         st.session_state.crypto_list = user_portfolio.get("crypto", [])
         st.session_state.etf_list = user_portfolio.get("etf", [])
-        st.session_state.portfolio = user_data[username].get("portfolio", {})
+        st.session_state.portfolio = user.get("portfolio", {})
+        st.session_state.show_heatmap = user.get("show_heatmap", False)
         
         return True
     return False
 
 # 로그아웃
 def logout():
-    save_current_user_data()
     st.session_state.authenticated = False
     st.session_state.username = None
     st.session_state.is_admin = False
@@ -172,243 +154,333 @@ def logout():
     st.session_state.crypto_list = []
     st.session_state.etf_list = []
     st.session_state.portfolio = {}
-
-# 현재 사용자 데이터 저장
-def save_current_user_data():
-    if st.session_state.authenticated and st.session_state.username:
-        username = st.session_state.username
-        st.session_state.user_data[username]["portfolios"] = {
-            "stocks": st.session_state.stock_list,
-            "crypto": st.session_state.crypto_list,
-            "etf": st.session_state.etf_list
-        }
-        st.session_state.user_data[username]["portfolio"] = st.session_state.portfolio
-        save_user_data(st.session_state.user_data)
+    st.session_state.show_heatmap = False
 
 # 데이터 함수들
+@st.cache_resource
+def get_bar_store():
+    """프로세스 전체가 공유하는 로컬 바 저장소"""
+    store = BarStore()
+    METRICS.register_cache("bar_store", store.cache_stats)
+    return store
+
+@st.cache_resource
+def get_frame_cache():
+    """워커 프로세스들이 공유 메모리로 같이 쓰는 시세/지표 프레임 캐시 (pyarrow 가 없으면 None)"""
+    if not PYARROW_AVAILABLE:
+        return None
+    cache = SharedFrameCache(st.secrets.get("SHARED_CACHE_DIR", SHARED_CACHE_DIR),
+                             st.secrets.get("SHARED_CACHE_BYTES", SHARED_CACHE_BYTES))
+    METRICS.register_cache("frames", cache.cache_stats)
+    return cache
+
+def fetch_stock_data(symbol, period, interval):
+    METRICS.cache("stock_data").miss((symbol, period, interval))
+    return get_bar_store().get_bars(symbol, period, interval)
+
 @st.cache_data(ttl=300)
-def get_stock_data(symbol, period="1mo"):
-    try:
-        stock = yf.Ticker(symbol)
-        df = stock.history(period=period)
-        info = stock.info
-        return df, info
-    except:
-        return pd.DataFrame(), {}
-
-@st.cache_data(ttl=600)
-def get_stock_news(symbol):
-    try:
-        ticker = yf.Ticker(symbol)
-        news = ticker.news
-        return news[:5] if news else []
-    except:
-        return []
-
-def calculate_indicators(df):
-    if df.empty or len(df) < 20:
-        return df
-    
-    try:
-        # RSI
-        df['RSI'] = ta.momentum.RSIIndicator(df['Close'], window=14).rsi()
-        
-        # MACD
-        if len(df) >= 26:
-            macd_indicator = ta.trend.MACD(df['Close'], window_slow=26, window_fast=12, window_sign=9)
-            df['MACD'] = macd_indicator.macd()
-            df['MACD_signal'] = macd_indicator.macd_signal()
-            df['MACD_diff'] = macd_indicator.macd_diff()
-            
-            df['MACD'] = df['MACD'].bfill()
-            df['MACD_signal'] = df['MACD_signal'].bfill()
-            df['MACD_diff'] = df['MACD_diff'].fillna(0)
-        
-        # 기타 지표
-        df['CCI'] = ta.trend.CCIIndicator(df['High'], df['Low'], df['Close']).cci()
-        df['MFI'] = ta.volume.MFIIndicator(df['High'], df['Low'], df['Close'], df['Volume']).money_flow_index()
-        
-        # Stochastic
-        stoch = ta.momentum.StochasticOscillator(df['High'], df['Low'], df['Close'])
-        df['Stoch_K'] = stoch.stoch()
-        df['Stoch_D'] = stoch.stoch_signal()
-        
-        # ATR
-        df['ATR'] = ta.volatility.average_true_range(df['High'], df['Low'], df['Close'])
-        
-        # 이동평균
-        df['SMA_20'] = ta.trend.sma_indicator(df['Close'], window=20)
-        if len(df) >= 50:
-            df['SMA_50'] = ta.trend.sma_indicator(df['Close'], window=50)
-        
-        # 볼린저 밴드
-        bollinger = ta.volatility.BollingerBands(df['Close'])
-        df['BB_upper'] = bollinger.bollinger_hband()
-        df['BB_middle'] = bollinger.bollinger_mavg()
-        df['BB_lower'] = bollinger.bollinger_lband()
-        
-        return df
-    except Exception as e:
-        st.error(f"지표 계산 오류: {str(e)}")
+def load_stock_data(symbol, period, interval):
+    return fetch_stock_data(symbol, period, interval)
+
+def get_stock_data(symbol, period="1mo", interval="1d"):
+    """기간 시세 - 공유 캐시에서는 복사 없는 읽기 전용 프레임"""
+    METRICS.cache("stock_data").lookup()
+    cache = get_frame_cache()
+    if cache is None:
+        return load_stock_data(symbol, period, interval)
+    return cache.get_or_load(cache_key("bars", symbol, period, interval),
+                             lambda: fetch_stock_data(symbol, period, interval))
+
+@st.cache_resource
+def get_indicator_engine():
+    """심볼별 지표 상태를 세션 간에 공유하는 증분 계산 엔진"""
+    return IndicatorEngine()
+
+def compute_indicator_data(symbol, period, interval, df):
+    history = get_bar_store().history(symbol, interval, period)
+    if history.empty:
+        return calculate_indicators(df)
+    return slice_period(get_indicator_engine().update(symbol, interval, history), period, interval)
+
+def get_indicator_data(symbol, period="1mo", interval="1d"):
+    """기간 데이터 + 지표 - 저장된 (리샘플링한) 전체 이력에 인터벌별로 증분 계산한 뒤 기간만큼 잘라냄
+
+    공유 캐시가 있으면 결과를 데이터 버전별로 저장해 다른 워커도 다시 계산하지 않음
+    """
+    with METRICS.span("data", symbol):
+        df = get_stock_data(symbol, period, interval)
+    if df.empty:
         return df
+    with METRICS.span("indicators", symbol):
+        cache = get_frame_cache()
+        if cache is None:
+            return compute_indicator_data(symbol, period, interval, df)
+        return cache.get_or_load(cache_key("indicators", symbol, period, interval, data_version(df)),
+                                 lambda: compute_indicator_data(symbol, period, interval, df))
 
-def create_chart(df, symbol):
-    """차트 생성"""
-    fig = make_subplots(
-        rows=5, cols=1,
-        shared_xaxes=True,
-        vertical_spacing=0.03,
-        row_heights=[0.5, 0.15, 0.15, 0.1, 0.1],
-        subplot_titles=("Price", "RSI", "MACD", "Stochastic", "MFI")
-    )
-    
-    # 캔들스틱
-    fig.add_trace(
-        go.Candlestick(
-            x=df.index,
-            open=df['Open'],
-            high=df['High'],
-            low=df['Low'],
-            close=df['Close'],
-            name='Price'
-        ),
-        row=1, col=1
-    )
-    
-    # 볼린저 밴드
-    if 'BB_upper' in df.columns:
-        fig.add_trace(
-            go.Scatter(x=df.index, y=df['BB_upper'], name='BB Upper', 
-                      line=dict(color='rgba(255,255,255,0.2)', dash='dash')),
-            row=1, col=1
-        )
-        fig.add_trace(
-            go.Scatter(x=df.index, y=df['BB_lower'], name='BB Lower',
-                      line=dict(color='rgba(255,255,255,0.2)', dash='dash'),
-                      fill='tonexty', fillcolor='rgba(255,255,255,0.05)'),
-            row=1, col=1
-        )
-    
-    # 이동평균
-    if 'SMA_20' in df.columns:
-        fig.add_trace(
-            go.Scatter(x=df.index, y=df['SMA_20'], name='MA20', 
-                      line=dict(color='orange', width=2)),
-            row=1, col=1
-        )
-    
-    # RSI
-    if 'RSI' in df.columns:
-        fig.add_trace(
-            go.Scatter(x=df.index, y=df['RSI'], name='RSI', 
-                      line=dict(color='purple', width=2)),
-            row=2, col=1
-        )
-        fig.add_hline(y=70, line_dash="dash", line_color="red", row=2, col=1)
-        fig.add_hline(y=30, line_dash="dash", line_color="green", row=2, col=1)
-    
-    # MACD
-    if 'MACD' in df.columns and not df['MACD'].isna().all():
-        fig.add_trace(
-            go.Scatter(x=df.index, y=df['MACD'], name='MACD', 
-                      line=dict(color='blue', width=2)),
-            row=3, col=1
-        )
-        if 'MACD_signal' in df.columns:
-            fig.add_trace(
-                go.Scatter(x=df.index, y=df['MACD_signal'], name='Signal', 
-                          line=dict(color='red', width=2)),
-                row=3, col=1
-            )
-    
-    # Stochastic
-    if 'Stoch_K' in df.columns:
-        fig.add_trace(
-            go.Scatter(x=df.index, y=df['Stoch_K'], name='%K', 
-                      line=dict(color='blue', width=2)),
-            row=4, col=1
-        )
-        if 'Stoch_D' in df.columns:
-            fig.add_trace(
-                go.Scatter(x=df.index, y=df['Stoch_D'], name='%D', 
-                          line=dict(color='red', width=2)),
-                row=4, col=1
-            )
-    
-    # MFI
-    if 'MFI' in df.columns:
-        fig.add_trace(
-            go.Scatter(x=df.index, y=df['MFI'], name='MFI', 
-                      line=dict(color='green', width=2)),
-            row=5, col=1
-        )
-    
-    fig.update_layout(
-        title=f"{symbol} Technical Analysis",
-        height=900,
-        showlegend=True,
-        hovermode='x unified',
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)'
+@st.cache_resource
+def get_symbol_master():
+    """심볼 검색/검증용 로컬 종목 마스터 (세션 간 공유)"""
+    return SymbolMaster()
+
+def validate_symbol(symbol, asset_type):
+    """종목 마스터에 없는 심볼만 온라인으로 확인 - 확인되면 마스터에 추가"""
+    master = get_symbol_master()
+    if symbol in master:
+        return True
+    if fetch_history(symbol, "5d").empty:
+        return False
+    master.add(Instrument(symbol, asset_type=asset_type))
+    return True
+
+@st.cache_resource
+def get_quote_poller():
+    """모든 세션이 공유하는 시세 폴러 (secrets 의 QUOTE_FEED = "simulated" 면 모의 시세)"""
+    feed = SimulatedFeed() if st.secrets.get("QUOTE_FEED") == "simulated" else None
+    return QuotePoller(QuoteBus(), feed, st.secrets.get("QUOTE_POLL_INTERVAL", QUOTE_POLL_INTERVAL)).start()
+
+def subscribe_quotes(symbols):
+    """이 세션의 시세 구독 (관심 종목이 바뀌면 구독 종목만 교체)"""
+    poller = get_quote_poller()
+    subscription = st.session_state.get("quote_subscription")
+    if subscription is None:
+        subscription = st.session_state.quote_subscription = poller.bus.subscribe(symbols)
+    elif subscription.symbols != set(symbols):
+        subscription.update(symbols)
+    # 아무 세션도 아직 받지 않은 종목만 바로 조회 (첫 화면이 비지 않도록)
+    missing = poller.bus.missing(symbols)
+    if missing:
+        poller.poll(missing)
+    return subscription
+
+@st.cache_resource
+def get_news_ingestor():
+    """관심 종목 뉴스를 백그라운드에서 수집하는 서비스 (프로세스당 하나)"""
+    store = get_user_store()
+    index = NewsIndex()
+    METRICS.register_cache("news", index.cache_stats)
+    ingestor = NewsIngestor(
+        index,
+        feeds=st.secrets.get("NEWS_FEEDS", DEFAULT_FEEDS),
+        symbol_feed_url=st.secrets.get("NEWS_SYMBOL_FEED_URL", SYMBOL_FEED_URL),
+        symbols=lambda: store.watched_symbols().keys(),
     )
-    
-    return fig
+    ingestor.start()
+    return ingestor
 
-def perform_ai_analysis(df, symbol, info, asset_type="주식"):
-    """AI 분석"""
-    if not groq_client:
-        return perform_technical_analysis(df, symbol)
-    
-    try:
-        latest = df.iloc[-1]
-        
-        prompt = f"""
-        {symbol} {asset_type} 분석:
-        
-        현재가: ${latest['Close']:.2f}
-        RSI: {latest.get('RSI', 0):.2f}
-        MACD: {latest.get('MACD', 0):.2f}
-        
-        다음을 한국어로 분석해주세요:
-        1. 현재 기술적 상태
-        2. 단기 전망
-        3. 투자 전략
-        """
-        
-        completion = groq_client.chat.completions.create(
-            model="llama3-8b-8192",
-            messages=[
-                {"role": "system", "content": "당신은 한국의 투자 전문가입니다."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=1000
-        )
-        
-        return completion.choices[0].message.content
-        
-    except:
-        return perform_technical_analysis(df, symbol)
+def get_stock_news(symbol):
+    """로컬 뉴스 인덱스에서 최근 기사 조회 (처음 보는 종목은 바로 수집 요청)"""
+    ingestor = get_news_ingestor()
+    news = ingestor.index.latest(symbol, 5)
+    if not news:
+        ingestor.request(symbol)
+    return news
 
-def perform_technical_analysis(df, symbol):
-    """기본 기술적 분석"""
-    if df.empty:
-        return "데이터가 부족합니다."
-    
-    latest = df.iloc[-1]
-    
-    return f"""
-## {symbol} 기술적 분석
+@st.cache_data(ttl=300)
+def get_report_artifacts(symbols):
+    """리포트용 종목별 지표/차트 산출물 (symbols 는 정렬된 튜플, 모든 리포트가 공유)"""
+    from reports import REPORT_PERIOD, collect_artifacts
+    return collect_artifacts(symbols, lambda symbol: get_indicator_data(symbol, REPORT_PERIOD))
+
+def build_all_reports():
+    """전체 사용자 리포트를 프로세스 풀로 만들어 ZIP 으로 묶음"""
+    from reports import generate_reports
+    store = get_user_store()
+    users = {username: store.get_user(username) for username in store.usernames()}
+    symbols = set(store.watched_symbols())
+    for user in users.values():
+        symbols.update(user["portfolio"])
+    reports = generate_reports(users, get_report_artifacts(tuple(sorted(symbols))))
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for username, pdf in reports.items():
+            archive.writestr(f"{username}.pdf", pdf)
+    buffer.seek(0)
+    return buffer
+
+@st.cache_resource
+def get_screener():
+    """종목별 점수를 마지막 바 기준으로 캐시하는 공유 스크리너"""
+    return Screener(get_bar_store())
+
+@st.cache_data(ttl=300)
+def run_screen(symbols):
+    """스크리너 결과 표 (symbols 는 튜플, 5분 동안은 같은 목록이면 재사용)"""
+    return get_screener().scan(symbols)
+
+# 백테스트에 쓰는 일봉 이력 길이
+BACKTEST_PERIOD = "5y"
+
+@st.cache_resource
+def get_backtest_cache():
+    """같은 데이터/파라미터 백테스트 결과를 세션 간에 공유"""
+    return ResultCache()
+
+def get_backtester(symbol, fee_bps, slippage_bps):
+    history = get_bar_store().update(symbol, "1d", BACKTEST_PERIOD)
+    if history.empty:
+        return None
+    return Backtester({symbol: history}, "1d", fee_bps, slippage_bps, cache=get_backtest_cache())
+
+@st.cache_resource
+def get_returns_matrix():
+    """보유 종목 위험 계산용 수익률 행렬 (세션 간 공유, 새 바만 추가 계산)"""
+    return ReturnsMatrix()
+
+@st.cache_data(ttl=300)
+def get_portfolio_risk(holdings):
+    """보유 종목 손익/위험 (holdings 는 (symbol, shares, buy_price) 튜플)"""
+    matrix = get_returns_matrix()
+    matrix.update(get_bar_store().update_many([symbol for symbol, _, _ in holdings], "1d", RISK_PERIOD))
+    return portfolio_risk({symbol: {"shares": shares, "buy_price": buy_price}
+                           for symbol, shares, buy_price in holdings}, matrix)
+
+@st.cache_resource
+def get_market_heatmap():
+    """히트맵용 수익률 행렬과 종목 마스터 (세션 간 공유, 새 바만 추가 계산)"""
+    return MarketHeatmap(get_bar_store(), get_symbol_master())
+
+@st.cache_data(ttl=HEATMAP_BUCKET_SECONDS * 2)
+def get_heatmap_tiles(symbols, bucket):
+    """(종목 묶음, 시간 구간)별 히트맵 타일 - 같은 구간에서는 모든 세션이 공유"""
+    with METRICS.span("heatmap"):
+        return get_market_heatmap().tiles(list(symbols))
 
-### 현재 지표
-- RSI: {latest.get('RSI', 0):.2f}
-- MACD: {latest.get('MACD', 0):.2f}
-- CCI: {latest.get('CCI', 0):.2f}
-- MFI: {latest.get('MFI', 0):.2f}
+@st.cache_resource(max_entries=32)
+def get_heatmap_chart(symbols, bucket, horizon, weights=None):
+    """트리맵 figure (``weights`` 는 보유 종목 평가금액처럼 타일 크기를 바꿀 때)"""
+    tiles = get_heatmap_tiles(symbols, bucket)
+    if weights is not None:
+        tiles = tiles.assign(weight=tiles["symbol"].map(dict(weights)).fillna(0.0))
+        tiles = tiles[tiles["weight"] > 0]
+    return create_treemap(tiles, horizon, ASSET_TYPE_LABELS), len(tiles)
 
-### 종합 의견
-기술적 지표를 종합한 결과, 현재 {'매수' if latest.get('RSI', 50) < 30 else '매도' if latest.get('RSI', 50) > 70 else '중립'} 신호입니다.
-"""
+@st.cache_data(ttl=HEATMAP_BUCKET_SECONDS * 2)
+def get_correlation(symbols, bucket):
+    return get_market_heatmap().correlation(list(symbols))
+
+@st.cache_resource(max_entries=64)
+def build_chart(symbol, period, interval, version, _df):
+    METRICS.cache("chart").miss((symbol, period, interval, version))
+    return create_chart(_df, symbol)
+
+def get_chart(symbol, period, interval, version, df):
+    """(심볼, 기간, 인터벌, 데이터 버전)별 차트 - 데이터가 그대로면 다시 그리지 않음"""
+    METRICS.cache("chart").lookup()
+    return build_chart(symbol, period, interval, version, df)
+
+@st.cache_resource
+def get_ai_analyzer():
+    """모든 세션이 공유하는 AI 분석 스케줄러(중복 제거, 속도 제한)와 결과 캐시"""
+    client = None
+    if GROQ_AVAILABLE and st.secrets.get("GROQ_API_KEY"):
+        from groq import Groq
+        client = Groq(api_key=st.secrets["GROQ_API_KEY"])
+    return AIAnalyzer(client)
+
+def perform_ai_analysis(df, symbol, asset_type="주식"):
+    """AI 분석 시작 - 백그라운드에서 생성되며 반환된 작업으로 스트리밍"""
+    return get_ai_analyzer().submit(df, symbol, asset_type)
+
+# 배포 후 첫 세션이 빈 캐시로 시작하지 않도록 미리 채울 인기 종목 (secrets 의 PREWARM_SYMBOLS 로 변경)
+DEFAULT_DASHBOARD_SYMBOLS = tuple(sorted({s for symbols in DEFAULT_ADMIN_PORTFOLIOS.values() for s in symbols}))
+PREWARM_SYMBOLS = list(dict.fromkeys(
+    list(DEFAULT_DASHBOARD_SYMBOLS) + [c for cryptos in TRENDING_CRYPTOS.values() for c in cryptos]
+))
+PREWARM_PERIOD = "1y"
+
+@st.cache_resource(show_spinner=False)
+def prewarm_caches(symbols):
+    """인기 종목의 저장소/시세/지표 캐시 채우기 - 프로세스당 한 번, 백그라운드 스레드에서 실행
+
+    안에서 부르는 캐시 함수는 중첩 호출로 처리되어 세션 없이도 스피너 없이 실행됩니다.
+    """
+    started = time.perf_counter()
+    get_bar_store().update_many(symbols, "1d", PREWARM_PERIOD)
+    get_quote_poller().poll(DEFAULT_DASHBOARD_SYMBOLS)
+    for symbol in symbols:
+        get_indicator_data(symbol, "1mo")
+    return {"symbols": len(symbols), "seconds": time.perf_counter() - started}
+
+@st.cache_resource
+def start_prewarm():
+    """첫 화면을 막지 않도록 미리 채우기를 별도 스레드로 시작"""
+    symbols = tuple(st.secrets.get("PREWARM_SYMBOLS", PREWARM_SYMBOLS))
+    thread = threading.Thread(target=prewarm_caches, args=(symbols,), name="cache-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+start_prewarm()
+
+@st.cache_resource
+def start_metrics_exporter():
+    """지표를 주기적으로 metrics.prom / metrics.json 파일로 내보냄 (secrets 의 METRICS_DIR, 없으면 끔)"""
+    directory = st.secrets.get("METRICS_DIR")
+    return METRICS.start_exporter(directory) if directory else None
+
+start_metrics_exporter()
+
+@st.cache_resource
+def get_alert_engine():
+    """전체 사용자의 알림 규칙을 주기적으로 평가하는 백그라운드 엔진 (프로세스당 하나)"""
+    interval = st.secrets.get("ALERT_CHECK_SECONDS", ALERT_CHECK_SECONDS)
+    return AlertEngine(get_user_store(), get_bar_store(), interval=interval).start()
+
+get_alert_engine()
+
+@st.fragment(run_every=QUOTE_REFRESH_SECONDS)
+def show_quote_cards(symbols):
+    """대시보드 자산 카드 - 공유 폴러가 발행한 최신 시세로 전체 앱을 다시 실행하지 않고 갱신"""
+    with METRICS.span("quotes"):
+        quotes = subscribe_quotes(symbols).quotes()
+    cols = st.columns(3)
+    for i, symbol in enumerate(symbols):
+        with cols[i % 3]:
+            quote = quotes.get(symbol)
+            if quote is not None:
+                current = quote.price
+                
+                # 아이콘
+                if symbol in st.session_state.crypto_list:
+                    icon = "🪙"
+                elif symbol in st.session_state.etf_list:
+                    icon = "📦"
+                else:
+                    icon = "📈"
+                
+                st.metric(
+                    label=f"{icon} {symbol}",
+                    value=f"${current:.2f}" if current > 1 else f"${current:.6f}",
+                    delta=f"{quote.change_pct:.2f}%"
+                )
+
+def show_metrics():
+    """관리자용 단계별 시간/캐시 지표"""
+    snapshot = METRICS.snapshot()
+    if snapshot["stages"]:
+        stages = pd.DataFrame.from_dict(snapshot["stages"], orient="index")
+        st.dataframe((stages[["p50", "p95", "p99", "max"]] * 1000).round(1).assign(count=stages["count"]),
+                     use_container_width=True)
+    if snapshot["symbols"]:
+        symbols = pd.DataFrame(snapshot["symbols"])
+        ms = ["p50", "p95", "p99", "max"]
+        symbols[ms] = (symbols[ms] * 1000).round(1)
+        st.dataframe(symbols.sort_values("p95", ascending=False), hide_index=True, use_container_width=True)
+    if snapshot["caches"]:
+        st.dataframe(pd.DataFrame.from_dict(snapshot["caches"], orient="index").round({"hit_rate": 3}),
+                     use_container_width=True)
+    last = st.session_state.get("last_trace")
+    if last is not None:
+        st.caption(f"직전 실행 {last.seconds * 1000:.0f} ms")
+        st.dataframe(pd.DataFrame([
+            {"단계": stage, "심볼": symbol, "시작(ms)": round(offset * 1000, 1), "시간(ms)": round(seconds * 1000, 1)}
+            for stage, symbol, offset, seconds in last.spans
+        ]), hide_index=True, use_container_width=True)
+    col_1, col_2 = st.columns(2)
+    col_1.download_button("JSON", METRICS.to_json(), file_name="metrics.json", mime="application/json",
+                          use_container_width=True)
+    col_2.download_button("Prometheus", METRICS.to_prometheus(), file_name="metrics.prom", mime="text/plain",
+                          use_container_width=True)
 
 # 로그인 페이지
 if not st.session_state.authenticated:
@@ -436,15 +508,7 @@ if not st.session_state.authenticated:
             
             if register_button:
                 if username and password:
-                    if username not in st.session_state.user_data:
-                        st.session_state.user_data[username] = {
-                            "password": hash_password(password),
-                            "is_admin": False,
-                            "created_at": datetime.now().isoformat(),
-                            "portfolios": {"stocks": [], "crypto": [], "etf": []},
-                            "portfolio": {}
-                        }
-                        save_user_data(st.session_state.user_data)
+                    if get_user_store().create_user(username, hash_password(password)):
                         st.success("회원가입 완료!")
                     else:
                         st.error("이미 존재하는 사용자명")
@@ -469,30 +533,48 @@ else:
     with st.sidebar:
         st.header("📊 포트폴리오 관리")
         
+        if st.toggle("🗺️ 히트맵 보기", value=st.session_state.show_heatmap) != st.session_state.show_heatmap:
+            st.session_state.show_heatmap = not st.session_state.show_heatmap
+            get_user_store().set_show_heatmap(st.session_state.username, st.session_state.show_heatmap)
+            st.rerun()
+        
         # 자산 추가
         with st.expander("➕ 자산 추가", expanded=True):
             asset_type = st.selectbox("자산 유형", ["주식", "암호화폐", "ETF"])
             
-            symbol_input = st.text_input("심볼", placeholder="예: AAPL")
+            symbol_input = st.text_input("심볼 또는 종목명", placeholder="예: AAPL, 애플, 비트코인")
+            
+            # 로컬 종목 마스터에서 자동완성 (목록에 없는 입력은 마지막 항목으로 두고 추가할 때 온라인 확인)
+            master = get_symbol_master()
+            master.refresh()
+            candidates = []
+            if symbol_input:
+                typed = symbol_input.strip().upper()
+                if asset_type == "암호화폐" and not typed.endswith("-USD"):
+                    typed += "-USD"
+                candidates = master.search(symbol_input, ASSET_KEYS[asset_type])
+                if typed not in master and typed.isascii() and " " not in typed:
+                    candidates.append(typed)
+            selected = st.selectbox(
+                "검색 결과",
+                candidates,
+                format_func=lambda c: c.label if isinstance(c, Instrument) else f"{c} (목록에 없음 - 온라인 확인)",
+            ) if candidates else None
             
             if st.button("추가", use_container_width=True):
-                if symbol_input:
-                    symbol = symbol_input.upper()
-                    if asset_type == "암호화폐" and not symbol.endswith("-USD"):
-                        symbol += "-USD"
+                if selected is not None:
+                    symbol = selected.symbol if isinstance(selected, Instrument) else selected
                     
                     target_list = (st.session_state.stock_list if asset_type == "주식" 
                                   else st.session_state.crypto_list if asset_type == "암호화폐"
                                   else st.session_state.etf_list)
                     
                     if symbol not in target_list:
-                        try:
-                            test_df = yf.Ticker(symbol).history(period="1d")
-                            if not test_df.empty:
-                                target_list.append(symbol)
-                                save_current_user_data()
-                                st.success(f"✅ {symbol} 추가됨!")
-                        except:
+                        if validate_symbol(symbol, ASSET_KEYS[asset_type]):
+                            target_list.append(symbol)
+                            get_user_store().add_symbol(st.session_state.username, ASSET_KEYS[asset_type], symbol)
+                            st.success(f"✅ {symbol} 추가됨!")
+                        else:
                             st.error("유효하지 않은 심볼")
             
             # 트렌딩 (암호화폐)
@@ -506,7 +588,7 @@ else:
                             if st.button(crypto.split('-')[0], key=f"add_{crypto}"):
                                 if crypto not in st.session_state.crypto_list:
                                     st.session_state.crypto_list.append(crypto)
-                                    save_current_user_data()
+                                    get_user_store().add_symbol(st.session_state.username, "crypto", crypto)
                                     st.success(f"✅ {crypto}")
         
         # 포트폴리오 관리
@@ -528,50 +610,269 @@ else:
                             "shares": shares,
                             "buy_price": buy_price
                         }
-                        save_current_user_data()
+                        get_user_store().set_holding(st.session_state.username, selected_asset, shares, buy_price)
                         st.success("저장됨!")
+        
+        # 알림 (outbox 의 미확인 알림 + 규칙 관리)
+        pending = get_user_store().pending_alerts(st.session_state.username)
+        seen = st.session_state.setdefault("seen_alerts", set())
+        for alert in pending:
+            if alert["id"] not in seen:
+                seen.add(alert["id"])
+                st.toast(alert["message"], icon="🔔")
+        with st.expander(f"🔔 알림 ({len(pending)})" if pending else "🔔 알림"):
+            for alert in pending:
+                st.caption(f"{alert['bar_time'][:10]} · {alert['message']}")
+            if pending and st.button("모두 읽음", use_container_width=True):
+                get_user_store().mark_alerts_delivered(st.session_state.username)
+                st.rerun()
+            
+            st.markdown("**규칙 추가**")
+            rule_kind = st.selectbox("조건", list(RULE_KINDS), format_func=lambda k: RULE_KINDS[k][0])
+            all_assets = st.session_state.stock_list + st.session_state.crypto_list + st.session_state.etf_list
+            rule_symbol = st.selectbox("대상", [None] + all_assets, format_func=lambda s: s or "관심 종목 전체")
+            rule_value = None
+            if rule_kind in THRESHOLD_KINDS:
+                rule_value = st.number_input("기준값", min_value=0.0, value=RULE_KINDS[rule_kind][1] or 0.0, step=1.0)
+            cooldown = st.selectbox("재알림 간격", [3600, 86400, 604800], index=1,
+                                    format_func=lambda s: {3600: "1시간", 86400: "1일", 604800: "1주"}[s])
+            if st.button("규칙 추가", use_container_width=True):
+                get_user_store().add_alert_rule(st.session_state.username, rule_kind, rule_value, rule_symbol, cooldown)
+                get_alert_engine().wake()
+                st.success("추가됨!")
+            
+            for rule in get_user_store().alert_rules(st.session_state.username):
+                col_1, col_2 = st.columns([4, 1])
+                col_1.caption(describe(rule))
+                if col_2.button("✕", key=f"del_alert_{rule['id']}"):
+                    get_user_store().remove_alert_rule(st.session_state.username, rule["id"])
+                    st.rerun()
+        
+        # PDF 리포트
+        with st.expander("📄 리포트"):
+            if st.button("PDF 리포트 만들기", use_container_width=True):
+                from reports import build_report
+                symbols = set(st.session_state.stock_list + st.session_state.crypto_list
+                              + st.session_state.etf_list) | set(st.session_state.portfolio)
+                # 완료된 AI 분석이 있으면 기본 기술적 분석 대신 사용
+                analyses = {symbol: job.text for symbol, job in st.session_state.analysis_results.items()
+                            if job.done and job.error is None and job.fallback_reason is None}
+                st.session_state.report_pdf = build_report(
+                    st.session_state.username,
+                    {"stocks": st.session_state.stock_list, "crypto": st.session_state.crypto_list,
+                     "etf": st.session_state.etf_list},
+                    st.session_state.portfolio,
+                    get_report_artifacts(tuple(sorted(symbols))),
+                    analyses=analyses,
+                )
+            if st.session_state.get("report_pdf") is not None:
+                st.download_button(
+                    "⬇️ 다운로드",
+                    data=st.session_state.report_pdf,
+                    file_name=f"smartinvestor_{st.session_state.username}_{datetime.now():%Y%m%d}.pdf",
+                    mime="application/pdf",
+                    use_container_width=True,
+                )
+            if st.session_state.is_admin:
+                if st.button("전체 사용자 리포트 (ZIP)", use_container_width=True):
+                    with st.spinner("리포트 생성 중..."):
+                        st.session_state.all_reports_zip = build_all_reports()
+                if st.session_state.get("all_reports_zip") is not None:
+                    st.download_button(
+                        "⬇️ ZIP 다운로드",
+                        data=st.session_state.all_reports_zip,
+                        file_name=f"smartinvestor_reports_{datetime.now():%Y%m%d}.zip",
+                        mime="application/zip",
+                        use_container_width=True,
+                    )
+        
+        # AI 요청 현황 (관리자)
+        if st.session_state.is_admin:
+            with st.expander("🤖 AI 요청 현황"):
+                ai_metrics = get_ai_analyzer().metrics()
+                if ai_metrics:
+                    col_1, col_2 = st.columns(2)
+                    col_1.metric("대기열", ai_metrics["queue_depth"])
+                    col_2.metric("대기 p95", f"{ai_metrics['wait_p95']:.1f}초")
+                    st.json(ai_metrics)
+                else:
+                    st.info("GROQ_API_KEY 가 없어 기본 기술적 분석을 사용합니다.")
+            with st.expander("⏱️ 성능 지표"):
+                st.caption("단계별 시간 (ms), 종목별 시간, 캐시 적중률")
+                show_metrics()
+                st.caption("알림 엔진")
+                st.json(get_alert_engine().stats)
     
     # 메인 컨텐츠
     all_assets = st.session_state.stock_list + st.session_state.crypto_list + st.session_state.etf_list
     
     if all_assets:
         # 탭
-        tab_titles = ["📊 대시보드"] + [f"📈 {asset}" for asset in all_assets]
-        tabs = st.tabs(tab_titles)
+        fixed_tabs = ["📊 대시보드", "🔎 스크리너"] + (["🗺️ 히트맵"] if st.session_state.show_heatmap else [])
+        tab_titles = fixed_tabs + [f"📈 {asset}" for asset in all_assets]
+        # 선택된 탭의 본문만 실행하고 나머지는 열릴 때 로드
+        tabs = st.tabs(tab_titles, key="main_tabs", on_change="rerun")
         
         # 대시보드
-        with tabs[0]:
-            st.header("포트폴리오 대시보드")
-            
-            # 자산 카드
-            cols = st.columns(3)
-            for i, symbol in enumerate(all_assets):
-                with cols[i % 3]:
-                    df, info = get_stock_data(symbol, "5d")
-                    if not df.empty:
-                        current = df['Close'].iloc[-1]
-                        prev = df['Close'].iloc[-2] if len(df) > 1 else current
-                        change = ((current - prev) / prev) * 100
-                        
-                        # 아이콘
-                        if symbol in st.session_state.crypto_list:
-                            icon = "🪙"
-                        elif symbol in st.session_state.etf_list:
-                            icon = "📦"
-                        else:
-                            icon = "📈"
-                        
-                        st.metric(
-                            label=f"{icon} {symbol}",
-                            value=f"${current:.2f}" if current > 1 else f"${current:.6f}",
-                            delta=f"{change:.2f}%"
+        if tabs[0].open:
+            with tabs[0]:
+                st.header("포트폴리오 대시보드")
+                
+                # 자산 카드 (이 부분만 주기적으로 다시 그림)
+                show_quote_cards(all_assets)
+                
+                # 포트폴리오 손익/위험
+                if st.session_state.portfolio:
+                    st.subheader("💼 포트폴리오 위험")
+                    risk = get_portfolio_risk(tuple(sorted(
+                        (symbol, holding["shares"], holding["buy_price"])
+                        for symbol, holding in st.session_state.portfolio.items()
+                    )))
+                    if risk is None:
+                        st.info("보유 종목 시세를 불러오지 못했습니다.")
+                    else:
+                        summary = risk.summary
+                        col1, col2, col3, col4 = st.columns(4)
+                        col1.metric("평가금액", f"${summary['value']:,.2f}",
+                                    delta=f"{summary['day_pnl']:+,.2f} (오늘)")
+                        col2.metric("평가손익", f"${summary['pnl']:,.2f}", delta=f"{summary['pnl_pct']:+.2%}")
+                        col3.metric(f"1일 VaR {summary['confidence']:.0%}",
+                                    f"${summary['historical_var'] * summary['value']:,.0f}",
+                                    delta=f"CVaR ${summary['historical_cvar'] * summary['value']:,.0f}",
+                                    delta_color="off")
+                        col4.metric("최대 낙폭", f"{summary['max_drawdown']:.1%}",
+                                    delta=f"현재 {summary['current_drawdown']:.1%}", delta_color="off")
+                        st.caption(
+                            f"최근 {summary['observations']}거래일, 현재 비중 기준 · 연 변동성 {summary['volatility']:.1%}"
+                            f" · 정규분포 가정 VaR {summary['parametric_var']:.2%} / CVaR {summary['parametric_cvar']:.2%}"
                         )
+                        st.dataframe(
+                            risk.positions,
+                            use_container_width=True,
+                            column_config={
+                                "shares": st.column_config.NumberColumn("수량", format="%.2f"),
+                                "buy_price": st.column_config.NumberColumn("매수가", format="$%.2f"),
+                                "price": st.column_config.NumberColumn("현재가", format="$%.2f"),
+                                "value": st.column_config.NumberColumn("평가금액", format="$%.2f"),
+                                "cost": st.column_config.NumberColumn("매수금액", format="$%.2f"),
+                                "pnl": st.column_config.NumberColumn("손익", format="$%.2f"),
+                                "pnl_pct": st.column_config.NumberColumn("수익률", format="percent"),
+                                "day_pnl": st.column_config.NumberColumn("오늘 손익", format="$%.2f"),
+                                "weight": st.column_config.ProgressColumn("비중", min_value=0, max_value=1,
+                                                                          format="percent"),
+                                "volatility": st.column_config.NumberColumn("연 변동성", format="percent"),
+                                "risk_contribution": st.column_config.NumberColumn("위험 기여도", format="percent"),
+                            },
+                        )
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            st.markdown("**상관 행렬**")
+                            st.plotly_chart(create_correlation_chart(risk.correlation), use_container_width=True)
+                        with col2:
+                            st.markdown("**낙폭**")
+                            st.area_chart(risk.drawdown)
+        
+        # 스크리너
+        if tabs[1].open:
+            with tabs[1]:
+                st.header("매수 신호 스크리너")
+                st.caption(f"RSI · MACD · CCI · MFI · StochRSI 5개 조건 중 {BUY_SIGNAL_THRESHOLD}개 이상이면 매수 추천")
+                
+                col1, col2 = st.columns([2, 1])
+                with col1:
+                    universe = st.selectbox("종목 묶음", ["S&P 500", "트렌딩 암호화폐", "내 관심 종목", "직접 입력"])
+                with col2:
+                    min_score = st.slider("최소 점수", 0, 5, BUY_SIGNAL_THRESHOLD)
+                
+                if universe == "S&P 500":
+                    universe_symbols = load_universe("sp500")
+                elif universe == "트렌딩 암호화폐":
+                    universe_symbols = [c for cryptos in TRENDING_CRYPTOS.values() for c in cryptos]
+                elif universe == "내 관심 종목":
+                    universe_symbols = all_assets
+                else:
+                    universe_symbols = parse_symbols(st.text_area("심볼 (쉼표 또는 공백으로 구분)", placeholder="AAPL, MSFT, BTC-USD"))
+                
+                if st.button("🔎 스캔", disabled=not universe_symbols):
+                    with st.spinner(f"{len(universe_symbols)}개 종목 스캔 중..."):
+                        st.session_state.screen_result = (universe, run_screen(tuple(universe_symbols)))
+                
+                if st.session_state.get("screen_result") and st.session_state.screen_result[0] == universe:
+                    table = st.session_state.screen_result[1]
+                    shown = table[table["Score"] >= min_score]
+                    st.write(f"{len(table)}개 종목 중 {len(shown)}개")
+                    st.dataframe(
+                        shown,
+                        hide_index=True,
+                        use_container_width=True,
+                        column_config={
+                            "Score": st.column_config.ProgressColumn("점수", min_value=0, max_value=5, format="%d"),
+                            "Close": st.column_config.NumberColumn("종가", format="%.2f"),
+                            "RSI": st.column_config.NumberColumn(format="%.1f"),
+                            "MACD_diff": st.column_config.NumberColumn("MACD-Signal", format="%.3f"),
+                            "CCI": st.column_config.NumberColumn(format="%.1f"),
+                            "MFI": st.column_config.NumberColumn(format="%.1f"),
+                            "StochRSI": st.column_config.NumberColumn(format="%.2f"),
+                            "Signals": "충족 조건",
+                            "Date": st.column_config.DateColumn("기준일"),
+                        },
+                    )
+        
+        # 히트맵
+        if st.session_state.show_heatmap and tabs[2].open:
+            with tabs[2]:
+                st.header("시장 히트맵")
+                
+                col1, col2 = st.columns([2, 3])
+                with col1:
+                    heatmap_universe = st.selectbox("종목 묶음", ["S&P 500", "내 관심 종목", "내 보유 종목", "트렌딩 암호화폐"],
+                                                    key="heatmap_universe")
+                with col2:
+                    horizon = st.radio("기간", list(HORIZONS), horizontal=True, key="heatmap_horizon")
+                
+                if heatmap_universe == "S&P 500":
+                    heatmap_symbols = load_universe("sp500")
+                elif heatmap_universe == "내 관심 종목":
+                    heatmap_symbols = all_assets
+                elif heatmap_universe == "내 보유 종목":
+                    heatmap_symbols = sorted(st.session_state.portfolio)
+                else:
+                    heatmap_symbols = [c for cryptos in TRENDING_CRYPTOS.values() for c in cryptos]
+                
+                # 구간 번호가 캐시 키 - 같은 구간의 모든 세션이 같은 타일/figure 를 씀
+                bucket = heatmap_bucket()
+                weights = None
+                if heatmap_universe == "내 보유 종목" and heatmap_symbols:
+                    # 보유 종목은 평가금액 크기로
+                    tiles = get_heatmap_tiles(tuple(heatmap_symbols), bucket)
+                    prices = dict(zip(tiles["symbol"], tiles["price"]))
+                    weights = tuple((symbol, holding["shares"] * prices.get(symbol, 0.0))
+                                    for symbol, holding in sorted(st.session_state.portfolio.items()))
+                
+                if not heatmap_symbols:
+                    st.info("표시할 종목이 없습니다.")
+                else:
+                    with st.spinner("히트맵 계산 중..."):
+                        fig, count = get_heatmap_chart(tuple(heatmap_symbols), bucket, horizon, weights)
+                    with METRICS.span("heatmap.render"):
+                        st.plotly_chart(fig, use_container_width=True)
+                    st.caption(f"{count}개 종목 · 색: {horizon} 수익률 · 크기: {'평가금액' if weights else '최근 평균 거래대금'}"
+                               f" · {HEATMAP_BUCKET_SECONDS // 60}분마다 갱신")
+                
+                if len(all_assets) >= 2:
+                    st.subheader("관심 종목 상관 행렬")
+                    correlation = get_correlation(tuple(all_assets), bucket)
+                    if correlation is not None:
+                        st.plotly_chart(create_correlation_chart(correlation), use_container_width=True)
         
         # 개별 자산 탭
-        for idx, symbol in enumerate(all_assets):
-            with tabs[idx + 1]:
+        for symbol, tab in zip(all_assets, tabs[len(fixed_tabs):]):
+            if not tab.open:
+                continue
+            
+            with tab:
                 # 헤더
-                col1, col2 = st.columns([3, 1])
+                col1, col2, col3 = st.columns([3, 1, 1])
                 with col1:
                     st.header(f"{symbol}")
                 with col2:
@@ -581,13 +882,20 @@ else:
                         index=2,
                         key=f"period_{symbol}"
                     )
+                with col3:
+                    # 장중 봉은 가장 촘촘한 봉 하나만 받아 리샘플링하므로 전환해도 다시 조회하지 않음
+                    intervals = intervals_for(period)
+                    interval = st.selectbox(
+                        "봉",
+                        intervals,
+                        index=intervals.index(DEFAULT_INTERVALS.get(period, "1d")),
+                        key=f"interval_{symbol}_{period}"
+                    )
                 
                 # 데이터 로드
-                df, info = get_stock_data(symbol, period)
+                df = get_indicator_data(symbol, period, interval)
                 
                 if not df.empty:
-                    # 지표 계산
-                    df = calculate_indicators(df)
                     
                     # 기본 정보
                     col1, col2, col3, col4 = st.columns(4)
@@ -600,12 +908,27 @@ else:
                         st.metric("거래량", f"{df['Volume'].iloc[-1]:,.0f}")
                     with col4:
                         if symbol in st.session_state.portfolio:
-                            shares = st.session_state.portfolio[symbol]['shares']
-                            value = shares * df['Close'].iloc[-1]
-                            st.metric("보유 가치", f"${value:,.2f}")
+                            holding = st.session_state.portfolio[symbol]
+                            value = holding['shares'] * df['Close'].iloc[-1]
+                            pnl = value - holding['shares'] * holding['buy_price']
+                            st.metric("보유 가치", f"${value:,.2f}", delta=f"{pnl:+,.2f}")
                     
-                    # 차트
-                    st.plotly_chart(create_chart(df, symbol), use_container_width=True)
+                    # 차트 (긴 구간은 다운샘플링되므로 구간을 좁히면 원본 해상도로 표시)
+                    chart_df = df
+                    if len(df) > MAX_CHART_POINTS:
+                        timestamps = df.index.tz_localize(None) if df.index.tz is not None else df.index
+                        window = st.slider(
+                            "표시 구간",
+                            min_value=timestamps[0].to_pydatetime(),
+                            max_value=timestamps[-1].to_pydatetime(),
+                            value=(timestamps[0].to_pydatetime(), timestamps[-1].to_pydatetime()),
+                            key=f"window_{symbol}_{period}_{interval}"
+                        )
+                        chart_df = df[(timestamps >= window[0]) & (timestamps <= window[1])]
+                    if not chart_df.empty:
+                        with METRICS.span("chart", symbol):
+                            st.plotly_chart(get_chart(symbol, period, interval, data_version(chart_df), chart_df),
+                                            use_container_width=True)
                     
                     # 지표
                     st.subheader("기술적 지표")
@@ -629,7 +952,8 @@ else:
                     
                     # 뉴스
                     st.subheader("최신 뉴스")
-                    news = get_stock_news(symbol)
+                    with METRICS.span("news", symbol):
+                        news = get_stock_news(symbol)
                     if news:
                         for article in news[:3]:
                             with st.expander(article.get('title', 'N/A')[:80]):
@@ -648,8 +972,57 @@ else:
                     with col2:
                         if st.button("🤖 AI 분석", key=f"ai_{symbol}"):
                             asset_type = "암호화폐" if symbol in st.session_state.crypto_list else "ETF" if symbol in st.session_state.etf_list else "주식"
-                            analysis = perform_ai_analysis(df, symbol, info, asset_type)
-                            st.markdown(analysis)
+                            with METRICS.span("ai", symbol):
+                                st.session_state.analysis_results[symbol] = perform_ai_analysis(df, symbol, asset_type)
+                        
+                        # 생성 중이면 받은 토큰부터 이어서 표시 (다시 실행되어도 작업은 계속됨)
+                        job = st.session_state.analysis_results.get(symbol)
+                        if job is not None:
+                            if job.done:
+                                st.markdown(job.text)
+                            else:
+                                with METRICS.span("ai.stream", symbol):
+                                    st.write_stream(job.stream())
+                            if job.fallback_reason == "budget":
+                                st.caption("요청이 많아 기본 기술적 분석으로 대체했습니다. 잠시 후 다시 시도하세요.")
+                    
+                    # 백테스트
+                    with st.expander("🧪 백테스트"):
+                        strategy = st.selectbox("전략", list(STRATEGIES), format_func=STRATEGY_LABELS.get,
+                                                key=f"bt_strategy_{symbol}")
+                        defaults = STRATEGIES[strategy]
+                        param_cols = st.columns(len(defaults) + 2)
+                        params = {}
+                        for col, (name, default) in zip(param_cols, defaults.items()):
+                            with col:
+                                params[name] = st.number_input(name, value=default, key=f"bt_{name}_{strategy}_{symbol}")
+                        with param_cols[-2]:
+                            fee_bps = st.number_input("수수료(bp)", min_value=0.0, value=FEE_BPS, key=f"bt_fee_{symbol}")
+                        with param_cols[-1]:
+                            slippage_bps = st.number_input("슬리피지(bp)", min_value=0.0, value=SLIPPAGE_BPS,
+                                                           key=f"bt_slip_{symbol}")
+                        
+                        col1, col2 = st.columns(2)
+                        run_clicked = col1.button("실행", key=f"bt_run_{symbol}", use_container_width=True)
+                        sweep_clicked = col2.button("파라미터 스윕", key=f"bt_sweep_{symbol}", use_container_width=True)
+                        backtester = get_backtester(symbol, fee_bps, slippage_bps) if run_clicked or sweep_clicked else None
+                        if (run_clicked or sweep_clicked) and backtester is None:
+                            st.error("백테스트할 데이터가 없습니다.")
+                        elif run_clicked:
+                            result = backtester.run(strategy, **params)
+                            stats = result.stats.loc[symbol]
+                            m1, m2, m3, m4, m5 = st.columns(5)
+                            m1.metric("총수익률", f"{stats['total_return']:.1%}",
+                                      delta=f"{stats['total_return'] - stats['buy_hold']:+.1%} vs 보유")
+                            m2.metric("연환산", f"{stats['cagr']:.1%}")
+                            m3.metric("샤프", f"{stats['sharpe']:.2f}")
+                            m4.metric("최대 낙폭", f"{stats['max_drawdown']:.1%}")
+                            m5.metric("거래 수", f"{stats['trades']:.0f}")
+                            st.line_chart(pd.DataFrame({"전략": result.equity[symbol],
+                                                        "매수 후 보유": result.benchmark[symbol]}))
+                        elif sweep_clicked:
+                            table = backtester.sweep(strategy, param_grid(strategy, **SWEEP_GRIDS[strategy]))
+                            st.dataframe(table, hide_index=True, use_container_width=True)
                 else:
                     st.error(f"{symbol} 데이터를 불러올 수 없습니다.")
     else:
@@ -658,3 +1031,5 @@ else:
 # 푸터
 st.markdown("---")
 st.markdown(f"<p style='text-align: center; color: white;'>SmartInvestor Pro | {datetime.now().strftime('%Y-%m-%d %H:%M')}</p>", unsafe_allow_html=True)
+
+st.session_state.last_trace = METRICS.end_trace(trace)
@@ -0,0 +1,289 @@
+"""벡터화 백테스트
+
+여러 종목의 종가를 심볼 × 시간 패널로 만들고 신호, 보유 상태, 수수료와
+슬리피지를 반영한 수익률을 NumPy 배열 연산으로 한 번에 계산합니다.
+종목마다 상장 시점이나 빠진 바가 달라도 ``compact_panel`` 로 유효한 바만
+이어 붙여 계산하므로 일봉/분봉 모두 같은 방식으로 동작합니다.
+
+- 신호가 나온 바의 다음 바부터 보유 (미래 데이터 사용 없음)
+- 포지션이 바뀔 때마다 ``(수수료 + 슬리피지)`` 만큼 차감
+- 파라미터 조합 스윕은 프로세스 풀에서 실행하고, 같은 데이터/파라미터의
+  결과는 캐시에서 바로 반환
+"""
+import hashlib
+import itertools
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from indicators import bollinger_panel, build_panel, compact_panel, macd_panel, restore_panel, rsi_panel
+
+FEE_BPS = 5.0
+SLIPPAGE_BPS = 5.0
+# 인터벌별 연간 바 수 (정규장 기준, 1h 는 하루 7개)
+BARS_PER_YEAR = {"1m": 252 * 390, "5m": 252 * 78, "15m": 252 * 26, "1h": 252 * 7, "1d": 252}
+BACKTEST_WORKERS = os.cpu_count() or 2
+BACKTEST_CACHE_SIZE = 256
+# 패널 크기 × 조합 수가 이보다 작으면 프로세스를 띄우는 비용이 더 크므로 현재 프로세스에서 계산
+POOL_MIN_CELLS = 20_000_000
+
+# 전략별 기본 파라미터
+STRATEGIES = {
+    "rsi": {"window": 14, "lower": 30, "upper": 70},
+    "macd": {"fast": 12, "slow": 26, "signal": 9},
+    "bollinger": {"window": 20, "width": 2.0},
+}
+STRATEGY_LABELS = {
+    "rsi": "RSI 과매도 매수 / 과매수 매도",
+    "macd": "MACD 시그널 크로스",
+    "bollinger": "볼린저 밴드 평균회귀",
+}
+# 기본 스윕 범위
+SWEEP_GRIDS = {
+    "rsi": {"window": [7, 14, 21], "lower": [20, 25, 30, 35], "upper": [65, 70, 75, 80]},
+    "macd": {"fast": [8, 12, 16], "slow": [21, 26, 34], "signal": [5, 9, 12]},
+    "bollinger": {"window": [10, 20, 30], "width": [1.5, 2.0, 2.5, 3.0]},
+}
+
+STAT_COLUMNS = ["total_return", "cagr", "sharpe", "max_drawdown", "trades", "exposure", "buy_hold"]
+
+
+def param_grid(strategy, **options):
+    """파라미터 후보 목록의 모든 조합 (lower >= upper 처럼 의미 없는 조합은 제외)"""
+    names = list(options)
+    grid = []
+    for values in itertools.product(*(options[name] for name in names)):
+        params = {**STRATEGIES[strategy], **dict(zip(names, values))}
+        if strategy == "rsi" and params["lower"] >= params["upper"]:
+            continue
+        if strategy == "macd" and params["fast"] >= params["slow"]:
+            continue
+        grid.append(params)
+    return grid
+
+
+def _hold(entries, exits):
+    """진입/청산 신호를 보유 상태(1/0)로 - 청산 신호 전까지 유지"""
+    n_rows, n_cols = entries.shape
+    state = np.where(entries, 1.0, np.where(exits, 0.0, np.nan))
+    last = np.where(np.isfinite(state), np.arange(n_cols)[None, :], 0)
+    np.maximum.accumulate(last, axis=1, out=last)
+    return np.nan_to_num(state[np.arange(n_rows)[:, None], last], nan=0.0)
+
+
+def positions(strategy, close, start, params):
+    """압축된 종가 패널에서 전략의 보유 상태 (신호가 나온 바 기준)"""
+    with np.errstate(invalid="ignore"):
+        if strategy == "rsi":
+            rsi = rsi_panel(close, start, int(params["window"]))
+            return _hold(rsi < params["lower"], rsi > params["upper"])
+        if strategy == "macd":
+            macd, signal = macd_panel(close, start, int(params["fast"]), int(params["slow"]), int(params["signal"]))
+            return (macd > signal).astype("float64")
+        if strategy == "bollinger":
+            middle, _, lower = bollinger_panel(close, start, int(params["window"]), float(params["width"]))
+            return _hold(close < lower, close > middle)
+    raise ValueError(f"알 수 없는 전략: {strategy}")
+
+
+def simulate(close, start, position, cost):
+    """바별 전략 수익률과 보유 상태 - ``(returns, held)``"""
+    returns = np.zeros_like(close)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns[:, 1:] = close[:, 1:] / close[:, :-1] - 1
+    returns = np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+    # 신호가 나온 바의 종가 이후에 진입하므로 수익은 다음 바부터
+    held = np.zeros_like(position)
+    held[:, 1:] = position[:, :-1]
+    turnover = np.abs(np.diff(held, axis=1, prepend=0.0))
+    return held * returns - turnover * cost, held
+
+
+def statistics(close, start, strategy_returns, held, bars_per_year):
+    """종목별 성과 지표 배열 ``{이름: (n_symbols,)}``"""
+    n_rows, n_cols = close.shape
+    rows = np.arange(n_rows)
+    active = np.arange(n_cols)[None, :] >= start[:, None]
+    n_bars = np.maximum(n_cols - start, 1)
+    equity = np.cumprod(1 + strategy_returns, axis=1)
+    total = equity[:, -1]
+
+    mean = strategy_returns.sum(axis=1) / n_bars
+    variance = np.where(active, (strategy_returns - mean[:, None]) ** 2, 0.0).sum(axis=1) / np.maximum(n_bars - 1, 1)
+    std = np.sqrt(variance)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(bars_per_year), 0.0)
+        cagr = np.where(total > 0, total ** (bars_per_year / n_bars) - 1, -1.0)
+        first = close[rows, np.minimum(start, n_cols - 1)]
+        buy_hold = close[:, -1] / first - 1
+    drawdown = equity / np.maximum.accumulate(equity, axis=1) - 1
+    return {
+        "total_return": total - 1,
+        "cagr": cagr,
+        "sharpe": sharpe,
+        "max_drawdown": drawdown.min(axis=1),
+        "trades": (np.diff(held, axis=1) > 0).sum(axis=1).astype("float64"),
+        "exposure": np.where(active, held, 0.0).sum(axis=1) / n_bars,
+        "buy_hold": buy_hold,
+    }
+
+
+def summarize(stats):
+    """스윕용 요약 - 종목 평균 성과와 매수 후 보유보다 나은 종목 비율"""
+    return {
+        "total_return": float(np.mean(stats["total_return"])),
+        "cagr": float(np.mean(stats["cagr"])),
+        "sharpe": float(np.mean(stats["sharpe"])),
+        "max_drawdown": float(np.mean(stats["max_drawdown"])),
+        "trades": float(np.mean(stats["trades"])),
+        "beat_buy_hold": float(np.mean(stats["total_return"] > stats["buy_hold"])),
+    }
+
+
+class ResultCache:
+    """결과 LRU 캐시 (스레드 안전)"""
+
+    def __init__(self, max_entries=BACKTEST_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class BacktestResult:
+    """단일 파라미터 백테스트 결과"""
+
+    def __init__(self, strategy, params, stats, equity, benchmark, portfolio):
+        self.strategy = strategy
+        self.params = params
+        # 종목별 성과 (index=symbol)
+        self.stats = stats
+        # 종목별 자산 곡선 (시작 1.0, 빠진 바는 직전 값)
+        self.equity = equity
+        # 종목별 매수 후 보유 자산 곡선 (상장 전은 NaN)
+        self.benchmark = benchmark
+        # 종목 동일 비중 포트폴리오 자산 곡선
+        self.portfolio = portfolio
+
+
+# 프로세스 풀 워커가 한 번 받아 두는 패널 (풀 초기화에서만 씀)
+_shared = {}
+
+
+def _sweep_arrays(close, start, cost, bars_per_year):
+    return {"close": close, "start": start, "cost": cost, "bars_per_year": bars_per_year}
+
+
+def _init_worker(close, start, cost, bars_per_year):
+    _shared.update(_sweep_arrays(close, start, cost, bars_per_year))
+
+
+def _sweep_task(job, arrays=None):
+    """조합 하나의 요약 - ``arrays`` 가 없으면 풀 워커가 받아 둔 패널 사용"""
+    strategy, params = job
+    if arrays is None:
+        arrays = _shared
+    close, start = arrays["close"], arrays["start"]
+    returns, held = simulate(close, start, positions(strategy, close, start, params), arrays["cost"])
+    return summarize(statistics(close, start, returns, held, arrays["bars_per_year"]))
+
+
+class Backtester:
+    """종목 묶음 하나에 대한 백테스트 - 패널은 한 번만 만들고 결과는 캐시"""
+
+    def __init__(self, frames, interval="1d", fee_bps=FEE_BPS, slippage_bps=SLIPPAGE_BPS, cache=None):
+        self.symbols, self.index, panels = build_panel(frames)
+        if not self.symbols:
+            raise ValueError("백테스트할 데이터가 없습니다.")
+        close = panels["Close"]
+        self.valid = np.isfinite(close)
+        self.order, self.start, (self.close,) = compact_panel(self.valid, close)
+        self.cost = (fee_bps + slippage_bps) / 10000
+        self.bars_per_year = BARS_PER_YEAR.get(interval, BARS_PER_YEAR["1d"])
+        self.cache = cache if cache is not None else ResultCache()
+
+        digest = hashlib.sha1(np.ascontiguousarray(close).tobytes())
+        digest.update("|".join(self.symbols).encode())
+        digest.update(self.index.asi8.tobytes())
+        self.fingerprint = digest.hexdigest()
+
+    def _key(self, kind, strategy, params):
+        return (kind, self.fingerprint, strategy, tuple(sorted(params.items())), self.cost, self.bars_per_year)
+
+    def run(self, strategy, **params):
+        """기본 파라미터에 ``params`` 를 덮어써 실행 (같은 조건이면 캐시된 결과)"""
+        params = {**STRATEGIES[strategy], **params}
+        key = self._key("run", strategy, params)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        returns, held = simulate(self.close, self.start, positions(strategy, self.close, self.start, params), self.cost)
+        stats = statistics(self.close, self.start, returns, held, self.bars_per_year)
+        self.cache.put(self._key("summary", strategy, params), summarize(stats))
+
+        # 원래 시간축으로 되돌림 - 빠진 바는 수익률 0 (직전 자산 유지)
+        timeline = np.nan_to_num(restore_panel(returns, self.valid, self.order), nan=0.0)
+        equity = pd.DataFrame(np.cumprod(1 + timeline, axis=1).T, index=self.index, columns=self.symbols)
+        listed = np.maximum.accumulate(self.valid, axis=1)
+        with np.errstate(invalid="ignore"):
+            average = np.nan_to_num(np.nanmean(np.where(listed, timeline, np.nan), axis=0), nan=0.0)
+        portfolio = pd.Series(np.cumprod(1 + average), index=self.index, name="portfolio")
+        prices = pd.DataFrame(restore_panel(self.close, self.valid, self.order).T,
+                              index=self.index, columns=self.symbols).ffill()
+        benchmark = prices / prices.bfill().iloc[0]
+
+        result = BacktestResult(strategy, params,
+                                pd.DataFrame(stats, index=pd.Index(self.symbols, name="symbol"))[STAT_COLUMNS],
+                                equity, benchmark, portfolio)
+        self.cache.put(key, result)
+        return result
+
+    def sweep(self, strategy, grid, max_workers=BACKTEST_WORKERS):
+        """파라미터 조합별 요약 표 (샤프 지수 순) - 캐시에 없는 조합만 프로세스 풀에서 계산"""
+        grid = [{**STRATEGIES[strategy], **params} for params in grid]
+        summaries = [self.cache.get(self._key("summary", strategy, params)) for params in grid]
+        todo = [i for i, summary in enumerate(summaries) if summary is None]
+
+        if todo:
+            jobs = [(strategy, grid[i]) for i in todo]
+            workers = max(1, min(max_workers, len(jobs)))
+            if self.close.size * len(jobs) < POOL_MIN_CELLS:
+                workers = 1
+            if workers == 1:
+                # 같은 프로세스의 다른 세션과 겹치지 않도록 전역 대신 직접 넘김
+                arrays = _sweep_arrays(self.close, self.start, self.cost, self.bars_per_year)
+                computed = [_sweep_task(job, arrays) for job in jobs]
+            else:
+                # Streamlit 처럼 스레드가 있는 프로세스에서도 안전하도록 spawn 사용
+                with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                         initializer=_init_worker,
+                                         initargs=(self.close, self.start, self.cost, self.bars_per_year)) as pool:
+                    computed = list(pool.map(_sweep_task, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+            for i, summary in zip(todo, computed):
+                summaries[i] = summary
+                self.cache.put(self._key("summary", strategy, grid[i]), summary)
+
+        table = pd.DataFrame([{**params, **summary} for params, summary in zip(grid, summaries)])
+        return table.sort_values("sharpe", ascending=False).reset_index(drop=True)
@@ -0,0 +1,318 @@
+"""로컬 OHLCV 바 저장소
+
+심볼/인터벌별로 Parquet 파일 하나에 전체 이력을 보관하고, 마지막으로
+저장된 시점 이후의 바만 yfinance 에서 받아 이어 붙입니다. 기간(period)
+조회는 로컬 이력을 잘라서 반환하므로 프로세스를 재시작해도 유지됩니다.
+
+장중 봉(5m/15m/1h)은 기간을 덮는 가장 촘촘한 기준 봉(``base_interval``)만
+받아 저장하고 서버에서 리샘플링해 만듭니다. 같은 기준 봉에서 나온 인터벌과
+기간끼리는 전환해도 네트워크 조회가 없습니다.
+"""
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+from market_data import MAX_WORKERS, OHLCV_COLUMNS, fetch_history, fetch_history_batch
+from metrics import CacheStats
+
+BAR_STORE_DIR = "bar_store"
+
+# 기간별 필요한 이력 길이(일). 'Nd' 는 거래일 수, 나머지는 달력 기준
+PERIOD_DAYS = {
+    "1d": 1,
+    "5d": 5,
+    "1mo": 31,
+    "3mo": 92,
+    "6mo": 183,
+    "1y": 366,
+    "2y": 731,
+    "5y": 1827,
+    "10y": 3653,
+    "ytd": 366,
+    "max": float("inf"),
+}
+
+PERIOD_OFFSETS = {
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+# 지원하는 인터벌 (촘촘한 순)과 리샘플링 규칙
+INTERVALS = ["1m", "5m", "15m", "1h", "1d"]
+RESAMPLE_RULES = {"1m": "1min", "5m": "5min", "15m": "15min", "1h": "1h"}
+RESAMPLE_AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+# yfinance 가 장중 봉을 제공하는 최근 일수 - 저장도 이만큼만 유지
+INTRADAY_LIMIT_DAYS = {"1m": 7, "5m": 60, "15m": 60, "1h": 730}
+# 기간별 기본 봉 (짧은 기간은 장중 봉, 나머지는 일봉)
+DEFAULT_INTERVALS = {"1d": "5m", "5d": "15m"}
+
+
+def base_interval(interval, period):
+    """``interval`` 봉을 만들 때 받아 올 기준 봉 - 기간을 덮는 가장 촘촘한 장중 봉 (불가하면 None)
+
+    일봉은 긴 이력이 필요하므로 장중 봉에서 만들지 않고 그대로 받음
+    """
+    if interval not in RESAMPLE_RULES:
+        return interval
+    days = PERIOD_DAYS.get(period, PERIOD_DAYS["1mo"])
+    for base in INTERVALS[:INTERVALS.index(interval) + 1]:
+        if INTRADAY_LIMIT_DAYS[base] >= days:
+            return base
+    return None
+
+
+def intervals_for(period):
+    """기간에 쓸 수 있는 인터벌 (일봉은 한 달 이상일 때만)"""
+    return [i for i in INTERVALS
+            if (i == "1d" and PERIOD_DAYS.get(period, 0) >= PERIOD_DAYS["1mo"])
+            or (i != "1d" and base_interval(i, period) is not None)]
+
+
+def resample_bars(df, interval):
+    """장중 OHLCV 를 더 큰 ``interval`` 봉으로 묶음 (거래가 없는 구간은 빠짐)"""
+    if df.empty:
+        return df
+    bars = df.resample(RESAMPLE_RULES[interval], label="left", closed="left").agg(
+        {c: RESAMPLE_AGG[c] for c in df.columns if c in RESAMPLE_AGG}
+    )
+    return bars[bars["Close"].notna()]
+
+
+def slice_period(df, period, interval="1d"):
+    """저장된 이력에서 yfinance period 와 같은 구간을 잘라냄 (장중 봉의 'Nd' 는 최근 N 거래일)"""
+    if df.empty or period == "max":
+        return df
+    last = df.index[-1]
+    # 'ytd' 도 'd' 로 끝나므로 'Nd' 보다 먼저 봄
+    if period == "ytd":
+        return df[df.index.year == last.year]
+    if period.endswith("d"):
+        days = int(period[:-1])
+        if interval in RESAMPLE_RULES:
+            dates = df.index.normalize()
+            return df[dates >= dates.unique()[-days:][0]]
+        return df.iloc[-days:]
+    return df[df.index > last - PERIOD_OFFSETS[period]]
+
+
+def data_version(df):
+    """캐시 키용 데이터 버전 (바 수, 마지막 시각, 마지막 종가) - 앱 차트/지표와 API 응답이 같이 씀"""
+    return f"{len(df)}:{df.index[-1].isoformat()}:{df['Close'].iloc[-1]}"
+
+
+class BarStore:
+    """심볼/인터벌별 Parquet 바 저장소"""
+
+    def __init__(self, root=BAR_STORE_DIR, provider=None, refresh_interval=300):
+        self.root = root
+        self.provider = provider
+        # 마지막 델타 조회 후 이 시간(초) 동안은 네트워크를 다시 타지 않음
+        self.refresh_interval = refresh_interval
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        # 파일 수정 시각이 같으면 Parquet 을 다시 읽지 않음
+        self._frames = {}
+        # 네트워크 조회(전체/델타)를 미스로 셈
+        self.cache_stats = CacheStats()
+        # {(symbol, interval): (기준 봉 DataFrame, 리샘플링 결과)}
+        self._derived = {}
+
+    def _lock(self, symbol, interval):
+        with self._locks_guard:
+            return self._locks.setdefault((symbol, interval), threading.Lock())
+
+    def _path(self, symbol, interval):
+        safe = symbol.replace("/", "_").replace("\\", "_")
+        return os.path.join(self.root, interval, f"{safe}.parquet")
+
+    def _meta_path(self, symbol, interval):
+        return self._path(symbol, interval)[:-len(".parquet")] + ".json"
+
+    def load(self, symbol, interval="1d"):
+        """저장된 전체 이력 (없으면 빈 DataFrame, 반환값은 공유되므로 수정하지 말 것)"""
+        path = self._path(symbol, interval)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return pd.DataFrame()
+        cached = self._frames.get((symbol, interval))
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        try:
+            df = pd.read_parquet(path)
+        except Exception:
+            return pd.DataFrame()
+        self._frames[(symbol, interval)] = (mtime, df)
+        return df
+
+    def _load_meta(self, symbol, interval):
+        try:
+            with open(self._meta_path(symbol, interval), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, symbol, interval, df, meta):
+        path = self._path(symbol, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 임시 파일에 쓴 뒤 교체해서 읽는 쪽이 반쯤 쓰인 파일을 보지 않도록 함
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        df.to_parquet(tmp)
+        os.replace(tmp, path)
+        self._frames[(symbol, interval)] = (os.path.getmtime(path), df)
+        self._save_meta(symbol, interval, meta)
+
+    def _save_meta(self, symbol, interval, meta):
+        meta_path = self._meta_path(symbol, interval)
+        # 같은 디렉터리를 쓰는 다른 프로세스/스레드와 임시 파일이 겹치지 않도록 함
+        tmp = f"{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, meta_path)
+
+    def _fetch(self, symbol, interval, **kwargs):
+        df = fetch_history(symbol, interval=interval, provider=self.provider, **kwargs)
+        if df.empty:
+            return df
+        return df[[c for c in OHLCV_COLUMNS if c in df.columns]]
+
+    @staticmethod
+    def _needs_full(stored, meta, interval, needed):
+        """처음이거나, 더 긴 기간이 필요하거나, 장중 봉의 마지막 바가 제공 기간을 벗어났을 때"""
+        if stored.empty or meta.get("coverage_days", 0) < needed:
+            return True
+        limit = INTRADAY_LIMIT_DAYS.get(interval)
+        return limit is not None and time.time() - stored.index[-1].timestamp() > limit * 86400
+
+    @staticmethod
+    def _trim(df, interval):
+        """장중 봉은 제공 기간만큼만 보관"""
+        limit = INTRADAY_LIMIT_DAYS.get(interval)
+        if limit is None or df.empty:
+            return df
+        return df[df.index > df.index[-1] - pd.Timedelta(days=limit)]
+
+    @staticmethod
+    def _merge(stored, fresh):
+        if stored.empty:
+            return fresh.sort_index()
+        if fresh.empty:
+            return stored
+        if stored.index.tz is not None and fresh.index.tz is not None:
+            fresh = fresh.tz_convert(stored.index.tz)
+        merged = pd.concat([stored, fresh])
+        # 마지막 바는 장중에 갱신되므로 새로 받은 값을 우선
+        merged = merged[~merged.index.duplicated(keep="last")]
+        return merged.sort_index()
+
+    def update(self, symbol, interval="1d", period="1mo"):
+        """``period`` 를 덮도록 이력을 채우고 마지막 바 이후만 추가 조회"""
+        self.cache_stats.lookup()
+        with self._lock(symbol, interval):
+            stored = self.load(symbol, interval)
+            meta = self._load_meta(symbol, interval)
+            covered = meta.get("coverage_days", 0)
+            needed = PERIOD_DAYS.get(period, PERIOD_DAYS["1mo"])
+
+            if self._needs_full(stored, meta, interval, needed):
+                # 처음이거나 더 긴 기간이 필요할 때만 전체 구간 조회
+                fresh = self._fetch(symbol, interval, period=period)
+                self.cache_stats.miss((symbol, interval))
+                if fresh.empty:
+                    return stored
+                coverage = max(covered, needed)
+            elif time.time() - meta.get("fetched_at", 0) < self.refresh_interval:
+                return stored
+            else:
+                fresh = self._fetch(symbol, interval, start=stored.index[-1])
+                self.cache_stats.miss((symbol, interval))
+                coverage = covered
+
+            merged = self._trim(self._merge(stored, fresh), interval)
+            self._save(symbol, interval, merged, {
+                "coverage_days": coverage,
+                "fetched_at": time.time(),
+            })
+            return merged
+
+    def update_many(self, symbols, interval="1d", period="1mo", max_workers=MAX_WORKERS):
+        """여러 심볼을 한꺼번에 갱신 - 전체 조회와 델타 조회를 각각 배치 요청 하나로 처리
+
+        반환값은 ``{symbol: 전체 이력}`` 이며 데이터가 없는 심볼은 빠집니다.
+        """
+        needed = PERIOD_DAYS.get(period, PERIOD_DAYS["1mo"])
+        now = time.time()
+        full, delta, frames = [], [], {}
+        for symbol in dict.fromkeys(symbols):
+            stored = self.load(symbol, interval)
+            meta = self._load_meta(symbol, interval)
+            if self._needs_full(stored, meta, interval, needed):
+                full.append(symbol)
+            elif now - meta.get("fetched_at", 0) >= self.refresh_interval:
+                delta.append(symbol)
+            else:
+                frames[symbol] = stored
+        self.cache_stats.lookup(len(full) + len(delta) + len(frames))
+        for symbol in full + delta:
+            self.cache_stats.miss((symbol, interval))
+
+        fetched = {}
+        if full:
+            fetched.update(fetch_history_batch(full, period, interval, self.provider, max_workers))
+        if delta:
+            # 가장 오래된 마지막 바부터 받고 겹치는 바는 병합할 때 정리
+            start = min(self.load(s, interval).index[-1] for s in delta)
+            fetched.update(fetch_history_batch(delta, None, interval, self.provider, max_workers, start=start))
+
+        for symbol in full + delta:
+            with self._lock(symbol, interval):
+                stored = self.load(symbol, interval)
+                meta = self._load_meta(symbol, interval)
+                fresh = fetched.get(symbol)
+                if fresh is None or fresh.empty:
+                    if not stored.empty:
+                        frames[symbol] = stored
+                    if symbol in delta:
+                        # 새 바가 없어도 조회한 시각은 남겨 refresh_interval 동안 다시 묻지 않음
+                        self._save_meta(symbol, interval, {**meta, "fetched_at": time.time()})
+                    continue
+                fresh = fresh[[c for c in OHLCV_COLUMNS if c in fresh.columns]]
+                coverage = max(meta.get("coverage_days", 0), needed) if symbol in full else meta.get("coverage_days", 0)
+                merged = self._trim(self._merge(stored, fresh), interval)
+                self._save(symbol, interval, merged, {"coverage_days": coverage, "fetched_at": time.time()})
+                frames[symbol] = merged
+        return frames
+
+    def _derive(self, symbol, base, interval, stored):
+        """기준 봉에서 ``interval`` 봉 만들기 - 기준 봉이 그대로면 이전 결과 재사용"""
+        if base == interval or stored.empty:
+            return stored
+        cached = self._derived.get((symbol, interval))
+        if cached is not None and cached[0] is stored:
+            return cached[1]
+        bars = resample_bars(stored, interval)
+        self._derived[(symbol, interval)] = (stored, bars)
+        return bars
+
+    def history(self, symbol, interval="1d", period="1mo"):
+        """저장된 ``interval`` 봉 전체 이력 (조회 없이, 장중 봉은 기준 봉에서 리샘플링)"""
+        base = base_interval(interval, period)
+        if base is None:
+            return pd.DataFrame()
+        return self._derive(symbol, base, interval, self.load(symbol, base))
+
+    def get_bars(self, symbol, period="1mo", interval="1d"):
+        """기간 조회 - 기준 봉 이력을 갱신한 뒤 리샘플링하고 잘라서 반환"""
+        base = base_interval(interval, period)
+        if base is None:
+            return pd.DataFrame()
+        bars = self._derive(symbol, base, interval, self.update(symbol, base, period))
+        return slice_period(bars, period, interval)
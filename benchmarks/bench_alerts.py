@@ -0,0 +1,86 @@
+"""알림 엔진 - 규칙 수별 처리량 (규칙/초)
+
+    python -m benchmarks.bench_alerts --rules 10000 --symbols 500
+
+합성 사용자(규칙의 일부는 관심 종목 전체 대상)와 ``FakeProvider`` 시세로
+``AlertEngine.run_once`` 를 잽니다. cold 는 시세 조회와 지표 계산 포함,
+warm 은 바가 그대로라 지표를 재사용하고 평가와 outbox 기록만 하는 경우입니다.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from alerts import RULE_KINDS, AlertEngine, evaluate, expand_rules
+from bar_store import BarStore
+from benchmarks.fake_provider import FakeProvider
+from user_store import UserStore
+
+WATCHLIST_SIZE = 8
+# 관심 종목 전체에 거는 규칙 비율
+WATCHLIST_RULE_SHARE = 0.1
+
+
+def make_users(store, n_rules, symbols, seed=0):
+    """규칙 ``n_rules`` 개가 되도록 사용자당 10개씩 합성"""
+    rng = np.random.default_rng(seed)
+    kinds = list(RULE_KINDS)
+    for u in range((n_rules + 9) // 10):
+        username = f"user{u:05d}"
+        store.create_user(username, "0" * 64)
+        watched = rng.choice(symbols, size=WATCHLIST_SIZE, replace=False)
+        for symbol in watched:
+            store.add_symbol(username, "stocks", str(symbol))
+        store.set_holding(username, str(watched[0]), 10.0, float(rng.uniform(50, 150)))
+        for r in range(min(10, n_rules - u * 10)):
+            kind = kinds[int(rng.integers(len(kinds)))]
+            value = float(rng.uniform(50, 150)) if kind.startswith("price") else None
+            symbol = None if rng.random() < WATCHLIST_RULE_SHARE else str(watched[r % WATCHLIST_SIZE])
+            store.add_alert_rule(username, kind, value, symbol, cooldown=3600)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rules", type=int, default=10_000)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    symbols = [f"SYM{i:04d}" for i in range(args.symbols)]
+    provider = FakeProvider.synthetic(symbols, n_bars=300)
+    with tempfile.TemporaryDirectory() as root:
+        users = UserStore(os.path.join(root, "users.db"))
+        make_users(users, args.rules, symbols)
+        engine = AlertEngine(users, BarStore(os.path.join(root, "bars"), provider=provider))
+
+        started = time.perf_counter()
+        engine.run_once()
+        cold = time.perf_counter() - started
+        targets = expand_rules(users.alert_rules(), users.watchlists())
+        print(f"{engine.stats['rules']} rules -> {len(targets)} (rule, symbol) targets over "
+              f"{engine.stats['symbols']} symbols, {engine.stats['computed']} indicator computations")
+        print(f"  run_once cold : {cold * 1000:8.1f} ms  ({engine.stats['rules'] / cold:,.0f} rules/s)")
+
+        warm = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            engine.run_once()
+            warm = min(warm, time.perf_counter() - started)
+        print(f"  run_once warm : {warm * 1000:8.1f} ms  ({engine.stats['rules'] / warm:,.0f} rules/s)")
+
+        snapshots = engine.snapshots(symbols)
+        buy_prices = users.buy_prices()
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            fired = evaluate(targets, snapshots, buy_prices)
+            best = min(best, time.perf_counter() - started)
+        print(f"  evaluate      : {best * 1000:8.1f} ms  ({len(targets) / best:,.0f} targets/s, {len(fired)} fired)")
+        print(f"  outbox        : {engine.stats['queued']} queued, {engine.stats['suppressed']} suppressed by cooldown")
+        print(f"  fetches       : {sum(provider.calls.values())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""백테스트 - 단일 실행, 파라미터 스윕 (한 프로세스 vs 프로세스 풀), 캐시 재실행
+
+    python -m benchmarks.bench_backtest --symbols 100 --bars 2520 --strategy rsi --workers 4
+"""
+import argparse
+import time
+
+import backtest
+from backtest import BACKTEST_WORKERS, SWEEP_GRIDS, Backtester, ResultCache, param_grid
+from benchmarks.synthetic import make_universe
+
+
+def _timed(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--bars", type=int, default=2520)
+    parser.add_argument("--strategy", choices=sorted(SWEEP_GRIDS), default="rsi")
+    parser.add_argument("--workers", type=int, default=BACKTEST_WORKERS)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    frames = make_universe(args.symbols, args.bars)
+    grid = param_grid(args.strategy, **SWEEP_GRIDS[args.strategy])
+    # 크기와 상관없이 워커 수 비교가 되도록 풀 사용 기준을 없앰
+    backtest.POOL_MIN_CELLS = 0
+
+    build = _timed(lambda: Backtester(frames), args.repeat)
+    single = _timed(lambda: Backtester(frames, cache=ResultCache(0)).run(args.strategy), args.repeat)
+    sweeps = {
+        workers: _timed(lambda: Backtester(frames, cache=ResultCache()).sweep(args.strategy, grid, workers), 1)
+        for workers in sorted({1, args.workers})
+    }
+    warm = Backtester(frames)
+    warm.sweep(args.strategy, grid, max_workers=1)
+    cached = _timed(lambda: warm.sweep(args.strategy, grid), args.repeat)
+
+    print(f"{args.symbols} symbols x {args.bars} bars, {args.strategy} sweep of {len(grid)} combinations")
+    print(f"  build panel               : {build * 1000:9.1f} ms")
+    print(f"  single run                : {single * 1000:9.1f} ms")
+    for workers, elapsed in sweeps.items():
+        print(f"  sweep, {workers:2d} worker(s)       : {elapsed * 1000:9.1f} ms"
+              f" ({len(grid) / elapsed:.0f} runs/s)")
+    print(f"  sweep, cached             : {cached * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
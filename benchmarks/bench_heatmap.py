@@ -0,0 +1,61 @@
+"""히트맵 - 타일 계산(배치 수익률)과 트리맵 figure 생성/직렬화 시간
+
+    python -m benchmarks.bench_heatmap --symbols 500
+
+``FakeProvider`` 합성 일봉으로 ``MarketHeatmap.tiles`` 를 잽니다. cold 는 시세
+저장과 수익률 행렬 구축 포함, warm 은 새 바가 없어 행렬 연산만 하는 경우이고,
+render 는 figure 생성과 JSON 직렬화(브라우저로 보내는 양)입니다.
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from bar_store import BarStore
+from benchmarks.fake_provider import FakeProvider
+from charts import create_treemap
+from heatmap import ASSET_TYPE_LABELS, HORIZONS, MarketHeatmap, horizon_returns
+from symbol_master import SymbolMaster
+
+
+def _timed(func, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # 종목 마스터의 심볼을 먼저 써서 섹터가 채워진 타일로 잼
+    master = SymbolMaster()
+    symbols = (sorted(master.index._by_symbol) + [f"SYM{i:04d}" for i in range(args.symbols)])[:args.symbols]
+    provider = FakeProvider.synthetic(symbols, n_bars=520)
+    with tempfile.TemporaryDirectory() as root:
+        heatmap = MarketHeatmap(BarStore(root, provider=provider), master)
+        cold, tiles = _timed(lambda: heatmap.tiles(symbols), 1)
+        warm, tiles = _timed(lambda: heatmap.tiles(symbols), args.repeat)
+        window = heatmap.matrix.window(symbols, 400, fill=None)
+        returns, _ = _timed(lambda: horizon_returns(window.index.asi8, window.to_numpy()), args.repeat)
+        build, fig = _timed(lambda: create_treemap(tiles, "1D", ASSET_TYPE_LABELS), args.repeat)
+        serialize, payload = _timed(fig.to_json, args.repeat)
+
+    print(f"{len(tiles)} tiles, {window.shape[0]} dates, horizons {', '.join(HORIZONS)}"
+          f" ({int(np.isfinite(tiles['1Y']).sum())} with 1Y)")
+    print(f"  tiles cold       : {cold * 1000:8.1f} ms")
+    print(f"  tiles warm       : {warm * 1000:8.1f} ms")
+    print(f"  horizon_returns  : {returns * 1000:8.1f} ms")
+    print(f"  create_treemap   : {build * 1000:8.1f} ms")
+    print(f"  figure to_json   : {serialize * 1000:8.1f} ms  ({len(payload) / 1024:.0f} KB)")
+    print(f"  render total     : {(build + serialize) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""종목별 calculate_indicators 반복 vs 패널 일괄 계산
+
+    python -m benchmarks.bench_indicator_panel --symbols 500 --bars 252
+"""
+import argparse
+import time
+
+from benchmarks.synthetic import make_universe
+from indicators import build_panel, calculate_indicators, calculate_indicators_panel
+
+
+def _timed(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--bars", type=int, default=252)
+    parser.add_argument("--missing", type=float, default=0.01)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    frames = make_universe(args.symbols, args.bars, missing=args.missing)
+
+    loop = _timed(lambda: [calculate_indicators(df) for df in frames.values()], args.repeat)
+    build = _timed(lambda: build_panel(frames), args.repeat)
+    _, _, panels = build_panel(frames)
+    panel = _timed(
+        lambda: calculate_indicators_panel(panels["Close"], panels["High"], panels["Low"], panels["Volume"]),
+        args.repeat,
+    )
+
+    print(f"{args.symbols} symbols x {args.bars} bars")
+    print(f"  calculate_indicators loop : {loop * 1000:9.1f} ms")
+    print(f"  build_panel               : {build * 1000:9.1f} ms")
+    print(f"  calculate_indicators_panel: {panel * 1000:9.1f} ms")
+    print(f"  speedup (panel only)      : {loop / panel:9.1f}x")
+    print(f"  speedup (build + panel)   : {loop / (build + panel):9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
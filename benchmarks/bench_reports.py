@@ -0,0 +1,62 @@
+"""PDF 리포트 처리량 (reports/minute) - 한 프로세스 vs 프로세스 풀
+
+    python -m benchmarks.bench_reports --users 200 --symbols 50 --workers 4
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_universe
+from indicators import calculate_indicators
+from reports import REPORT_WORKERS, collect_artifacts, generate_reports
+
+
+def make_users(n_users, symbols, watch=8, holdings=4, seed=0):
+    """관심 종목/보유 종목을 임의로 고른 사용자 레코드"""
+    rng = np.random.default_rng(seed)
+    users = {}
+    for i in range(n_users):
+        watched = list(rng.choice(symbols, size=min(watch, len(symbols)), replace=False))
+        held = watched[:holdings]
+        users[f"user{i:04d}"] = {
+            "portfolios": {"stocks": watched},
+            "portfolio": {s: {"shares": float(rng.integers(1, 100)), "buy_price": float(rng.uniform(50, 150))}
+                          for s in held},
+        }
+    return users
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--bars", type=int, default=252)
+    parser.add_argument("--watch", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=REPORT_WORKERS)
+    args = parser.parse_args()
+
+    frames = make_universe(args.symbols, args.bars, ragged=False)
+    users = make_users(args.users, list(frames), watch=args.watch)
+
+    started = time.perf_counter()
+    artifacts = collect_artifacts(frames, lambda s: calculate_indicators(frames[s]))
+    shared = time.perf_counter() - started
+
+    results = {}
+    for workers in sorted({1, args.workers}):
+        started = time.perf_counter()
+        reports = generate_reports(users, artifacts, max_workers=workers)
+        results[workers] = time.perf_counter() - started
+        size = sum(map(len, reports.values())) / len(reports)
+
+    print(f"{args.users} users, {args.symbols} symbols x {args.bars} bars, {args.watch} symbols/report")
+    print(f"  shared artifacts          : {shared * 1000:9.1f} ms (once)")
+    print(f"  average report size       : {size / 1024:9.1f} KB")
+    for workers, elapsed in results.items():
+        print(f"  {workers:2d} worker(s)              : {args.users / elapsed * 60:9.0f} reports/min"
+              f" ({elapsed:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""포트폴리오 위험 - 수익률 행렬 구축/증분 갱신과 위험 계산 시간
+
+    python -m benchmarks.bench_risk --holdings 200 --bars 504
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_universe
+from risk import ReturnsMatrix, portfolio_risk
+
+
+def _timed(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--holdings", type=int, default=200)
+    parser.add_argument("--bars", type=int, default=504)
+    parser.add_argument("--new-bars", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    frames = make_universe(args.holdings, args.bars)
+    older = {s: df.iloc[:-args.new_bars] for s, df in frames.items()}
+    rng = np.random.default_rng(0)
+    portfolio = {s: {"shares": float(rng.integers(1, 100)), "buy_price": float(rng.uniform(50, 150))}
+                 for s in frames}
+
+    def incremental():
+        matrix = ReturnsMatrix()
+        matrix.update(older)
+        started = time.perf_counter()
+        matrix.update(frames)
+        return time.perf_counter() - started
+
+    build = _timed(lambda: ReturnsMatrix().update(frames), args.repeat)
+    append = min(incremental() for _ in range(args.repeat))
+    matrix = ReturnsMatrix()
+    matrix.update(frames)
+    unchanged = _timed(lambda: matrix.update(frames), args.repeat)
+    risk = _timed(lambda: portfolio_risk(portfolio, matrix), args.repeat)
+
+    print(f"{args.holdings} holdings x {args.bars} bars")
+    print(f"  build returns matrix      : {build * 1000:9.1f} ms")
+    print(f"  {f'append {args.new_bars} new bar(s)':<26}: {append * 1000:9.1f} ms")
+    print(f"  update, nothing new       : {unchanged * 1000:9.1f} ms")
+    print(f"  portfolio_risk            : {risk * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
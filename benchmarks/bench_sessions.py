@@ -0,0 +1,249 @@
+"""동시 세션 부하 테스트 - ``app.py`` 워커 하나가 감당하는 세션 수
+
+    python -m benchmarks.bench_sessions --sessions 8 --rounds 3
+    python -m benchmarks.bench_sessions --cassette cassettes/default --mode record   # 네트워크/키 필요
+    python -m benchmarks.bench_sessions --cassette cassettes/default --sessions 32   # 녹화본 재생
+    python -m benchmarks.bench_sessions --cassette /tmp/synthetic --synthetic --mode auto   # 합성 녹화
+    python -m benchmarks.bench_sessions --cassette /tmp/synthetic --synthetic --latency 0.05  # 그 재생
+
+Streamlit ``AppTest`` 로 가상 세션 N 개를 한 프로세스(= 워커 하나)에서 동시에
+돌립니다. 세션마다 회원가입 → 로그인 → 자산 검색/추가 → 탭/기간 전환 → AI 분석
+→ (탭/기간 전환 반복) 순서로 스크립트를 다시 실행하고, 실행 한 번마다 걸린 시간을
+잽니다. 결과는 단계별 지연 백분위수, 초당 실행 수, 세션당 메모리(RSS 증가분)입니다.
+
+외부 호출은 모두 카세트(``benchmarks.cassettes``)로 바꿔 끼웁니다.
+``--cassette`` 를 주지 않으면 임시 카세트에 합성 시세(``FakeProvider``), 고정
+답변 LLM, 예제 뉴스 피드(``fixtures/news``)를 녹화해 네트워크 없이 돌립니다.
+합성 녹화본을 재생할 때도 ``--synthetic`` 을 주어야 녹화 때와 같은 피드 주소를 씁니다.
+처음 한 세션은 따로 돌려 캐시/카세트를 채우고(cold), 그 뒤 N 개를 함께 돌립니다.
+"""
+import argparse
+import contextlib
+import logging
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from benchmarks.cassettes import MODES, Cassette, install
+from benchmarks.fake_provider import FakeProvider
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_SCRIPT = os.path.join(ROOT, "app.py")
+NEWS_FIXTURES = os.path.join(ROOT, "fixtures", "news")
+# 세션마다 돌아가며 추가하는 종목 (종목 마스터에 있어 온라인 확인 없이 추가됨)
+SESSION_SYMBOLS = ["AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "META", "TSLA", "JPM"]
+PERIODS = ["6mo", "3mo", "1mo"]
+PASSWORD = "loadtest123"
+PERCENTILES = (50, 95, 99)
+
+
+def _rss():
+    """현재 RSS (바이트) - /proc 이 없으면 최대 RSS"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _CannedLLM:
+    """녹화용 고정 답변 LLM (오프라인 실행에서 Groq 대신)"""
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **request):
+        prompt = request["messages"][-1]["content"]
+        text = "\n\n".join(
+            f"### 분석 {i + 1}\n" + "지표와 추세를 종합하면 관망이 적절합니다. " * 8 for i in range(4)
+        ) + f"\n\n(요청 {len(prompt)}자)"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+                               usage=SimpleNamespace(total_tokens=len(text) // 2))
+
+
+def share_app_test_runtime(secrets):
+    """``AppTest`` 를 여러 스레드에서 동시에 돌릴 수 있게 전역 상태를 한 번만 설정
+
+    ``AppTest.run`` 은 실행마다 전역 ``Runtime`` 인스턴스, ``st.secrets``, 설정 값을
+    바꿔 끼웠다가 되돌리고 스크립트도 새로 컴파일하므로, 동시에 돌리면 서로의 실행
+    도중에 값이 사라집니다. 실제 서버처럼 런타임(캐시 저장소 포함)과 컴파일된
+    스크립트 하나를 모든 세션이 공유하게 합니다.
+    """
+    import streamlit as st
+    from streamlit import config
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    runtime = MagicMock(spec=app_test.Runtime)
+    runtime.media_file_mgr = app_test.MediaFileManager(app_test.MemoryMediaFileStorage("/mock/media"))
+    runtime.dataframe_source_mgr = app_test.DataframeSourceManager()
+    runtime.cache_storage_manager = app_test.MemoryCacheStorageManager()
+    components = app_test.BidiComponentManager()
+    components.discover_and_register_components(start_file_watching=False)
+    runtime.bidi_component_registry = components
+    app_test.Runtime._instance = runtime
+    # 실행마다 하는 대입/되돌리기는 가짜 네임스페이스에 떨어지게 함
+    app_test.Runtime = SimpleNamespace(_instance=runtime)
+    app_test.patch_config_options = lambda options: contextlib.nullcontext()
+    script_cache = app_test.ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+    config.set_option("global.appTest", True)
+
+    shared = app_test.Secrets()
+    shared._secrets = dict(secrets)
+    st.secrets = shared
+
+
+class Session:
+    """가상 사용자 한 명 - 실행(rerun)마다 ``(단계, 초)`` 기록"""
+
+    def __init__(self, name, symbol, rounds, timeout):
+        from streamlit.testing.v1 import AppTest
+
+        self.name = name
+        self.symbol = symbol
+        self.rounds = rounds
+        self.at = AppTest.from_file(APP_SCRIPT, default_timeout=timeout)
+        self.tab = None
+        self.timings = []
+        self.errors = []
+
+    def _step(self, label, action=None):
+        if action is not None:
+            try:
+                action(self.at)
+            except (KeyError, StopIteration):
+                # 시세가 없어(카세트에 없는 요청 등) 위젯이 그려지지 않은 경우
+                self.errors.append(f"{self.name}/{label}: 위젯 없음")
+                return
+        if self.tab is not None:
+            # AppTest 는 탭 선택을 위젯 상태로 들고 있지 않으므로 브라우저처럼 매번 보냄
+            self.at.session_state["main_tabs"] = self.tab
+        started = time.perf_counter()
+        self.at.run()
+        self.timings.append((label, time.perf_counter() - started))
+        self.errors.extend(f"{self.name}/{label}: {e.value}" for e in self.at.exception)
+
+    def _button(self, label):
+        return next(b for b in self.at.button if b.label == label)
+
+    def _text_input(self, label):
+        return next(t for t in self.at.text_input if t.label == label)
+
+    def _tab(self, title):
+        def select(at):
+            self.tab = title
+        return select
+
+    def run(self):
+        self._step("open")
+        self._step("register", lambda at: (
+            self._text_input("사용자명").input(self.name),
+            self._text_input("비밀번호").input(PASSWORD),
+            self._button("회원가입").click(),
+        ))
+        self._step("login", lambda at: self._button("로그인").click())
+        self._step("search", lambda at: self._text_input("심볼 또는 종목명").input(self.symbol))
+        self._step("add_asset", lambda at: self._button("추가").click())
+        tab = f"📈 {self.symbol}"
+        self._step("tab", self._tab(tab))
+        self._step("ai", lambda at: at.button(key=f"ai_{self.symbol}").click())
+        for i in range(self.rounds):
+            self._step("tab", self._tab("📊 대시보드"))
+            self._step("tab", self._tab(tab))
+            period = PERIODS[i % len(PERIODS)]
+            self._step("period", lambda at: at.selectbox(key=f"period_{self.symbol}").set_value(period))
+        return self
+
+
+def _percentiles(values):
+    return {p: float(np.percentile(values, p)) for p in PERCENTILES}
+
+
+def report(sessions, wall):
+    timings = [t for s in sessions for t in s.timings]
+    by_step = defaultdict(list)
+    for label, seconds in timings:
+        by_step[label].append(seconds)
+    header = " ".join(f"{f'p{p}':>9}" for p in PERCENTILES)
+    print(f"  {'step':<10} {'runs':>5} {header} {'max':>9}  (ms)")
+    for label, values in [("all", [s for _, s in timings]), *by_step.items()]:
+        shown = " ".join(f"{v * 1000:9.1f}" for v in _percentiles(values).values())
+        print(f"  {label:<10} {len(values):>5} {shown} {max(values) * 1000:9.1f}")
+    print(f"  throughput: {len(timings) / wall:.1f} reruns/s ({len(timings)} reruns in {wall:.1f} s)")
+    errors = [e for s in sessions for e in s.errors]
+    if errors:
+        print(f"  errors: {len(errors)} (first: {errors[0]})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=3, help="세션마다 반복하는 탭/기간 전환 횟수")
+    parser.add_argument("--cassette", help="카세트 디렉터리 (없으면 임시 디렉터리에 합성 데이터 녹화)")
+    parser.add_argument("--mode", choices=MODES, default=None, help="카세트 모드 (기본: --cassette 가 있으면 replay)")
+    parser.add_argument("--synthetic", action="store_true",
+                        help="녹화할 때 실제 제공자 대신 합성 시세/고정 답변/예제 피드 사용 (--cassette 가 없으면 항상)")
+    parser.add_argument("--latency", type=float, default=0.0, help="재생할 때 외부 요청마다 더하는 지연 (초)")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="AI 스트림 조각 사이 지연 (초)")
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    workdir = tempfile.mkdtemp(prefix="bench_sessions_")
+    directory = os.path.abspath(args.cassette) if args.cassette else os.path.join(workdir, "cassette")
+    synthetic = args.synthetic or not args.cassette
+    cassette = Cassette(directory, args.mode or ("replay" if args.cassette else "auto"), args.latency)
+    secrets = {"GROQ_API_KEY": os.environ.get("GROQ_API_KEY", "cassette")}
+    if synthetic:
+        install(cassette, yf_upstream=FakeProvider.on_demand(), llm_client=_CannedLLM(),
+                chunk_delay=args.chunk_delay)
+        secrets.update(NEWS_FEEDS=[os.path.join(NEWS_FIXTURES, "market.xml")],
+                       NEWS_SYMBOL_FEED_URL=os.path.join(NEWS_FIXTURES, "{symbol}.xml"))
+    else:
+        install(cassette, chunk_delay=args.chunk_delay)
+
+    # 사용자 DB, 시세 저장소, 뉴스 인덱스는 빈 상태에서 시작 (카세트 요청이 녹화 때와 같도록)
+    os.chdir(workdir)
+    share_app_test_runtime(secrets)
+    print(f"workdir: {workdir}, cassette: {cassette.directory} ({cassette.mode})")
+
+    started_rss = _rss()
+    started = time.perf_counter()
+    cold = Session("cold", SESSION_SYMBOLS[0], args.rounds, args.timeout).run()
+    cold_wall = time.perf_counter() - started
+    print(f"cold session ({cold_wall:.1f} s)")
+    report([cold], cold_wall)
+    warm_rss = _rss()
+
+    sessions = [
+        Session(f"user{i:03d}", SESSION_SYMBOLS[i % len(SESSION_SYMBOLS)], args.rounds, args.timeout)
+        for i in range(args.sessions)
+    ]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions, thread_name_prefix="session") as pool:
+        list(pool.map(Session.run, sessions))
+    wall = time.perf_counter() - started
+    print(f"{args.sessions} concurrent sessions ({threading.active_count()} threads alive after)")
+    report(sessions, wall)
+    # 세션 상태(AppTest)를 살려 둔 채로 잼 - 열려 있는 세션의 메모리
+    ended_rss = _rss()
+    print(f"  memory: process {ended_rss / 2**20:.0f} MiB (start {started_rss / 2**20:.0f} MiB, "
+          f"after cold session {warm_rss / 2**20:.0f} MiB), "
+          f"{(ended_rss - warm_rss) / max(args.sessions, 1) / 2**20:.1f} MiB per session")
+    print(f"  cassette: {dict(cassette.stats)}")
+    sys.stdout.flush()
+    # 백그라운드 스레드(시세 폴러, 뉴스 수집기 등)를 기다리지 않고 종료
+    os._exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""공유 프레임 캐시 - 워커 수에 따른 적중 지연과 메모리
+
+    python -m benchmarks.bench_shared_cache --workers 1 2 4 8 --symbols 200
+
+워커 프로세스 W 개가 같은 프레임 S 개(합성 OHLCV + 지표 열)를 읽는 상황을 두
+방식으로 잽니다.
+
+- ``shared`` - ``SharedFrameCache`` (Arrow IPC 메모리 맵, 모든 워커가 한 벌 공유)
+- ``pickle`` - 워커마다 자기 사본을 두고 적중할 때마다 역직렬화 (``st.cache_data`` 방식)
+
+적중 지연은 무작위 키 조회의 p50/p99, 메모리는 프레임을 모두 읽은 뒤 워커별
+고유 메모리(Private) 증가분과 전체 PSS(공유 페이지를 나눠 센 합) 증가분입니다.
+"""
+import argparse
+import multiprocessing
+import os
+import pickle
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_ohlcv
+from shared_cache import SHARED_CACHE_DIR, SharedFrameCache, cache_key
+
+# 지표 프레임 흉내로 붙이는 열 수
+EXTRA_COLUMNS = 14
+
+
+def _memory():
+    """``(Private, Pss)`` 바이트 - /proc/self/smaps_rollup"""
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    return values["Private_Clean"] + values["Private_Dirty"], values["Pss"]
+
+
+def make_frame(i, n_bars):
+    df = make_ohlcv(n_bars, seed=i + 1)
+    rng = np.random.default_rng(i)
+    for j in range(EXTRA_COLUMNS):
+        df[f"X{j}"] = rng.normal(size=n_bars)
+    return df
+
+
+def _worker(mode, root, blobs, keys, hits, start, results):
+    rng = np.random.default_rng(os.getpid())
+    private_before, pss_before = _memory()
+    if mode == "shared":
+        cache = SharedFrameCache(root)
+        get = cache.get
+    else:
+        # 워커 자기 사본 (cache_data 가 프로세스마다 들고 있는 직렬화본)
+        local = {key: bytearray(blob) for key, blob in zip(keys, blobs)}
+
+        def get(key):
+            return pickle.loads(local[key])
+    views = [get(key) for key in keys]
+    start.wait()
+    latencies = np.empty(hits)
+    for i, key in enumerate(rng.choice(keys, size=hits)):
+        started = time.perf_counter()
+        df = get(key)
+        latencies[i] = time.perf_counter() - started
+    assert df is not None and views
+    private_after, pss_after = _memory()
+    results.put((latencies, private_after - private_before, pss_after - pss_before))
+
+
+def run(mode, workers, root, blobs, keys, hits):
+    context = multiprocessing.get_context("fork")
+    start = context.Barrier(workers)
+    results = context.Queue()
+    processes = [context.Process(target=_worker, args=(mode, root, blobs, keys, hits, start, results))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    latencies = np.concatenate([c[0] for c in collected])
+    private = np.mean([c[1] for c in collected])
+    pss = sum(c[2] for c in collected)
+    return np.percentile(latencies, 50), np.percentile(latencies, 99), private, pss
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--bars", type=int, default=2520)
+    parser.add_argument("--hits", type=int, default=20000)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="bench_frames_", dir=os.path.dirname(SHARED_CACHE_DIR))
+    try:
+        cache = SharedFrameCache(root)
+        keys, blobs = [], []
+        started = time.perf_counter()
+        for i in range(args.symbols):
+            df = make_frame(i, args.bars)
+            key = cache_key("indicators", f"SYM{i:04d}", "10y", "1d")
+            cache.put(key, df)
+            keys.append(key)
+            blobs.append(pickle.dumps(df))
+        entries, total = cache.usage()
+        print(f"{entries} frames x {args.bars} bars, {total / 2**20:.1f} MiB in {root} "
+              f"(filled in {time.perf_counter() - started:.1f} s)")
+
+        print(f"  {'mode':<7} {'workers':>7} {'hit p50':>10} {'hit p99':>10} {'private/worker':>15} {'total PSS':>10}")
+        for mode in ("shared", "pickle"):
+            for workers in args.workers:
+                p50, p99, private, pss = run(mode, workers, root, blobs, keys, args.hits)
+                print(f"  {mode:<7} {workers:>7} {p50 * 1e6:>8.1f}us {p99 * 1e6:>8.1f}us "
+                      f"{private / 2**20:>11.1f} MiB {pss / 2**20:>6.1f} MiB")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""콜드 스타트 - 모듈별 import 시간과 서버 시작 후 첫 화면(로그인)까지 걸리는 시간
+
+    python -m benchmarks.bench_startup --runs 3
+
+import 시간은 모듈마다 새 인터프리터에서 잽니다. 첫 화면 시간은
+``streamlit run app.py`` 를 띄운 뒤 웹소켓으로 세션을 열어 스크립트 실행이
+끝날 때까지(script_finished)를 재며, 같은 서버에 두 번째 세션도 열어 비교합니다.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    "streamlit", "pandas", "yfinance", "plotly.graph_objects", "scipy.signal", "scipy.stats", "ta",
+    "reportlab.platypus", "groq",
+    "market_data", "bar_store", "indicators", "charts", "analysis", "news_store", "screener", "backtest",
+    "risk", "reports",
+]
+
+
+def import_time(module):
+    """새 인터프리터에서 ``module`` 을 불러오는 데 걸린 시간 (초, 없으면 None)"""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    return float(result.stdout) if result.returncode == 0 else None
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _first_render(port):
+    """세션 하나를 열어 첫 스크립트 실행이 끝날 때까지 걸린 시간"""
+    import websockets
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+    async with websockets.connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"],
+                                  max_size=None) as ws:
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        started = time.perf_counter()
+        await ws.send(message.SerializeToString())
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await ws.recv())
+            if forward.WhichOneof("type") == "script_finished":
+                return time.perf_counter() - started
+
+
+def server_start(timeout=60):
+    """``(서버 준비까지, 첫 세션 화면, 두 번째 세션 화면)`` 초"""
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "app.py", "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            if time.perf_counter() - started > timeout:
+                raise TimeoutError("서버가 시작되지 않았습니다.")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                    break
+            except OSError:
+                time.sleep(0.05)
+        ready = time.perf_counter() - started
+        first = asyncio.run(_first_render(port))
+        second = asyncio.run(_first_render(port))
+        return ready, first, second
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--skip-imports", action="store_true")
+    args = parser.parse_args()
+
+    if not args.skip_imports:
+        print("import time (fresh interpreter, best of runs)")
+        for module in MODULES:
+            times = [import_time(module) for _ in range(args.runs)]
+            shown = f"{min(times) * 1000:9.1f} ms" if None not in times else "  not installed"
+            print(f"  {module:<26}: {shown}")
+
+    results = [server_start() for _ in range(args.runs)]
+    print(f"streamlit run app.py ({args.runs} runs, best)")
+    for label, values in zip(("server ready", "first session render", "second session render"), zip(*results)):
+        print(f"  {label:<26}: {min(values) * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""종목 마스터 - 인덱스 구축과 정확/접두사/오타 검색 시간 (조회당 마이크로초)
+
+    python -m benchmarks.bench_symbols --instruments 200000
+"""
+import argparse
+import string
+import time
+
+import numpy as np
+
+from symbol_master import ASSET_TYPES, Instrument, SymbolIndex
+
+WORDS = ["Global", "Holdings", "Technologies", "Energy", "Capital", "Pharma", "Systems", "Bank", "Motors",
+         "Foods", "Networks", "Semiconductor", "Realty", "Insurance", "Media", "Logistics"]
+SYLLABLES = list("가나다라마바사아자차카타파하삼성현대전자화학바이오에너지")
+
+
+def make_instruments(n, seed=0):
+    """합성 종목 - 1~5 글자 심볼, 영문/한글 이름"""
+    rng = np.random.default_rng(seed)
+    letters = np.array(list(string.ascii_uppercase))
+    instruments, seen = [], set()
+    while len(instruments) < n:
+        symbol = "".join(rng.choice(letters, size=int(rng.integers(1, 6))))
+        if symbol in seen:
+            continue
+        seen.add(symbol)
+        name = f"{symbol.title()} {' '.join(rng.choice(WORDS, size=2))}"
+        name_ko = "".join(rng.choice(SYLLABLES, size=int(rng.integers(2, 6))))
+        instruments.append(Instrument(symbol, name, name_ko, "SYN", ASSET_TYPES[len(instruments) % 3]))
+    return instruments
+
+
+def _per_call(func, queries):
+    started = time.perf_counter()
+    for query in queries:
+        func(query)
+    return (time.perf_counter() - started) / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--instruments", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=5000)
+    args = parser.parse_args()
+
+    instruments = make_instruments(args.instruments)
+    started = time.perf_counter()
+    index = SymbolIndex(instruments)
+    build = time.perf_counter() - started
+
+    rng = np.random.default_rng(1)
+    picks = [instruments[i] for i in rng.integers(0, len(instruments), args.queries)]
+    symbols = [i.symbol for i in picks]
+    prefixes = [s[:2] for s in symbols]
+    names = [i.name_ko[:2] for i in picks]
+    # 한 글자를 바꾼 오타 (3 글자 이상 심볼)
+    typos = [s[:1] + ("Q" if s[1] != "Q" else "X") + s[2:] for s in symbols if len(s) >= 3]
+
+    # 첫 오타 검색이 삭제 변형 인덱스를 만듦
+    started = time.perf_counter()
+    index.search(typos[0])
+    fuzzy_build = time.perf_counter() - started
+
+    print(f"{len(index)} instruments, build {build * 1000:.0f} ms, typo index {fuzzy_build * 1000:.0f} ms")
+    print(f"  get (exact)          : {_per_call(index.get, symbols) * 1e6:8.1f} us")
+    print(f"  search prefix        : {_per_call(index.search, prefixes) * 1e6:8.1f} us")
+    print(f"  search prefix + type : {_per_call(lambda q: index.search(q, 'etf'), prefixes) * 1e6:8.1f} us")
+    print(f"  search Korean name   : {_per_call(index.search, names) * 1e6:8.1f} us")
+    print(f"  search typo          : {_per_call(index.search, typos) * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""외부 호출 녹화/재생 (카세트)
+
+yfinance(``Ticker(...).history/info/news``, ``download``), Groq 채팅 API,
+뉴스 피드(``feedparser.parse``) 응답을 요청 인자별 파일로 저장해 두고 그대로
+돌려줍니다. 네트워크 없이 같은 응답으로 앱 전체를 돌릴 수 있어 부하 테스트나
+회귀 확인을 반복해도 결과가 흔들리지 않습니다.
+
+    # 네트워크/키가 있을 때 한 번 녹화 (앱을 쓰는 동안 오간 응답이 저장됨)
+    install(Cassette("cassettes/default", mode="record"))
+    # 이후에는 오프라인으로 재생 (녹화에 없는 요청은 실패로 처리)
+    install(Cassette("cassettes/default"))
+
+모드
+
+- ``replay`` - 녹화된 응답만 사용, 없으면 ``CassetteMiss``
+- ``record`` - 항상 원래 제공자를 불러 덮어씀
+- ``auto`` - 녹화가 있으면 재생, 없으면 원래 제공자를 불러 녹화
+
+DataFrame 은 parquet, 나머지는 JSON 으로 ``{종류}-{인자 해시}`` 파일에 저장합니다.
+증분 조회(``start=마지막 바``)는 저장소 상태에 따라 인자가 달라지므로 재생할
+때는 녹화할 때처럼 빈 ``BarStore`` 에서 시작해야 같은 요청이 나옵니다.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+import pandas as pd
+
+MODES = ("replay", "record", "auto")
+# 재생 스트림을 나누는 조각 크기 (글자 수)
+STREAM_CHUNK_CHARS = 40
+
+# install() 이 바꿔 끼운 원래 객체 {(모듈, 이름): 값}
+_ORIGINALS = {}
+
+
+class CassetteMiss(KeyError):
+    """재생 모드에서 녹화에 없는 요청"""
+
+
+def _default(value):
+    """JSON 으로 바로 못 쓰는 값 (Timestamp, 예외 객체 등) 은 문자열로"""
+    return str(value)
+
+
+class Cassette:
+    """요청 키별 응답 파일 디렉터리 - 한 번 읽은 응답은 메모리에 둠"""
+
+    def __init__(self, directory, mode="replay", latency=0.0):
+        if mode not in MODES:
+            raise ValueError(f"알 수 없는 모드: {mode!r} ({', '.join(MODES)})")
+        self.directory = directory
+        self.mode = mode
+        # 재생할 때 요청마다 더하는 지연 (네트워크 흉내, 초)
+        self.latency = latency
+        self.stats = Counter()
+        self._entries = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(kind, *parts):
+        digest = hashlib.sha1(json.dumps(parts, sort_keys=True, default=_default).encode()).hexdigest()
+        return f"{kind}-{digest[:16]}"
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, f"{key}{suffix}")
+
+    def _load(self, key, suffix):
+        path = self._path(key, suffix)
+        if not os.path.exists(path):
+            return None
+        if suffix == ".parquet":
+            return pd.read_parquet(path)
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save(self, key, suffix, value):
+        path = self._path(key, suffix)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        if suffix == ".parquet":
+            value.to_parquet(tmp)
+        else:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False, default=_default)
+        os.replace(tmp, path)
+
+    def _lookup(self, key, suffix, fetch):
+        if self.mode != "record":
+            with self._lock:
+                value = self._entries.get(key)
+            if value is None:
+                value = self._load(key, suffix)
+            if value is not None:
+                with self._lock:
+                    self._entries[key] = value
+                    self.stats["hits"] += 1
+                if self.latency:
+                    time.sleep(self.latency)
+                return value
+            if self.mode == "replay":
+                with self._lock:
+                    self.stats["misses"] += 1
+                raise CassetteMiss(key)
+        value = fetch()
+        self._save(key, suffix, value)
+        with self._lock:
+            self._entries[key] = value
+            self.stats["recorded"] += 1
+        return value
+
+    def frame(self, key, fetch):
+        """DataFrame 응답 (재생본은 호출마다 복사해서 돌려줌)"""
+        df = self._lookup(key, ".parquet", lambda: _as_frame(fetch()))
+        return df.copy()
+
+    def value(self, key, fetch):
+        """JSON 으로 저장할 수 있는 응답"""
+        return self._lookup(key, ".json", lambda: json.loads(json.dumps(fetch(), default=_default)))
+
+
+def _as_frame(df):
+    return df if df is not None else pd.DataFrame()
+
+
+class CassetteProvider:
+    """yfinance 와 같은 인터페이스(``Ticker``, ``download``)의 녹화/재생 제공자
+
+    ``upstream`` 은 녹화할 때 부를 원래 제공자 (기본 yfinance 모듈)
+    """
+
+    def __init__(self, cassette, upstream=None):
+        self.cassette = cassette
+        self.upstream = upstream
+
+    def _upstream(self):
+        if self.upstream is None:
+            import yfinance
+            self.upstream = yfinance
+        return self.upstream
+
+    def Ticker(self, symbol):
+        return _Ticker(self, symbol)
+
+    def download(self, symbols, period="1mo", interval="1d", start=None, end=None, **kwargs):
+        if isinstance(symbols, str):
+            symbols = symbols.split()
+        symbols = list(symbols)
+        key = Cassette.key("download", symbols, period, interval, start, end)
+        return self.cassette.frame(key, lambda: self._upstream().download(
+            symbols, period=period, interval=interval, start=start, end=end, **kwargs))
+
+
+class _Ticker:
+    def __init__(self, provider, symbol):
+        self.provider = provider
+        self.symbol = symbol
+
+    def _real(self):
+        return self.provider._upstream().Ticker(self.symbol)
+
+    def history(self, period="1mo", interval="1d", start=None, end=None, **kwargs):
+        key = Cassette.key("history", self.symbol, period, interval, start, end)
+        return self.provider.cassette.frame(key, lambda: self._real().history(
+            period=period, interval=interval, start=start, end=end, **kwargs))
+
+    @property
+    def info(self):
+        return self.provider.cassette.value(Cassette.key("info", self.symbol), lambda: self._real().info or {})
+
+    @property
+    def news(self):
+        return self.provider.cassette.value(Cassette.key("news", self.symbol), lambda: self._real().news or [])
+
+
+class CassetteLLM:
+    """Groq 클라이언트 대역 - ``chat.completions.create`` 만 흉내 냄
+
+    키는 요청 본문(``stream`` 제외), 녹화는 ``client`` (원래 Groq 클라이언트) 로 합니다.
+    스트리밍 요청은 저장된 답을 ``STREAM_CHUNK_CHARS`` 글자씩 나눠 돌려줍니다.
+    """
+
+    def __init__(self, cassette, client=None, chunk_delay=0.0):
+        self.cassette = cassette
+        self.client = client
+        # 재생할 때 스트림 조각 사이 지연 (토큰 생성 속도 흉내, 초)
+        self.chunk_delay = chunk_delay
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def _record(self, request):
+        if self.client is None:
+            raise CassetteMiss("녹화할 LLM 클라이언트가 없습니다")
+        completion = self.client.chat.completions.create(**request)
+        usage = getattr(completion, "usage", None)
+        return {"text": completion.choices[0].message.content or "",
+                "total_tokens": getattr(usage, "total_tokens", None)}
+
+    def create(self, stream=False, **request):
+        key = Cassette.key("llm", request)
+        saved = self.cassette.value(key, lambda: self._record(request))
+        if stream:
+            return self._stream(saved["text"])
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=saved["text"]))],
+            usage=SimpleNamespace(total_tokens=saved["total_tokens"]),
+        )
+
+    def _stream(self, text):
+        for start in range(0, len(text), STREAM_CHUNK_CHARS):
+            if self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            delta = SimpleNamespace(content=text[start:start + STREAM_CHUNK_CHARS])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+class CassetteFeeds:
+    """``feedparser.parse`` 대역 - 조건부 요청 인자(etag/modified)는 무시하고 피드 주소로만 녹화"""
+
+    def __init__(self, cassette, parse=None):
+        self.cassette = cassette
+        self.upstream = parse
+
+    def _fetch(self, url):
+        if self.upstream is None:
+            raise CassetteMiss("녹화할 피드 파서가 없습니다")
+        parsed = self.upstream(url)
+        return {
+            "status": parsed.get("status"),
+            "etag": parsed.get("etag"),
+            "modified": parsed.get("modified"),
+            "bozo": bool(parsed.get("bozo")),
+            "feed": {"title": parsed.get("feed", {}).get("title")},
+            "entries": [dict(entry) for entry in parsed.get("entries", [])],
+        }
+
+    def parse(self, url, etag=None, modified=None, **kwargs):
+        return self.cassette.value(Cassette.key("feed", url), lambda: self._fetch(url))
+
+
+def _patch(module, name, value):
+    _ORIGINALS.setdefault((module, name), getattr(module, name))
+    setattr(module, name, value)
+
+
+def install(cassette, yf_upstream=None, llm_client=None, chunk_delay=0.0):
+    """yfinance / groq / feedparser 를 카세트로 바꿔 끼움 (앱을 불러오기 전에 호출)
+
+    녹화할 때 부를 원래 제공자는 인자로 넘기며, 없으면 바꾸기 전의 실제 라이브러리를
+    씁니다 (Groq 는 앱이 넘기는 API 키로 만듦). ``uninstall()`` 로 되돌립니다.
+    """
+    import yfinance
+
+    if yf_upstream is None:
+        yf_upstream = SimpleNamespace(Ticker=_ORIGINALS.get((yfinance, "Ticker"), yfinance.Ticker),
+                                      download=_ORIGINALS.get((yfinance, "download"), yfinance.download))
+    provider = CassetteProvider(cassette, yf_upstream)
+    _patch(yfinance, "Ticker", provider.Ticker)
+    _patch(yfinance, "download", provider.download)
+
+    try:
+        import groq
+    except ImportError:
+        groq = None
+    if groq is not None:
+        real_groq = _ORIGINALS.get((groq, "Groq"), groq.Groq)
+
+        def make_client(*args, **kwargs):
+            client = llm_client if llm_client is not None else (
+                real_groq(*args, **kwargs) if cassette.mode != "replay" else None)
+            return CassetteLLM(cassette, client, chunk_delay)
+
+        _patch(groq, "Groq", make_client)
+
+    try:
+        import feedparser
+    except ImportError:
+        feedparser = None
+    if feedparser is not None:
+        feeds = CassetteFeeds(cassette, _ORIGINALS.get((feedparser, "parse"), feedparser.parse))
+        _patch(feedparser, "parse", feeds.parse)
+    return provider
+
+
+def uninstall():
+    """``install`` 전 상태로 되돌림"""
+    for (module, name), value in _ORIGINALS.items():
+        setattr(module, name, value)
+    _ORIGINALS.clear()
@@ -0,0 +1,149 @@
+"""오프라인 벤치마크용 yfinance 대역
+
+``download``/``Ticker(symbol).history`` 를 yfinance 와 같은 모양으로 흉내 내며,
+시세는 미리 받아 둔(녹화한) parquet 또는 합성 데이터에서 잘라 돌려줍니다.
+``market_data`` 의 ``provider`` 인자나 ``BarStore(provider=...)`` 로 넘겨 씁니다.
+
+    # 네트워크가 될 때 한 번 녹화
+    FakeProvider.record(["AAPL", "MSFT"], period="5y").save("recordings")
+    # 이후에는 오프라인으로 재생
+    provider = FakeProvider.load("recordings")
+"""
+import os
+import threading
+import time
+import zlib
+from collections import Counter
+
+import pandas as pd
+
+from bar_store import slice_period
+from benchmarks.synthetic import make_ohlcv
+
+
+class FakeProvider:
+    """심볼별 전체 이력을 들고 있다가 요청한 구간만 돌려주는 가짜 시세 제공자"""
+
+    def __init__(self, frames, latency=0.0):
+        self.frames = frames
+        # 요청 한 번마다 더하는 지연 (네트워크 흉내, 초)
+        self.latency = latency
+        self.calls = Counter()
+        # 처음 보는 심볼의 이력을 만드는 함수 (``on_demand``)
+        self.generate = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def synthetic(cls, symbols, n_bars=2520, seed=0, end=None, latency=0.0):
+        """합성 일봉 - 같은 seed 면 항상 같은 값, 마지막 바는 ``end`` (기본: 오늘)"""
+        end = pd.Timestamp(end or pd.Timestamp.today().normalize())
+        frames = {}
+        for i, symbol in enumerate(symbols):
+            df = make_ohlcv(n_bars, seed=seed + i + 1)
+            df.index = pd.bdate_range(end=end, periods=n_bars)
+            frames[symbol] = df
+        return cls(frames, latency)
+
+    @classmethod
+    def on_demand(cls, n_bars=2520, end=None, latency=0.0):
+        """어떤 심볼이든 처음 요청할 때 합성 일봉을 만듦 (심볼 이름으로 seed 를 정해 항상 같은 값)"""
+        end = pd.Timestamp(end or pd.Timestamp.today().normalize())
+        provider = cls({}, latency)
+
+        def generate(symbol):
+            df = make_ohlcv(n_bars, seed=zlib.crc32(symbol.encode()))
+            df.index = pd.bdate_range(end=end, periods=n_bars)
+            return df
+
+        provider.generate = generate
+        return provider
+
+    @classmethod
+    def record(cls, symbols, period="5y", interval="1d", provider=None):
+        """실제 제공자(기본 yfinance)에서 받아 녹화"""
+        from market_data import fetch_history_batch
+
+        return cls(fetch_history_batch(symbols, period, interval, provider))
+
+    @classmethod
+    def load(cls, directory, latency=0.0):
+        """``save`` 로 저장한 ``{symbol}.parquet`` 들을 읽어 재생"""
+        frames = {
+            name[:-len(".parquet")]: pd.read_parquet(os.path.join(directory, name))
+            for name in sorted(os.listdir(directory)) if name.endswith(".parquet")
+        }
+        return cls(frames, latency)
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for symbol, df in self.frames.items():
+            df.to_parquet(os.path.join(directory, f"{symbol}.parquet"))
+
+    def history(self, symbol, period="1mo", interval="1d", start=None, end=None, **kwargs):
+        with self._lock:
+            self.calls["history"] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self._slice(symbol, period, start, end)
+
+    def _frame(self, symbol):
+        df = self.frames.get(symbol)
+        if df is None and self.generate is not None:
+            with self._lock:
+                df = self.frames.setdefault(symbol, self.generate(symbol))
+        return df
+
+    def _slice(self, symbol, period, start=None, end=None):
+        df = self._frame(symbol)
+        if df is None:
+            return pd.DataFrame()
+        if start is not None:
+            df = df[df.index >= _align(start, df.index)]
+        if end is not None:
+            df = df[df.index < _align(end, df.index)]
+        if start is not None or end is not None:
+            return df
+        return slice_period(df, period or "max")
+
+    def Ticker(self, symbol):
+        return _Ticker(self, symbol)
+
+    def download(self, symbols, period="1mo", interval="1d", start=None, end=None, group_by="ticker", **kwargs):
+        if isinstance(symbols, str):
+            symbols = symbols.split()
+        with self._lock:
+            self.calls["download"] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        frames = {s: self._slice(s, period, start, end) for s in symbols}
+        frames = {s: df for s, df in frames.items() if not df.empty}
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1)
+
+
+class _Ticker:
+    def __init__(self, provider, symbol):
+        self.provider = provider
+        self.symbol = symbol
+
+    def history(self, period="1mo", interval="1d", start=None, end=None, **kwargs):
+        return self.provider.history(self.symbol, period, interval, start, end, **kwargs)
+
+    @property
+    def info(self):
+        return {"symbol": self.symbol, "shortName": self.symbol}
+
+    @property
+    def news(self):
+        return []
+
+
+def _align(value, index):
+    """``start``/``end`` 를 시간축의 시간대에 맞춤"""
+    value = pd.Timestamp(value)
+    if index.tz is not None and value.tzinfo is None:
+        return value.tz_localize(index.tz)
+    if index.tz is None and value.tzinfo is not None:
+        return value.tz_localize(None)
+    return value
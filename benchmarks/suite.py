@@ -0,0 +1,207 @@
+"""핫 패스 마이크로 벤치마크 모음 - 기준값(baseline.json)과 비교해 느려진 항목 표시
+
+    python -m benchmarks.suite                      # 기준값과 비교
+    python -m benchmarks.suite --save               # 현재 결과를 기준값으로 저장
+    python -m benchmarks.suite --max-bars 10000000  # 1천만 바까지
+    python -m benchmarks.suite --only user_store --check  # 일부만, 느려졌으면 종료 코드 1
+
+네트워크 없이 합성 OHLCV 와 ``FakeProvider`` 만 사용합니다. 시간은 반복 중
+가장 빠른 값이고, 기준값은 같은 기계에서 저장한 것과 비교해야 의미가 있습니다.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from analysis import perform_technical_analysis
+from bar_store import BarStore
+from benchmarks.fake_provider import FakeProvider
+from benchmarks.synthetic import make_ohlcv
+from charts import create_chart
+from indicators import calculate_indicators
+from user_store import UserStore
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+SIZES = [100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+# 이 크기부터는 한 번만 잼
+LARGE_BARS = 1_000_000
+# 기준값보다 이 배수 이상 느리거나 크면 회귀로 표시
+TOLERANCE = 1.3
+
+
+def _timed(func, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def bench_indicators(sizes, repeat):
+    """calculate_indicators / create_chart / perform_technical_analysis - 바 수별"""
+    results = {}
+    for n_bars in sizes:
+        runs = repeat if n_bars < LARGE_BARS else 1
+        df = make_ohlcv(n_bars)
+        seconds, indicators = _timed(lambda: calculate_indicators(df), runs)
+        results[f"calculate_indicators/{n_bars}"] = {"seconds": seconds}
+
+        seconds, fig = _timed(lambda: create_chart(indicators, "SYN"), runs)
+        serialize, payload = _timed(fig.to_json, runs)
+        results[f"create_chart/{n_bars}"] = {"seconds": seconds, "json_bytes": len(payload)}
+        results[f"create_chart.to_json/{n_bars}"] = {"seconds": serialize}
+
+        seconds, _ = _timed(lambda: perform_technical_analysis(indicators, "SYN"), runs)
+        results[f"perform_technical_analysis/{n_bars}"] = {"seconds": seconds}
+    return results
+
+
+def bench_stock_data(n_symbols, repeat, period="1y"):
+    """get_stock_data 경로 (BarStore.get_bars) - 녹화된/합성 시세를 FakeProvider 로 재생"""
+    symbols = [f"SYM{i:04d}" for i in range(n_symbols)]
+    provider = FakeProvider.synthetic(symbols, n_bars=2520)
+    results = {}
+    with tempfile.TemporaryDirectory() as root:
+        store = BarStore(root, provider=provider)
+        seconds, _ = _timed(lambda: [store.get_bars(s, period) for s in symbols], 1)
+        results[f"get_stock_data.cold/{n_symbols}"] = {"seconds": seconds}
+        seconds, _ = _timed(lambda: [store.get_bars(s, period) for s in symbols], repeat)
+        results[f"get_stock_data.warm/{n_symbols}"] = {"seconds": seconds}
+        # 갱신 주기가 지난 상태 - 마지막 바 이후만 조회해 병합
+        stale = BarStore(root, provider=provider, refresh_interval=0)
+        seconds, _ = _timed(lambda: [stale.get_bars(s, period) for s in symbols], repeat)
+        results[f"get_stock_data.delta/{n_symbols}"] = {"seconds": seconds}
+        seconds, _ = _timed(lambda: stale.update_many(symbols, "1d", period), repeat)
+        results[f"get_stock_data.batch/{n_symbols}"] = {"seconds": seconds}
+    return results
+
+
+def _legacy_users(n_users, seed=0):
+    """기존 user_data.json 형식의 사용자 레코드"""
+    rng = np.random.default_rng(seed)
+    universe = [f"SYM{i:04d}" for i in range(200)]
+    users = {}
+    for i in range(n_users):
+        watched = [str(s) for s in rng.choice(universe, size=8, replace=False)]
+        users[f"user{i:05d}"] = {
+            "password": "0" * 64,
+            "created_at": "2024-01-01T00:00:00",
+            "is_admin": False,
+            "portfolios": {"stocks": watched[:5], "crypto": watched[5:7], "etf": watched[7:]},
+            "portfolio": {s: {"shares": 10.0, "buy_price": 100.0} for s in watched[:4]},
+        }
+    return users
+
+
+def bench_user_store(n_users, repeat):
+    """save_user_data/load_user_data 를 대신하는 UserStore - 사용자 수별"""
+    results = {}
+    users = _legacy_users(n_users)
+    with tempfile.TemporaryDirectory() as root:
+        legacy = os.path.join(root, "user_data.json")
+        with open(legacy, "w", encoding="utf-8") as f:
+            json.dump(users, f)
+
+        store = UserStore(os.path.join(root, "users.db"))
+        seconds, _ = _timed(lambda: store.import_json(legacy), 1)
+        results[f"user_store.import_json/{n_users}"] = {"seconds": seconds}
+        # 포트폴리오 저장 한 번 = 예전의 save_user_data 한 번
+        seconds, _ = _timed(lambda: [store.set_holding(u, "SYM0000", 1.0, 1.0) for u in users], repeat)
+        results[f"user_store.save/{n_users}"] = {"seconds": seconds}
+        seconds, _ = _timed(lambda: [store.get_user(u) for u in users], repeat)
+        results[f"user_store.load/{n_users}"] = {"seconds": seconds}
+        seconds, _ = _timed(store.watched_symbols, repeat)
+        results[f"user_store.watched_symbols/{n_users}"] = {"seconds": seconds}
+    return results
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "saved_at": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """``{name: [(지표, 현재, 기준, 배수, 회귀 여부)]}``"""
+    report = {}
+    for name, metrics in results.items():
+        rows = []
+        for metric, value in metrics.items():
+            base = baseline.get(name, {}).get(metric)
+            ratio = value / base if base else None
+            rows.append((metric, value, base, ratio, ratio is not None and ratio > tolerance))
+        report[name] = rows
+    return report
+
+
+def _format(metric, value):
+    if value is None:
+        return "-"
+    if metric == "seconds":
+        return f"{value * 1000:.2f} ms"
+    return f"{value / 1024:.1f} KB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-bars", type=int, default=100_000)
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", choices=["indicators", "stock_data", "user_store"], action="append",
+                        help="일부 그룹만 (indicators 는 차트/분석 포함)")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save", action="store_true", help="결과를 기준값으로 저장")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--check", action="store_true", help="회귀가 있으면 종료 코드 1")
+    args = parser.parse_args()
+
+    groups = set(args.only or ["indicators", "stock_data", "user_store"])
+    results = {}
+    if "indicators" in groups:
+        results.update(bench_indicators([n for n in SIZES if n <= args.max_bars], args.repeat))
+    if "stock_data" in groups:
+        results.update(bench_stock_data(args.symbols, args.repeat))
+    if "user_store" in groups:
+        results.update(bench_user_store(args.users, args.repeat))
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f).get("results", {})
+
+    regressions = 0
+    print(f"{'benchmark':<38} {'metric':<10} {'current':>12} {'baseline':>12} {'ratio':>7}")
+    for name, rows in compare(results, baseline, args.tolerance).items():
+        for metric, value, base, ratio, regressed in rows:
+            regressions += regressed
+            shown = f"{ratio:6.2f}x" if ratio is not None else "      -"
+            print(f"{name:<38} {metric:<10} {_format(metric, value):>12} {_format(metric, base):>12} {shown}"
+                  + ("  REGRESSION" if regressed else ""))
+
+    if args.save:
+        # 이번에 재지 않은 항목은 기존 기준값 유지
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "results": {**baseline, **results}}, f, indent=2, sort_keys=True)
+        print(f"saved baseline: {args.baseline}")
+    if regressions:
+        print(f"{regressions} regression(s) over {args.tolerance:.2f}x")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
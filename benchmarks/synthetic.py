@@ -0,0 +1,43 @@
+"""재현 가능한 합성 OHLCV 데이터"""
+import numpy as np
+import pandas as pd
+
+
+# 영업일 간격으로는 약 6만 바 이후 pandas 가 표현할 수 있는 날짜(2262년)를 넘음
+DAILY_MAX_BARS = 50_000
+
+
+def make_ohlcv(n_bars, seed=0, start="2000-01-03", freq=None, price=100.0, volatility=0.02):
+    """기하 브라운 운동 기반 OHLCV - 같은 seed 면 항상 같은 값
+
+    ``freq`` 를 주지 않으면 ``DAILY_MAX_BARS`` 까지는 영업일, 그보다 길면 1분 간격
+    (1천만 바 ≈ 19년)으로 시간축을 만듭니다.
+    """
+    if freq is None:
+        freq = "B" if n_bars <= DAILY_MAX_BARS else "min"
+    rng = np.random.default_rng(seed)
+    close = price * np.exp(np.cumsum(rng.normal(0, volatility, n_bars)))
+    open_ = close * (1 + rng.normal(0, volatility / 4, n_bars))
+    spread = np.abs(rng.normal(0, volatility / 2, n_bars))
+    high = np.maximum(open_, close) * (1 + spread)
+    low = np.minimum(open_, close) * (1 - spread)
+    volume = rng.integers(100_000, 10_000_000, n_bars).astype("float64")
+    index = pd.date_range(start=start, periods=n_bars, freq=freq)
+    return pd.DataFrame(
+        {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume},
+        index=index,
+    )
+
+
+def make_universe(n_symbols, n_bars, seed=0, ragged=True, missing=0.0):
+    """``{symbol: DataFrame}`` - 상장 시점이 다른 종목과 빠진 바를 섞을 수 있음"""
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for i in range(n_symbols):
+        df = make_ohlcv(n_bars, seed=seed + i + 1)
+        if ragged and i % 5 == 0:
+            df = df.iloc[int(rng.integers(0, n_bars // 2)):]
+        if missing:
+            df = df[rng.random(len(df)) >= missing]
+        frames[f"SYM{i:04d}"] = df
+    return frames
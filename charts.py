@@ -0,0 +1,271 @@
+"""기술적 분석 차트
+
+긴 구간(분봉, 수년치 일봉)은 그대로 보내면 figure JSON 이 수 MB 가 되어
+브라우저가 멈추므로, 트레이스마다 점 개수를 ``max_points`` 이하로
+줄여서 그립니다.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+# 트레이스 하나에 보내는 최대 점 수
+MAX_CHART_POINTS = 2000
+# 이보다 점이 많은 선은 SVG 대신 WebGL(Scattergl)로 그림
+WEBGL_THRESHOLD = 1000
+
+
+def ohlc_buckets(df, max_points=MAX_CHART_POINTS):
+    """연속된 바를 묶어 ``max_points`` 개 이하의 OHLC 캔들로 집계"""
+    n = len(df)
+    if n <= max_points:
+        return df
+    size = math.ceil(n / max_points)
+    starts = np.arange(0, n, size)
+    ends = np.append(starts[1:], n) - 1
+    # 빈 값이 있으면 reduceat 결과가 NaN 이 되므로 fmax/fmin 으로 무시
+    high = np.fmax.reduceat(df['High'].to_numpy(dtype="float64"), starts)
+    low = np.fmin.reduceat(df['Low'].to_numpy(dtype="float64"), starts)
+    buckets = df.iloc[starts][['Open']].copy()
+    buckets['High'] = high
+    buckets['Low'] = low
+    buckets['Close'] = df['Close'].to_numpy()[ends]
+    if 'Volume' in df.columns:
+        buckets['Volume'] = np.add.reduceat(np.nan_to_num(df['Volume'].to_numpy(dtype="float64")), starts)
+    return buckets
+
+
+def lttb_indices(y, threshold):
+    """Largest-Triangle-Three-Buckets 로 남길 점의 위치 (x 는 바 순서)"""
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.arange(n, dtype="float64")
+    every = (n - 2) / (threshold - 2)
+    # 각 구간의 경계와 다음 구간 평균점을 미리 계산
+    edges = (np.arange(threshold - 1) * every).astype(np.int64) + 1
+    edges[-1] = n - 1
+    averages_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / np.diff(edges)
+    averages_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / np.diff(edges)
+    averages_x = np.append(averages_x[1:], x[-1])
+    averages_y = np.append(averages_y[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    anchor = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs(
+            (x[anchor] - averages_x[i]) * (y[lo:hi] - y[anchor])
+            - (x[anchor] - x[lo:hi]) * (averages_y[i] - y[anchor])
+        )
+        anchor = lo + int(np.argmax(area))
+        selected[i + 1] = anchor
+    return selected
+
+
+def downsample_line(series, max_points=MAX_CHART_POINTS):
+    """지표 선을 모양을 유지하면서 ``max_points`` 개 이하로 축소 (NaN 구간 제외)"""
+    series = series.dropna()
+    if len(series) <= max_points:
+        return series
+    return series.iloc[lttb_indices(series.to_numpy(dtype="float64"), max_points)]
+
+
+def _scatter(points, **kwargs):
+    """점 수에 따라 Scatter / Scattergl 선택"""
+    trace = go.Scattergl if len(points) > WEBGL_THRESHOLD else go.Scatter
+    return trace(x=points.index, y=points, **kwargs)
+
+
+def create_chart(df, symbol, max_points=MAX_CHART_POINTS):
+    """차트 생성
+
+    바 수가 ``max_points`` 를 넘으면 캔들은 구간별 OHLC 로 묶고 지표 선은
+    LTTB 로 줄입니다. 확대해서 볼 구간만 잘라 넘기면 원본 해상도로 그립니다.
+    """
+    candles = ohlc_buckets(df, max_points)
+
+    def line(column):
+        return downsample_line(df[column], max_points)
+
+    fig = make_subplots(
+        rows=5, cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.03,
+        row_heights=[0.5, 0.15, 0.15, 0.1, 0.1],
+        subplot_titles=("Price", "RSI", "MACD", "Stochastic", "MFI")
+    )
+
+    # 캔들스틱
+    fig.add_trace(
+        go.Candlestick(
+            x=candles.index,
+            open=candles['Open'],
+            high=candles['High'],
+            low=candles['Low'],
+            close=candles['Close'],
+            name='Price'
+        ),
+        row=1, col=1
+    )
+
+    # 볼린저 밴드 (채우기가 맞도록 상단/하단은 같은 위치의 점을 사용)
+    if 'BB_upper' in df.columns:
+        band = line('BB_middle').index
+        fig.add_trace(
+            _scatter(df['BB_upper'].loc[band], name='BB Upper',
+                     line=dict(color='rgba(255,255,255,0.2)', dash='dash')),
+            row=1, col=1
+        )
+        fig.add_trace(
+            _scatter(df['BB_lower'].loc[band], name='BB Lower',
+                     line=dict(color='rgba(255,255,255,0.2)', dash='dash'),
+                     fill='tonexty', fillcolor='rgba(255,255,255,0.05)'),
+            row=1, col=1
+        )
+
+    # 이동평균
+    if 'SMA_20' in df.columns:
+        fig.add_trace(
+            _scatter(line('SMA_20'), name='MA20',
+                     line=dict(color='orange', width=2)),
+            row=1, col=1
+        )
+
+    # RSI
+    if 'RSI' in df.columns:
+        fig.add_trace(
+            _scatter(line('RSI'), name='RSI',
+                     line=dict(color='purple', width=2)),
+            row=2, col=1
+        )
+        fig.add_hline(y=70, line_dash="dash", line_color="red", row=2, col=1)
+        fig.add_hline(y=30, line_dash="dash", line_color="green", row=2, col=1)
+
+    # MACD
+    if 'MACD' in df.columns and not df['MACD'].isna().all():
+        fig.add_trace(
+            _scatter(line('MACD'), name='MACD',
+                     line=dict(color='blue', width=2)),
+            row=3, col=1
+        )
+        if 'MACD_signal' in df.columns:
+            fig.add_trace(
+                _scatter(line('MACD_signal'), name='Signal',
+                         line=dict(color='red', width=2)),
+                row=3, col=1
+            )
+
+    # Stochastic
+    if 'Stoch_K' in df.columns:
+        fig.add_trace(
+            _scatter(line('Stoch_K'), name='%K',
+                     line=dict(color='blue', width=2)),
+            row=4, col=1
+        )
+        if 'Stoch_D' in df.columns:
+            fig.add_trace(
+                _scatter(line('Stoch_D'), name='%D',
+                         line=dict(color='red', width=2)),
+                row=4, col=1
+            )
+
+    # MFI
+    if 'MFI' in df.columns:
+        fig.add_trace(
+            _scatter(line('MFI'), name='MFI',
+                     line=dict(color='green', width=2)),
+            row=5, col=1
+        )
+
+    fig.update_layout(
+        title=f"{symbol} Technical Analysis",
+        height=900,
+        showlegend=True,
+        hovermode='x unified',
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+
+    return fig
+
+
+def create_correlation_chart(correlation):
+    """보유 종목 상관 행렬 히트맵"""
+    fig = go.Figure(go.Heatmap(
+        z=correlation.to_numpy(),
+        x=list(correlation.columns),
+        y=list(correlation.index),
+        zmin=-1, zmax=1,
+        colorscale='RdBu_r',
+        hovertemplate='%{y} / %{x}: %{z:.2f}<extra></extra>'
+    ))
+    fig.update_layout(
+        height=400,
+        margin=dict(l=0, r=0, t=10, b=0),
+        yaxis=dict(autorange='reversed'),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig
+
+
+def create_treemap(tiles, column, group_labels=None, height=600):
+    """자산 유형 → 섹터 → 종목 트리맵 - 색은 ``column`` 수익률, 크기는 ``weight``
+
+    노드 배열을 한 번에 만들어 ``go.Treemap`` 하나로 그림 (수백 타일도 트레이스 하나)
+    """
+    group_labels = group_labels or {}
+    change = tiles[column].to_numpy(dtype="float64") * 100
+    weight = tiles["weight"].to_numpy(dtype="float64")
+    groups = tiles["asset_type"].to_numpy()
+    sectors = np.where(groups == "stocks", tiles["sector"].to_numpy(), "")
+    parents = np.where(sectors != "", groups + "/" + sectors, groups)
+
+    # 상위 노드 - 수익률은 크기 가중 평균 (값이 없는 종목 제외)
+    known = np.isfinite(change)
+    nodes = pd.DataFrame({"id": parents, "group": groups, "sector": sectors, "weight": weight,
+                          "weighted": np.where(known, change * weight, 0.0), "known": np.where(known, weight, 0.0)})
+    sector_nodes = nodes[nodes["sector"] != ""].groupby(["id", "group", "sector"], as_index=False)[
+        ["weight", "weighted", "known"]].sum()
+    group_nodes = nodes.groupby("group", as_index=False)[["weight", "weighted", "known"]].sum()
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ids = np.concatenate([group_nodes["group"], sector_nodes["id"], tiles["symbol"]])
+        labels = np.concatenate([[group_labels.get(g, g) for g in group_nodes["group"]],
+                                 sector_nodes["sector"], tiles["symbol"]])
+        node_parents = np.concatenate([np.full(len(group_nodes), ""), sector_nodes["group"], parents])
+        values = np.concatenate([group_nodes["weight"], sector_nodes["weight"], weight])
+        colors = np.concatenate([group_nodes["weighted"] / group_nodes["known"],
+                                 sector_nodes["weighted"] / sector_nodes["known"], change])
+        names = np.concatenate([np.full(len(group_nodes) + len(sector_nodes), ""), tiles["name"]])
+
+    finite = np.isfinite(colors)
+    # 색 범위 - 극단값 몇 개에 끌려가지 않도록 95 분위
+    limit = max(1.0, float(np.percentile(np.abs(colors[finite]), 95))) if finite.any() else 1.0
+    fig = go.Figure(go.Treemap(
+        ids=ids,
+        labels=labels,
+        parents=node_parents,
+        values=values,
+        branchvalues="total",
+        marker=dict(colors=np.where(finite, colors, 0.0), colorscale="RdYlGn", cmin=-limit, cmax=limit,
+                    cmid=0, line=dict(width=0.5, color="rgba(0,0,0,0.3)")),
+        customdata=np.column_stack([np.where(finite, colors, np.nan), names]),
+        texttemplate="<b>%{label}</b><br>%{customdata[0]:+.2f}%",
+        hovertemplate="<b>%{label}</b> %{customdata[1]}<br>%{customdata[0]:+.2f}%<extra></extra>",
+        tiling=dict(pad=1),
+        pathbar=dict(visible=True),
+        sort=True,
+    ))
+    fig.update_layout(
+        height=height,
+        margin=dict(l=0, r=0, t=30, b=0),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig
@@ -0,0 +1,149 @@
+"""시장/포트폴리오 히트맵 데이터
+
+종목 묶음(S&P 500, 관심 종목, 트렌딩 암호화폐)의 기간별 수익률을 한 번에
+계산해 트리맵(자산 유형 → 섹터 → 종목) 타일로 만듭니다.
+
+- 시세는 ``BarStore.update_many`` 배치 조회(델타만) 한 번
+- 수익률은 ``ReturnsMatrix`` 에 모으고(새 바만 추가 계산), 기간 수익률은 누적
+  로그 수익률 행렬에서 기간 시작 행을 빼는 행렬 연산으로 구함
+- 1D 는 종목별 마지막 두 바, 나머지는 달력 기간 (주식/암호화폐가 섞여도 같은 의미)
+- 타일 크기는 최근 평균 거래대금의 제곱근 (시가총액 자료가 없어 대신 사용)
+
+섹터와 종목명은 로컬 종목 마스터(``universes/symbols.csv``)에서 읽습니다.
+화면에서는 ``heatmap_bucket()`` 시간 구간을 캐시 키로 써서 모든 세션이 같은
+결과를 공유합니다.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from risk import RISK_KEEP_DAYS, RISK_LOOKBACK, ReturnsMatrix
+
+# 타일을 다시 계산하는 시간 구간 (초) - BarStore 갱신 주기와 같음
+HEATMAP_BUCKET_SECONDS = 300
+# 1Y 수익률에 1년 전 종가가 필요하므로 위험 분석(1y)보다 길게 받음
+HEATMAP_PERIOD = "2y"
+# 기간별 달력 일수 (1D 는 마지막 바 대비)
+HORIZONS = {"1D": None, "1W": 7, "1M": 30, "3M": 91, "6M": 182, "1Y": 365}
+# 거래대금을 평균 내는 최근 바 수
+WEIGHT_BARS = 20
+
+TILE_COLUMNS = ["symbol", "name", "asset_type", "sector", "price", *HORIZONS, "weight"]
+
+ASSET_TYPE_LABELS = {"stocks": "주식", "etf": "ETF", "crypto": "암호화폐"}
+SECTOR_LABELS = {
+    "Information Technology": "정보기술",
+    "Communication Services": "커뮤니케이션",
+    "Consumer Discretionary": "경기소비재",
+    "Consumer Staples": "필수소비재",
+    "Energy": "에너지",
+    "Financials": "금융",
+    "Health Care": "헬스케어",
+    "Industrials": "산업재",
+    "Materials": "소재",
+    "Real Estate": "부동산",
+    "Utilities": "유틸리티",
+}
+OTHER_SECTOR = "기타"
+
+DAY_NS = 86_400 * 10**9
+
+
+def heatmap_bucket(now=None, seconds=HEATMAP_BUCKET_SECONDS):
+    """캐시 키로 쓰는 시간 구간 번호"""
+    return int((time.time() if now is None else now) // seconds)
+
+
+def horizon_returns(dates, block, horizons=HORIZONS):
+    """기간별 수익률 ``{기간: 종목 배열}`` - ``block`` 은 날짜 x 종목 일간 수익률 (바가 없는 칸은 NaN)
+
+    빈 칸을 0 으로 둔 누적 로그 수익률(= 종가를 앞으로 채운 가격의 로그)에서 기간 시작
+    날짜의 값을 빼서 구하며, 시작 날짜보다 늦게 상장된(이력이 짧은) 종목은 NaN
+    """
+    finite = np.isfinite(block)
+    growth = np.cumsum(np.log1p(np.where(finite, block, 0.0)), axis=0)
+    first = np.where(finite.any(axis=0), finite.argmax(axis=0), len(dates))
+    result = {}
+    for name, days in horizons.items():
+        if days is None or len(dates) == 0:
+            continue
+        start = np.searchsorted(dates, dates[-1] - days * DAY_NS, side="right") - 1
+        if start < 0:
+            result[name] = np.full(block.shape[1], np.nan)
+            continue
+        change = np.expm1(growth[-1] - growth[start])
+        change[first > start] = np.nan
+        result[name] = change
+    return result
+
+
+def _weights(frames, symbols):
+    """최근 평균 거래대금의 제곱근 (없으면 중앙값)"""
+    weights = np.full(len(symbols), np.nan)
+    for i, symbol in enumerate(symbols):
+        tail = frames[symbol].iloc[-WEIGHT_BARS:]
+        traded = tail["Close"].to_numpy(dtype="float64") * tail["Volume"].to_numpy(dtype="float64")
+        traded = traded[np.isfinite(traded)]
+        if len(traded) and traded.mean() > 0:
+            weights[i] = np.sqrt(traded.mean())
+    fallback = np.nanmedian(weights) if np.isfinite(weights).any() else 1.0
+    return np.where(np.isfinite(weights), weights, fallback)
+
+
+class MarketHeatmap:
+    """종목 묶음의 히트맵 타일과 상관 행렬"""
+
+    def __init__(self, bar_store, master=None, period=HEATMAP_PERIOD, matrix=None):
+        self.bar_store = bar_store
+        # 위험 분석의 행렬과 따로 둠 - 조회 기간이 달라서 같이 쓰면 앞쪽 이력이 빔
+        self.matrix = matrix if matrix is not None else ReturnsMatrix()
+        self.master = master
+        self.period = period
+
+    def _update(self, symbols):
+        frames = self.bar_store.update_many(list(symbols), "1d", self.period)
+        self.matrix.update(frames)
+        return {s: df for s, df in frames.items() if not df.empty}
+
+    def _describe(self, symbol):
+        """``(이름, 자산 유형, 섹터 표시 이름)``"""
+        instrument = self.master.get(symbol) if self.master is not None else None
+        if instrument is None:
+            return symbol, "crypto" if symbol.endswith("-USD") else "stocks", OTHER_SECTOR
+        name = instrument.name_ko or instrument.name or symbol
+        return name, instrument.asset_type, SECTOR_LABELS.get(instrument.sector, OTHER_SECTOR)
+
+    def tiles(self, symbols):
+        """타일 표 (``TILE_COLUMNS``, 수익률은 비율) - 시세가 없는 종목은 빠짐"""
+        frames = self._update(symbols)
+        symbols = [s for s in dict.fromkeys(symbols) if s in frames]
+        if not symbols:
+            return pd.DataFrame(columns=TILE_COLUMNS)
+        window = self.matrix.window(symbols, RISK_KEEP_DAYS, fill=None)
+        symbols = list(window.columns)
+        changes = horizon_returns(window.index.asi8, window.to_numpy())
+        prices = self.matrix.prices(symbols)
+        previous, last = (np.array(v, dtype="float64") for v in zip(*(prices[s] for s in symbols)))
+        changes["1D"] = last / previous - 1
+        names, asset_types, sectors = zip(*(self._describe(s) for s in symbols))
+        table = pd.DataFrame({
+            "symbol": symbols,
+            "name": names,
+            "asset_type": asset_types,
+            "sector": sectors,
+            "price": last,
+            **{name: changes[name] for name in HORIZONS},
+            "weight": _weights(frames, symbols),
+        })
+        return table[TILE_COLUMNS]
+
+    def correlation(self, symbols, lookback=RISK_LOOKBACK):
+        """일간 수익률 상관 행렬 (바가 없는 날은 0 수익률로 봄)"""
+        self._update(symbols)
+        window = self.matrix.window(list(dict.fromkeys(symbols)), lookback)
+        if window.shape[1] < 2 or len(window) < 2:
+            return None
+        with np.errstate(invalid="ignore", divide="ignore"):
+            correlation = np.corrcoef(window.to_numpy(), rowvar=False)
+        return pd.DataFrame(correlation, index=window.columns, columns=window.columns)
@@ -0,0 +1,576 @@
+"""기술적 지표 계산
+
+``ta`` 로 매번 전체를 다시 계산하는 대신 지표별 상태(Wilder 평활, EMA,
+롤링 윈도)를 유지하면서 바를 하나씩 반영합니다. 바 하나를 추가하는 비용은
+윈도 크기에만 비례하고 이력 길이와는 무관합니다. 결과 값은 기존
+``ta`` 기반 ``calculate_indicators`` 와 같습니다.
+
+많은 종목을 한 번에 계산할 때는 ``calculate_indicators_panel`` 이
+심볼 × 시간 배열 전체를 NumPy 연산으로 처리합니다.
+"""
+import copy
+import math
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+import pandas as pd
+
+NAN = float("nan")
+
+INDICATOR_COLUMNS = [
+    "RSI", "MACD", "MACD_signal", "MACD_diff", "CCI", "MFI",
+    "Stoch_K", "Stoch_D", "ATR", "SMA_20", "SMA_50",
+    "BB_upper", "BB_middle", "BB_lower",
+]
+
+# 지표를 계산하기 위한 최소 바 수
+MIN_BARS = 20
+MACD_MIN_BARS = 26
+SMA_50_MIN_BARS = 50
+
+
+def _div(a, b):
+    """numpy 와 같은 IEEE 나눗셈 (0 으로 나누면 inf/nan)"""
+    if b == 0:
+        if a == 0 or math.isnan(a):
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+class _EWM:
+    """pandas ``ewm(adjust=False)`` 와 같은 지수 평활"""
+
+    __slots__ = ("alpha", "min_periods", "value", "count")
+
+    def __init__(self, alpha, min_periods):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = NAN
+        self.count = 0
+
+    def update(self, x):
+        if self.count == 0:
+            self.value = x
+        else:
+            self.value = (1 - self.alpha) * self.value + self.alpha * x
+        self.count += 1
+        return self.value if self.count >= self.min_periods else NAN
+
+
+class IndicatorState:
+    """종목 하나의 지표 상태 - ``update`` 한 번에 바 하나를 반영"""
+
+    def __init__(self):
+        self.prev_close = None
+        self.prev_tp = None
+        self.count = 0
+
+        # RSI (Wilder 평활, 14)
+        self.rsi_up = _EWM(1 / 14, 14)
+        self.rsi_down = _EWM(1 / 14, 14)
+
+        # MACD (12, 26, 9)
+        self.ema_fast = _EWM(2 / 13, 12)
+        self.ema_slow = _EWM(2 / 27, 26)
+        self.macd_signal = _EWM(2 / 10, 9)
+
+        # CCI (20), MFI (14), Stochastic (14, 3)
+        self.tp_window = deque(maxlen=20)
+        self.mf_window = deque(maxlen=14)
+        self.high_window = deque(maxlen=14)
+        self.low_window = deque(maxlen=14)
+        self.k_window = deque(maxlen=3)
+
+        # ATR (Wilder 14, 처음 14개 TR 의 평균으로 시작)
+        self.atr = 0.0
+        self.atr_seed = []
+
+        # 이동평균 / 볼린저 밴드
+        self.close_20 = deque(maxlen=20)
+        self.close_50 = deque(maxlen=50)
+
+    def update(self, high, low, close, volume):
+        """바 하나를 반영하고 ``INDICATOR_COLUMNS`` 순서의 값 튜플을 반환"""
+        prev_close = self.prev_close
+        self.count += 1
+
+        # RSI
+        diff = close - prev_close if prev_close is not None else NAN
+        up = self.rsi_up.update(diff if diff > 0 else 0.0)
+        down = self.rsi_down.update(-diff if diff < 0 else 0.0)
+        if math.isnan(down):
+            rsi = NAN
+        elif down == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - 100 / (1 + up / down)
+
+        # MACD
+        macd = self.ema_fast.update(close) - self.ema_slow.update(close)
+        if math.isnan(macd):
+            signal = NAN
+        else:
+            signal = self.macd_signal.update(macd)
+        macd_diff = macd - signal
+
+        # CCI
+        tp = (high + low + close) / 3.0
+        self.tp_window.append(tp)
+        if len(self.tp_window) == self.tp_window.maxlen:
+            mean = sum(self.tp_window) / len(self.tp_window)
+            mad = sum(abs(x - mean) for x in self.tp_window) / len(self.tp_window)
+            cci = _div(tp - mean, 0.015 * mad)
+        else:
+            cci = NAN
+
+        # MFI
+        if self.prev_tp is None or tp == self.prev_tp:
+            direction = 0
+        else:
+            direction = 1 if tp > self.prev_tp else -1
+        self.mf_window.append(tp * volume * direction)
+        if len(self.mf_window) == self.mf_window.maxlen:
+            positive = sum(x for x in self.mf_window if x >= 0.0)
+            negative = abs(sum(x for x in self.mf_window if x < 0.0))
+            mfi = 100 - _div(100, 1 + _div(positive, negative))
+        else:
+            mfi = NAN
+
+        # Stochastic
+        self.high_window.append(high)
+        self.low_window.append(low)
+        if len(self.low_window) == self.low_window.maxlen:
+            lowest = min(self.low_window)
+            stoch_k = _div(100 * (close - lowest), max(self.high_window) - lowest)
+        else:
+            stoch_k = NAN
+        self.k_window.append(stoch_k)
+        if len(self.k_window) == self.k_window.maxlen and not any(math.isnan(k) for k in self.k_window):
+            stoch_d = sum(self.k_window) / len(self.k_window)
+        else:
+            stoch_d = NAN
+
+        # ATR
+        true_range = high - low
+        if prev_close is not None:
+            true_range = max(true_range, abs(high - prev_close), abs(low - prev_close))
+        if len(self.atr_seed) < 14:
+            self.atr_seed.append(true_range)
+            if len(self.atr_seed) == 14:
+                self.atr = sum(self.atr_seed) / 14
+        else:
+            self.atr = (self.atr * 13 + true_range) / 14.0
+        atr = self.atr
+
+        # 이동평균 / 볼린저 밴드
+        self.close_20.append(close)
+        self.close_50.append(close)
+        if len(self.close_20) == 20:
+            sma_20 = sum(self.close_20) / 20
+            std = math.sqrt(sum((x - sma_20) ** 2 for x in self.close_20) / 20)
+            bb_upper, bb_lower = sma_20 + 2 * std, sma_20 - 2 * std
+        else:
+            sma_20 = bb_upper = bb_lower = NAN
+        sma_50 = sum(self.close_50) / 50 if len(self.close_50) == 50 else NAN
+
+        self.prev_close = close
+        self.prev_tp = tp
+
+        return (
+            rsi, macd, signal, macd_diff, cci, mfi,
+            stoch_k, stoch_d, atr, sma_20, sma_50,
+            bb_upper, sma_20, bb_lower,
+        )
+
+
+class _Series:
+    """엔진에 등록된 (심볼, 인터벌) 하나의 상태와 계산 결과"""
+
+    def __init__(self):
+        self.state = IndicatorState()
+        self.index = []
+        self.values = {name: [] for name in INDICATOR_COLUMNS}
+        # 마지막 바가 장중에 바뀌면 되돌리기 위한 직전 상태
+        self.before_last = None
+        self.last_input = None
+        self.frame = None
+
+    def push(self, timestamp, row, is_last):
+        if is_last:
+            self.before_last = copy.deepcopy(self.state)
+        for name, value in zip(INDICATOR_COLUMNS, self.state.update(*row)):
+            self.values[name].append(value)
+        self.index.append(timestamp)
+        self.last_input = row
+
+    def pop_last(self):
+        self.state = self.before_last
+        self.before_last = None
+        self.index.pop()
+        for column in self.values.values():
+            column.pop()
+
+
+def _input_rows(df):
+    return df[["High", "Low", "Close", "Volume"]].itertuples(index=False, name=None)
+
+
+def _build_frame(df, values):
+    """원본에 지표 컬럼을 붙인 새 DataFrame (기존 calculate_indicators 규칙 유지)"""
+    n = len(df)
+    columns = {}
+    for name in INDICATOR_COLUMNS:
+        if name.startswith("MACD") and n < MACD_MIN_BARS:
+            continue
+        if name == "SMA_50" and n < SMA_50_MIN_BARS:
+            continue
+        columns[name] = pd.Series(values[name][:n], index=df.index, dtype="float64")
+
+    if "MACD" in columns:
+        columns["MACD"] = columns["MACD"].bfill()
+        columns["MACD_signal"] = columns["MACD_signal"].bfill()
+        columns["MACD_diff"] = columns["MACD_diff"].fillna(0)
+
+    # 기존 컬럼과 겹치면(이미 지표가 붙은 입력) 새 값으로 교체
+    base = df.drop(columns=[c for c in columns if c in df.columns])
+    return pd.concat([base, pd.DataFrame(columns, index=df.index)], axis=1)
+
+
+def calculate_indicators_ta(df):
+    """``ta`` 라이브러리로 계산한 기준값 (정합성 확인용)"""
+    import ta
+
+    if df.empty or len(df) < MIN_BARS:
+        return df
+
+    df = df.copy()
+    df['RSI'] = ta.momentum.RSIIndicator(df['Close'], window=14).rsi()
+    if len(df) >= MACD_MIN_BARS:
+        macd_indicator = ta.trend.MACD(df['Close'], window_slow=26, window_fast=12, window_sign=9)
+        df['MACD'] = macd_indicator.macd().bfill()
+        df['MACD_signal'] = macd_indicator.macd_signal().bfill()
+        df['MACD_diff'] = macd_indicator.macd_diff().fillna(0)
+    df['CCI'] = ta.trend.CCIIndicator(df['High'], df['Low'], df['Close']).cci()
+    df['MFI'] = ta.volume.MFIIndicator(df['High'], df['Low'], df['Close'], df['Volume']).money_flow_index()
+    stoch = ta.momentum.StochasticOscillator(df['High'], df['Low'], df['Close'])
+    df['Stoch_K'] = stoch.stoch()
+    df['Stoch_D'] = stoch.stoch_signal()
+    df['ATR'] = ta.volatility.average_true_range(df['High'], df['Low'], df['Close'])
+    df['SMA_20'] = ta.trend.sma_indicator(df['Close'], window=20)
+    if len(df) >= SMA_50_MIN_BARS:
+        df['SMA_50'] = ta.trend.sma_indicator(df['Close'], window=50)
+    bollinger = ta.volatility.BollingerBands(df['Close'])
+    df['BB_upper'] = bollinger.bollinger_hband()
+    df['BB_middle'] = bollinger.bollinger_mavg()
+    df['BB_lower'] = bollinger.bollinger_lband()
+    return df
+
+
+def calculate_indicators(df):
+    """지표 계산 - 입력을 수정하지 않고 지표 컬럼이 붙은 새 DataFrame 반환"""
+    if df.empty or len(df) < MIN_BARS:
+        return df
+
+    state = IndicatorState()
+    values = {name: [] for name in INDICATOR_COLUMNS}
+    for row in _input_rows(df):
+        for name, value in zip(INDICATOR_COLUMNS, state.update(*row)):
+            values[name].append(value)
+    return _build_frame(df, values)
+
+
+class IndicatorEngine:
+    """(심볼, 인터벌)별 지표 상태를 유지하는 증분 계산 엔진
+
+    같은 이력에 바가 추가된 경우 새 바만 계산합니다. 마지막 바의 값이
+    바뀌었으면(장중 갱신) 직전 상태로 되돌린 뒤 다시 반영하고, 이력의
+    시작점이 달라졌으면 처음부터 다시 계산합니다.
+    """
+
+    def __init__(self, max_series=256):
+        self.max_series = max_series
+        self._series = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _resume_position(self, series, df):
+        """이미 계산한 바 중 재사용 가능한 개수 (불가하면 None)"""
+        done = len(series.index)
+        if done == 0 or len(df) < done:
+            return None
+        if df.index[0] != series.index[0] or df.index[done - 1] != series.index[-1]:
+            return None
+        if tuple(next(_input_rows(df.iloc[done - 1:done]))) != series.last_input:
+            if series.before_last is None:
+                return None
+            series.pop_last()
+            done -= 1
+        return done
+
+    def update(self, symbol, interval, df):
+        """지표가 붙은 DataFrame 반환 (반환값은 공유되므로 수정하지 말 것)"""
+        if df.empty or len(df) < MIN_BARS:
+            return df
+
+        key = (symbol, interval)
+        with self._lock:
+            series = self._series.get(key)
+            done = self._resume_position(series, df) if series is not None else None
+            if done is None:
+                series = _Series()
+                done = 0
+            self._series[key] = series
+            self._series.move_to_end(key)
+            while len(self._series) > self.max_series:
+                self._series.popitem(last=False)
+
+            if done < len(df) or series.frame is None:
+                last = len(df) - 1
+                new_rows = _input_rows(df.iloc[done:])
+                for position, (timestamp, row) in enumerate(zip(df.index[done:], new_rows), start=done):
+                    series.push(timestamp, row, position == last)
+                series.frame = _build_frame(df, series.values)
+            return series.frame
+
+    def clear(self, symbol=None, interval=None):
+        """상태 초기화 (인자가 없으면 전체)"""
+        with self._lock:
+            if symbol is None:
+                self._series.clear()
+            else:
+                self._series.pop((symbol, interval), None)
+
+
+# ---------------------------------------------------------------------------
+# 패널(심볼 × 시간) 일괄 계산
+# ---------------------------------------------------------------------------
+
+# 메모리 사용을 제한하기 위해 윈도 연산을 이 행 수 단위로 나눠 처리
+PANEL_CHUNK_ROWS = 256
+
+
+def _compact(valid):
+    """행마다 유효한 바를 오른쪽 끝으로 모으는 인덱스와 시작 위치"""
+    order = np.argsort(valid, axis=1, kind="stable")
+    start = valid.shape[1] - valid.sum(axis=1)
+    return order, start
+
+
+def _mask_before(x, start, offset):
+    """각 행의 ``start + offset`` 이전 위치를 NaN 으로"""
+    positions = np.arange(x.shape[1])
+    x[positions[None, :] < (start + offset)[:, None]] = np.nan
+    return x
+
+
+def _ewm_panel(x, alpha, start, min_periods):
+    """행별 시작 위치가 다른 ``ewm(adjust=False)`` - lfilter 한 번으로 계산"""
+    # scipy.signal 은 불러오는 데 1초 가까이 걸리므로 처음 쓸 때 로드
+    from scipy.signal import lfilter
+
+    n_rows, n_cols = x.shape
+    rows = np.arange(n_rows)
+    seed = x[rows, np.minimum(start, n_cols - 1)]
+    before = np.arange(n_cols)[None, :] < start[:, None]
+    filled = np.where(before, seed[:, None], x)
+    y, _ = lfilter([alpha], [1.0, alpha - 1.0], filled, axis=1, zi=((1 - alpha) * seed)[:, None])
+    return _mask_before(y, start, min_periods - 1)
+
+
+def _rolling_sum(x, window, start):
+    """시작 위치 이후 ``window`` 개가 모인 곳부터의 이동 합 (NaN 은 0 으로 취급)"""
+    filled = np.nan_to_num(x, nan=0.0)
+    cumsum = np.cumsum(filled, axis=1)
+    out = cumsum.copy()
+    out[:, window:] -= cumsum[:, :-window]
+    return _mask_before(out, start, window - 1)
+
+
+def _rolling_reduce(x, window, func):
+    """앞쪽을 NaN 으로 채운 ``window`` 크기 이동 min/max/mean"""
+    pad = np.full((x.shape[0], window - 1), np.nan)
+    windows = np.lib.stride_tricks.sliding_window_view(np.hstack([pad, x]), window, axis=1)
+    return func(windows, axis=2)
+
+
+def _rolling_mad(x, mean, window):
+    """이동 평균 절대 편차 (메모리 제한을 위해 행 묶음 단위로 계산)"""
+    out = np.full_like(x, np.nan)
+    pad = np.full((x.shape[0], window - 1), np.nan)
+    padded = np.hstack([pad, x])
+    for lo in range(0, x.shape[0], PANEL_CHUNK_ROWS):
+        hi = lo + PANEL_CHUNK_ROWS
+        windows = np.lib.stride_tricks.sliding_window_view(padded[lo:hi], window, axis=1)
+        out[lo:hi] = np.abs(windows - mean[lo:hi, :, None]).mean(axis=2)
+    return out
+
+
+def _bfill_from(x, start, first_valid_offset):
+    """행별 첫 유효값으로 그 앞(시작 위치까지)을 채움 - DataFrame.bfill 과 동일"""
+    n_rows, n_cols = x.shape
+    rows = np.arange(n_rows)
+    first = np.minimum(start + first_valid_offset, n_cols - 1)
+    positions = np.arange(n_cols)[None, :]
+    fill = (positions >= start[:, None]) & (positions < first[:, None])
+    return np.where(fill, x[rows, first][:, None], x)
+
+
+def compact_panel(valid, *arrays):
+    """행마다 유효한 바만 오른쪽 끝으로 모은 패널 - ``(order, start, [압축된 배열...])``
+
+    압축된 배열에서는 각 행의 ``start`` 위치부터 빈 칸 없이 바가 이어지므로
+    아래 ``*_panel`` 함수들을 그대로 적용할 수 있습니다.
+    """
+    order, start = _compact(valid)
+    packed_valid = np.take_along_axis(valid, order, axis=1)
+    return order, start, [np.where(packed_valid, np.take_along_axis(a, order, axis=1), np.nan) for a in arrays]
+
+
+def restore_panel(values, valid, order):
+    """``compact_panel`` 로 압축해 계산한 값을 원래 위치로 되돌림 (빠진 바는 NaN)"""
+    restored = np.full(values.shape, np.nan)
+    np.put_along_axis(restored, order, values, axis=1)
+    restored[~valid] = np.nan
+    return restored
+
+
+def rsi_panel(close, start, window=14):
+    """압축된 종가 패널의 RSI"""
+    diff = np.hstack([np.full((close.shape[0], 1), np.nan), np.diff(close, axis=1)])
+    alpha = 1 / window
+    with np.errstate(divide="ignore", invalid="ignore"):
+        up = _ewm_panel(np.where(diff > 0, diff, 0.0), alpha, start, window)
+        down = _ewm_panel(np.where(diff < 0, -diff, 0.0), alpha, start, window)
+        return np.where(down == 0, 100.0, 100 - 100 / (1 + up / down))
+
+
+def macd_panel(close, start, fast=12, slow=26, signal=9):
+    """압축된 종가 패널의 ``(MACD, 시그널)`` - 앞쪽 채우기 없이 계산 가능한 곳부터"""
+    macd = _ewm_panel(close, 2 / (fast + 1), start, fast) - _ewm_panel(close, 2 / (slow + 1), start, slow)
+    return macd, _ewm_panel(macd, 2 / (signal + 1), start + slow - 1, signal)
+
+
+def bollinger_panel(close, start, window=20, width=2.0):
+    """압축된 종가 패널의 ``(중심선, 상단, 하단)``
+
+    분산은 종목별 기준값을 빼서 계산해 누적합의 상쇄 오차를 줄입니다.
+    """
+    n_rows, n_cols = close.shape
+    middle = _rolling_sum(close, window, start) / window
+    reference = close[np.arange(n_rows), np.minimum(start, n_cols - 1)][:, None]
+    shifted = close - reference
+    variance = _rolling_sum(shifted ** 2, window, start) / window - (_rolling_sum(shifted, window, start) / window) ** 2
+    std = np.sqrt(np.maximum(variance, 0.0))
+    return middle, middle + width * std, middle - width * std
+
+
+def calculate_indicators_panel(close, high, low, volume):
+    """심볼 × 시간 패널에 대해 ``calculate_indicators`` 의 지표를 일괄 계산
+
+    입력은 같은 모양의 2차원 float 배열이며 NaN 은 빠진 바로 취급합니다.
+    상장 시점이 달라 앞쪽이 비어 있거나 중간에 바가 빠진 경우 각 종목의
+    유효한 바만 이어 붙여 계산한 뒤 원래 위치로 되돌리므로, 종목별로
+    ``calculate_indicators(df.dropna())`` 를 호출한 것과 같은 값이 나옵니다.
+    반환값은 ``{지표명: 배열}`` 이며 빠진 바와 계산 조건을 채우지 못한
+    종목(유효 바 20개 미만 등)은 NaN 입니다.
+    """
+    close, high, low, volume = (np.asarray(a, dtype="float64") for a in (close, high, low, volume))
+    n_rows, n_cols = close.shape
+    valid = np.isfinite(close) & np.isfinite(high) & np.isfinite(low) & np.isfinite(volume)
+    order, start, (c, h, l, v) = compact_panel(valid, close, high, low, volume)
+    n_valid = n_cols - start
+    out = {}
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # RSI
+        out["RSI"] = rsi_panel(c, start, 14)
+
+        # MACD
+        macd, signal = macd_panel(c, start, 12, 26, 9)
+        diff_macd = np.nan_to_num(macd - signal, nan=0.0)
+        out["MACD"] = _bfill_from(macd, start, MACD_MIN_BARS - 1)
+        out["MACD_signal"] = _bfill_from(signal, start, MACD_MIN_BARS + 7)
+        out["MACD_diff"] = _mask_before(diff_macd, start, 0)
+
+        # CCI
+        tp = (h + l + c) / 3.0
+        tp_mean = _rolling_sum(tp, 20, start) / 20
+        mad = _rolling_mad(tp, tp_mean, 20)
+        out["CCI"] = (tp - tp_mean) / (0.015 * mad)
+
+        # MFI
+        prev_tp = np.hstack([np.full((n_rows, 1), np.nan), tp[:, :-1]])
+        direction = np.where(tp > prev_tp, 1.0, np.where(tp < prev_tp, -1.0, 0.0))
+        flow = tp * v * direction
+        positive = _rolling_sum(np.where(flow >= 0.0, flow, 0.0), 14, start)
+        negative = np.abs(_rolling_sum(np.where(flow < 0.0, flow, 0.0), 14, start))
+        out["MFI"] = 100 - 100 / (1 + positive / negative)
+
+        # Stochastic
+        lowest = _rolling_reduce(l, 14, np.min)
+        highest = _rolling_reduce(h, 14, np.max)
+        stoch_k = 100 * (c - lowest) / (highest - lowest)
+        out["Stoch_K"] = stoch_k
+        out["Stoch_D"] = _rolling_reduce(stoch_k, 3, np.mean)
+
+        # ATR (처음 14개 TR 평균으로 시작, 그 전은 ta 와 같이 0)
+        prev_close = np.hstack([np.full((n_rows, 1), np.nan), c[:, :-1]])
+        true_range = np.fmax(h - l, np.fmax(np.abs(h - prev_close), np.abs(l - prev_close)))
+        seed_end = np.minimum(start + 13, n_cols - 1)
+        seed = _rolling_sum(true_range, 14, start)[np.arange(n_rows), seed_end] / 14
+        tr_after = np.where(np.arange(n_cols)[None, :] == seed_end[:, None], seed[:, None], true_range)
+        atr = _ewm_panel(tr_after, 1 / 14, seed_end, 1)
+        positions = np.arange(n_cols)[None, :]
+        atr = np.where((positions >= start[:, None]) & (positions < seed_end[:, None]), 0.0, atr)
+        out["ATR"] = atr
+
+        # 이동평균 / 볼린저 밴드
+        sma_20, bb_upper, bb_lower = bollinger_panel(c, start, 20, 2.0)
+        out["SMA_20"] = sma_20
+        out["SMA_50"] = _rolling_sum(c, 50, start) / 50
+        out["BB_upper"] = bb_upper
+        out["BB_middle"] = sma_20
+        out["BB_lower"] = bb_lower
+
+    # 종목별 최소 바 수 조건 (calculate_indicators 와 동일)
+    no_macd = n_valid < MACD_MIN_BARS
+    no_sma_50 = n_valid < SMA_50_MIN_BARS
+    too_short = n_valid < MIN_BARS
+    for name, values in out.items():
+        values[too_short] = np.nan
+        if name.startswith("MACD"):
+            values[no_macd] = np.nan
+        if name == "SMA_50":
+            values[no_sma_50] = np.nan
+        # 원래 위치로 되돌리고 빠진 바는 NaN
+        out[name] = restore_panel(values, valid, order)
+    return out
+
+
+def build_panel(frames):
+    """``{symbol: DataFrame}`` 을 공통 시간축의 OHLCV 패널로 변환
+
+    반환값: ``(symbols, index, {"Open"|"High"|"Low"|"Close"|"Volume": 배열})``
+    """
+    symbols = [s for s, df in frames.items() if not df.empty]
+    if not symbols:
+        return [], pd.DatetimeIndex([]), {}
+    columns = ["Open", "High", "Low", "Close", "Volume"]
+
+    # 종목별 reindex 대신 정수 타임스탬프를 합쳐 한 번에 위치를 찾음
+    index = frames[symbols[0]].index
+    for symbol in symbols[1:]:
+        if not frames[symbol].index.equals(index):
+            index = index.union(frames[symbol].index)
+    stamps = index.asi8
+
+    values = np.full((len(columns), len(symbols), len(index)), np.nan)
+    for row, symbol in enumerate(symbols):
+        df = frames[symbol]
+        data = df.to_numpy(dtype="float64", na_value=np.nan)
+        positions = np.searchsorted(stamps, df.index.asi8)
+        for i, column_position in enumerate(df.columns.get_indexer(columns)):
+            if column_position >= 0:
+                values[i, row, positions] = data[:, column_position]
+    return symbols, index, dict(zip(columns, values))
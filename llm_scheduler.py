@@ -0,0 +1,362 @@
+"""LLM 요청 스케줄러
+
+프로세스 전체에서 하나만 두고 모든 세션의 AI 분석 요청을 모아 처리합니다.
+
+- 같은 요청(같은 키)이 진행 중이면 새로 호출하지 않고 기존 작업을 공유
+- 대기열이 길어지면 여러 종목을 프롬프트 하나로 묶어 한 번에 호출
+- 분당 요청 수 / 분당 토큰 수를 토큰 버킷으로 제한
+- 한도 때문에 ``max_wait`` 초 넘게 기다려야 하면 기본 기술적 분석으로 대체
+  (대체 사유별로 집계)
+"""
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import METRICS
+
+# Groq 무료 등급 수준의 기본 한도
+REQUESTS_PER_MINUTE = 30
+TOKENS_PER_MINUTE = 30000
+# 대기열이 이 길이 이상이면 묶어서 호출
+BATCH_THRESHOLD = 3
+MAX_BATCH_SIZE = 4
+# 한도 때문에 이보다 오래 기다려야 하면 기술적 분석으로 대체
+MAX_WAIT_SECONDS = 20.0
+LLM_WORKERS = 4
+
+BATCH_INSTRUCTION = (
+    "아래 종목들을 각각 분석해주세요. 각 종목의 분석은 반드시 "
+    "'### 심볼' 형식의 제목 줄로 시작하세요."
+)
+
+
+def estimate_tokens(text):
+    """대략적인 토큰 수 (한국어는 1~2자당 1토큰 정도)"""
+    return len(text) // 2 + 1
+
+
+class AnalysisJob:
+    """진행 중이거나 끝난 AI 분석 하나 - 여러 곳에서 동시에 스트리밍 가능"""
+
+    def __init__(self, key):
+        self.key = key
+        self.error = None
+        # 기술적 분석으로 대체된 경우 사유 ("budget", "error", "parse")
+        self.fallback_reason = None
+        self._chunks = []
+        self._done = False
+        self._cond = threading.Condition()
+
+    @classmethod
+    def completed(cls, key, text):
+        job = cls(key)
+        job.append(text)
+        job.finish()
+        return job
+
+    def append(self, text):
+        with self._cond:
+            self._chunks.append(text)
+            self._cond.notify_all()
+
+    def finish(self, error=None):
+        with self._cond:
+            self.error = error
+            self._done = True
+            self._cond.notify_all()
+
+    @property
+    def done(self):
+        return self._done
+
+    @property
+    def text(self):
+        with self._cond:
+            return "".join(self._chunks)
+
+    def stream(self):
+        """지금까지 받은 토큰부터 완료될 때까지 순서대로 반환"""
+        position = 0
+        while True:
+            with self._cond:
+                while position >= len(self._chunks) and not self._done:
+                    self._cond.wait()
+                chunks = self._chunks[position:]
+                done = self._done
+            yield from chunks
+            position += len(chunks)
+            if done and position >= len(self._chunks):
+                return
+
+    def result(self, timeout=None):
+        """완료될 때까지 기다린 뒤 전체 텍스트"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._done, timeout)
+        return self.text
+
+
+class TokenBucket:
+    """분당 ``rate`` 만큼 채워지는 토큰 버킷 (디스패처와 풀 스레드가 같이 씀)"""
+
+    def __init__(self, rate_per_minute, capacity=None, clock=time.monotonic):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.clock = clock
+        self.tokens = float(self.capacity)
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """``amount`` 를 쓸 수 있을 때까지 남은 시간(초)"""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            if self.tokens >= amount:
+                return 0.0
+            return (amount - self.tokens) / self.rate
+
+    def consume(self, amount):
+        with self._lock:
+            self._refill()
+            self.tokens -= amount
+
+    def refund(self, amount):
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class _Pending:
+    __slots__ = ("job", "request", "fallback", "symbol", "enqueued")
+
+    def __init__(self, job, request, fallback, symbol, enqueued):
+        self.job = job
+        self.request = request
+        self.fallback = fallback
+        self.symbol = symbol
+        self.enqueued = enqueued
+
+
+class LLMScheduler:
+    """프로세스 전체 LLM 호출 스케줄러 (중복 제거, 묶음 호출, 속도 제한)"""
+
+    def __init__(self, client, cache=None,
+                 requests_per_minute=REQUESTS_PER_MINUTE,
+                 tokens_per_minute=TOKENS_PER_MINUTE,
+                 batch_threshold=BATCH_THRESHOLD, max_batch_size=MAX_BATCH_SIZE,
+                 max_wait=MAX_WAIT_SECONDS, max_workers=LLM_WORKERS,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.client = client
+        self.cache = cache
+        self.batch_threshold = batch_threshold
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.clock = clock
+        self.sleep = sleep
+        self.request_bucket = TokenBucket(requests_per_minute, clock=clock)
+        self.token_bucket = TokenBucket(tokens_per_minute, clock=clock)
+
+        self._queue = deque()
+        self._inflight = {}
+        self._cond = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+        self._waits = deque(maxlen=1000)
+        self._counters = {
+            "submitted": 0,
+            "deduplicated": 0,
+            "llm_calls": 0,
+            "batches": 0,
+            "batched_requests": 0,
+            "completed": 0,
+        }
+        self._fallbacks = {"budget": 0, "error": 0, "parse": 0}
+
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="llm-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    # 요청 접수
+    def submit(self, key, request, fallback, symbol=None):
+        """요청 등록 - 같은 키가 처리 중이면 그 작업을 반환"""
+        with self._cond:
+            self._counters["submitted"] += 1
+            job = self._inflight.get(key)
+            if job is not None:
+                self._counters["deduplicated"] += 1
+                return job
+            job = AnalysisJob(key)
+            self._inflight[key] = job
+            self._queue.append(_Pending(job, request, fallback, symbol, self.clock()))
+            self._cond.notify()
+            return job
+
+    def metrics(self):
+        """대기열 길이, 대기 시간, 호출/대체 횟수"""
+        with self._cond:
+            waits = sorted(self._waits)
+            queue_depth = len(self._queue)
+            inflight = len(self._inflight)
+            counters = dict(self._counters)
+            fallbacks = dict(self._fallbacks)
+
+        def percentile(q):
+            return waits[min(len(waits) - 1, int(q * len(waits)))] if waits else 0.0
+
+        return {
+            "queue_depth": queue_depth,
+            "inflight": inflight,
+            **counters,
+            "fallbacks": fallbacks,
+            "wait_p50": percentile(0.50),
+            "wait_p95": percentile(0.95),
+            "wait_max": waits[-1] if waits else 0.0,
+            "requests_available": round(self.request_bucket.tokens, 2),
+            "tokens_available": round(self.token_bucket.tokens, 2),
+        }
+
+    # 디스패치
+    def _take_batch(self):
+        """대기열 길이에 따라 1개 또는 같은 모델 요청 여러 개를 꺼냄
+
+        응답을 '### 심볼' 제목으로 나누므로 같은 종목 요청(키만 다른)은 한 묶음에 넣지 않음
+        """
+        first = self._queue.popleft()
+        batch = [first]
+        if len(self._queue) + 1 >= self.batch_threshold:
+            model = first.request["model"]
+            symbols = {first.symbol}
+            rest = deque()
+            while self._queue and len(batch) < self.max_batch_size:
+                item = self._queue.popleft()
+                if item.request["model"] == model and item.symbol not in symbols:
+                    batch.append(item)
+                    symbols.add(item.symbol)
+                else:
+                    rest.append(item)
+            self._queue.extendleft(reversed(rest))
+        return batch
+
+    def _dispatch_loop(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                batch = self._take_batch()
+
+            request = batch[0].request if len(batch) == 1 else self._batch_request(batch)
+            cost = self._estimate_request_tokens(request)
+            wait = max(self.request_bucket.wait_time(1), self.token_bucket.wait_time(cost))
+            oldest = min(item.enqueued for item in batch)
+            if self.clock() - oldest + wait > self.max_wait:
+                for item in batch:
+                    self._fallback(item, "budget")
+                continue
+            if wait > 0:
+                self.sleep(wait)
+            self.request_bucket.consume(1)
+            self.token_bucket.consume(cost)
+
+            now = self.clock()
+            with self._cond:
+                self._waits.extend(now - item.enqueued for item in batch)
+                self._counters["llm_calls"] += 1
+                if len(batch) > 1:
+                    self._counters["batches"] += 1
+                    self._counters["batched_requests"] += len(batch)
+            if len(batch) == 1:
+                self._pool.submit(self._run_single, batch[0], cost)
+            else:
+                self._pool.submit(self._run_batch, batch, request, cost)
+
+    @staticmethod
+    def _estimate_request_tokens(request):
+        prompt = sum(estimate_tokens(m["content"]) for m in request["messages"])
+        return prompt + request.get("max_tokens", 1000)
+
+    def _batch_request(self, batch):
+        """여러 종목 프롬프트를 하나로 묶음"""
+        first = batch[0].request
+        sections = [f"### {item.symbol}\n{item.request['messages'][-1]['content'].strip()}" for item in batch]
+        return {
+            **first,
+            "messages": first["messages"][:-1] + [
+                {"role": "user", "content": BATCH_INSTRUCTION + "\n\n" + "\n\n".join(sections)}
+            ],
+            "max_tokens": min(first.get("max_tokens", 1000) * len(batch), 4000),
+        }
+
+    @staticmethod
+    def _split_batch_response(text, symbols):
+        """'### 심볼' 제목으로 응답을 종목별로 나눔"""
+        pattern = re.compile(r"^#{1,6}\s*(" + "|".join(re.escape(s) for s in symbols) + r")\b.*$", re.MULTILINE)
+        matches = list(pattern.finditer(text))
+        sections = {}
+        for i, match in enumerate(matches):
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+            sections.setdefault(match.group(1), text[match.start():end].strip())
+        return sections
+
+    # 실행
+    def _complete(self, item, text):
+        if self.cache is not None:
+            self.cache.put(item.job.key, text)
+        with self._cond:
+            self._counters["completed"] += 1
+            self._inflight.pop(item.job.key, None)
+        item.job.finish()
+
+    def _fallback(self, item, reason, error=None):
+        """기본 기술적 분석으로 대체 (캐시하지 않음)"""
+        with self._cond:
+            self._fallbacks[reason] += 1
+            self._inflight.pop(item.job.key, None)
+        item.job.fallback_reason = reason
+        item.job.append(("\n\n" if item.job.text else "") + item.fallback)
+        item.job.finish(error=error)
+
+    def _run_single(self, item, cost):
+        try:
+            with METRICS.span("groq", item.symbol):
+                for chunk in self.client.chat.completions.create(stream=True, **item.request):
+                    if not chunk.choices:
+                        continue
+                    content = chunk.choices[0].delta.content
+                    if content:
+                        item.job.append(content)
+        except Exception as e:
+            self._fallback(item, "error", e)
+            return
+        # 추정치보다 적게 쓴 토큰은 돌려받음
+        used = self._estimate_request_tokens({**item.request, "max_tokens": 0}) + estimate_tokens(item.job.text)
+        self.token_bucket.refund(max(0, cost - used))
+        self._complete(item, item.job.text)
+
+    def _run_batch(self, batch, request, cost):
+        try:
+            with METRICS.span("groq.batch"):
+                completion = self.client.chat.completions.create(**request)
+            text = completion.choices[0].message.content or ""
+        except Exception as e:
+            for item in batch:
+                self._fallback(item, "error", e)
+            return
+        usage = getattr(completion, "usage", None)
+        used = getattr(usage, "total_tokens", None) or (
+            self._estimate_request_tokens({**request, "max_tokens": 0}) + estimate_tokens(text)
+        )
+        self.token_bucket.refund(max(0, cost - used))
+
+        sections = self._split_batch_response(text, [item.symbol for item in batch])
+        for item in batch:
+            section = sections.get(item.symbol)
+            if section:
+                item.job.append(section)
+                self._complete(item, section)
+            else:
+                self._fallback(item, "parse")
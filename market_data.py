@@ -0,0 +1,106 @@
+"""시장 데이터 조회
+
+Streamlit 에 의존하지 않는 순수 데이터 계층입니다. ``provider`` 인자로
+yfinance 와 같은 인터페이스(``download``, ``Ticker``)를 가진 객체를 넘기면
+로컬 스텁으로도 동작합니다.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import yfinance as yf
+
+from metrics import METRICS
+
+# 배치 다운로드가 실패한 심볼을 개별 조회할 때의 최대 동시 요청 수
+MAX_WORKERS = 8
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def _normalize(df):
+    """OHLCV 컬럼만 남기고 빈 행 제거"""
+    if df is None or df.empty:
+        return pd.DataFrame()
+    columns = [c for c in OHLCV_COLUMNS if c in df.columns]
+    df = df[columns].dropna(how="all")
+    return df if not df.empty else pd.DataFrame()
+
+
+def _split_download(raw, symbols):
+    """멀티 티커 다운로드 결과를 심볼별 DataFrame 으로 분리"""
+    frames = {}
+    if raw is None or raw.empty:
+        return frames
+
+    if not isinstance(raw.columns, pd.MultiIndex):
+        # 단일 심볼은 평평한 컬럼으로 내려올 수 있음
+        if len(symbols) == 1:
+            df = _normalize(raw)
+            if not df.empty:
+                frames[symbols[0]] = df
+        return frames
+
+    tickers = raw.columns.get_level_values(0)
+    for symbol in symbols:
+        if symbol not in tickers:
+            continue
+        df = _normalize(raw[symbol])
+        if not df.empty:
+            frames[symbol] = df
+    return frames
+
+
+def fetch_history(symbol, period="1mo", interval="1d", provider=None, **kwargs):
+    """단일 심볼 시세 조회 (실패 시 빈 DataFrame)"""
+    provider = provider or yf
+    if "start" in kwargs:
+        # yfinance 는 start 와 period 를 함께 주면 end = start + period 로 해석
+        period = None
+    try:
+        with METRICS.span("yfinance", symbol):
+            df = provider.Ticker(symbol).history(period=period, interval=interval, **kwargs)
+        return df if df is not None else pd.DataFrame()
+    except Exception:
+        return pd.DataFrame()
+
+
+def fetch_history_batch(symbols, period="5d", interval="1d", provider=None, max_workers=MAX_WORKERS, **kwargs):
+    """여러 심볼 시세를 한 번의 멀티 티커 요청으로 조회
+
+    배치 결과에서 빠진 심볼만 스레드 풀로 개별 재조회합니다.
+    반환값은 ``{symbol: DataFrame}`` 이며 데이터가 없는 심볼은 빠집니다.
+    ``start`` 를 주면 그 시점 이후만 조회합니다.
+    """
+    provider = provider or yf
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return {}
+    if "start" in kwargs:
+        period = None
+
+    try:
+        with METRICS.span("yfinance.batch"):
+            raw = provider.download(
+                symbols,
+                period=period,
+                interval=interval,
+                group_by="ticker",
+                auto_adjust=True,
+                threads=True,
+                progress=False,
+                **kwargs,
+            )
+        frames = _split_download(raw, symbols)
+    except Exception:
+        frames = {}
+
+    missing = [s for s in symbols if s not in frames]
+    if missing:
+        workers = max(1, min(max_workers, len(missing)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(lambda s: _normalize(fetch_history(s, period, interval, provider, **kwargs)), missing)
+            for symbol, df in zip(missing, results):
+                if not df.empty:
+                    frames[symbol] = df
+
+    return frames
@@ -0,0 +1,245 @@
+"""실행 단계별 시간과 캐시 지표
+
+스크립트 실행(rerun) 한 번을 단계(yfinance, data, indicators, chart, news, ai,
+groq ...)와 심볼별 구간으로 재고, 최근 측정값으로 p50/p95/p99 를 계산합니다.
+캐시는 조회/미스/밀려남(eviction) 횟수를 셉니다. 결과는 Prometheus 텍스트와
+JSON 으로 내보냅니다 (파일로 주기적으로 쓰면 node_exporter textfile 수집기로
+가져갈 수 있음).
+
+Streamlit 에 의존하지 않으며, 프로세스 전체가 ``METRICS`` 하나를 공유합니다.
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# 단계별/심볼별로 보관하는 최근 측정값 수 (백분위 계산용)
+STAGE_SAMPLES = 1024
+SYMBOL_SAMPLES = 256
+QUANTILES = (0.5, 0.95, 0.99)
+METRICS_PREFIX = "smartinvestor"
+METRICS_EXPORT_INTERVAL = 15
+
+
+def percentile(sorted_values, q):
+    """정렬된 값의 q 분위 (nearest-rank)"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class CacheStats:
+    """캐시 하나의 조회/미스/밀려남 횟수 (적중 = 조회 - 미스)"""
+
+    def __init__(self):
+        self.lookups = 0
+        self.misses = 0
+        self.evictions = 0
+        # 한 번 채워졌던 키 - 다시 미스가 나면 만료/밀려난 것으로 봄
+        self._filled = set()
+        self._lock = threading.Lock()
+
+    def lookup(self, n=1):
+        with self._lock:
+            self.lookups += n
+
+    def miss(self, key=None):
+        """미스 기록 - ``key`` 가 전에 채워졌던 것이면 eviction 으로도 셈"""
+        with self._lock:
+            self.misses += 1
+            if key is not None:
+                if key in self._filled:
+                    self.evictions += 1
+                self._filled.add(key)
+
+    def evict(self, n=1):
+        with self._lock:
+            self.evictions += n
+
+    def snapshot(self):
+        with self._lock:
+            hits = self.lookups - self.misses
+            return {
+                "lookups": self.lookups,
+                "hits": hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": hits / self.lookups if self.lookups else 0.0,
+            }
+
+
+class Trace:
+    """스크립트 실행 한 번의 구간 목록 ``[(stage, symbol, 시작 오프셋, 걸린 시간)]``"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+        self.seconds = None
+
+
+class Metrics:
+    """단계별 구간 시간 + 캐시 카운터 레지스트리"""
+
+    def __init__(self, stage_samples=STAGE_SAMPLES, symbol_samples=SYMBOL_SAMPLES):
+        self.stage_samples = stage_samples
+        self.symbol_samples = symbol_samples
+        # {stage: [최근 측정값 deque, 횟수, 합계]}
+        self._stages = {}
+        # {(stage, symbol): 최근 측정값 deque}
+        self._symbols = {}
+        self._caches = {}
+        self._lock = threading.Lock()
+        self._trace = contextvars.ContextVar("metrics_trace", default=None)
+        self._exporter = None
+
+    # 구간
+    def observe(self, stage, seconds, symbol=None):
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = self._stages[stage] = [deque(maxlen=self.stage_samples), 0, 0.0]
+            entry[0].append(seconds)
+            entry[1] += 1
+            entry[2] += seconds
+            if symbol is not None:
+                samples = self._symbols.get((stage, symbol))
+                if samples is None:
+                    samples = self._symbols[(stage, symbol)] = deque(maxlen=self.symbol_samples)
+                samples.append(seconds)
+
+    @contextmanager
+    def span(self, stage, symbol=None):
+        """``with METRICS.span("chart", symbol):`` - 걸린 시간을 기록하고 진행 중인 trace 에 추가"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.observe(stage, elapsed, symbol)
+            trace = self._trace.get()
+            if trace is not None:
+                trace.spans.append((stage, symbol, started - trace.started, elapsed))
+
+    def begin_trace(self):
+        """현재 스레드(스크립트 실행)의 구간을 모으기 시작"""
+        trace = Trace()
+        self._trace.set(trace)
+        return trace
+
+    def end_trace(self, trace, stage="rerun"):
+        """trace 를 닫고 전체 시간을 ``stage`` 로 기록"""
+        trace.seconds = time.perf_counter() - trace.started
+        if self._trace.get() is trace:
+            self._trace.set(None)
+        self.observe(stage, trace.seconds)
+        return trace
+
+    # 캐시
+    def cache(self, name):
+        """이름별 ``CacheStats`` (없으면 생성)"""
+        with self._lock:
+            stats = self._caches.get(name)
+            if stats is None:
+                stats = self._caches[name] = CacheStats()
+            return stats
+
+    def register_cache(self, name, stats):
+        """다른 객체가 들고 있는 ``CacheStats`` 를 이 이름으로 내보냄"""
+        with self._lock:
+            self._caches[name] = stats
+        return stats
+
+    # 조회/내보내기
+    def snapshot(self):
+        """``{"stages", "symbols", "caches"}`` - 시간은 초"""
+        with self._lock:
+            stages = {name: (sorted(samples), count, total) for name, (samples, count, total) in self._stages.items()}
+            symbols = {key: sorted(samples) for key, samples in self._symbols.items()}
+            caches = dict(self._caches)
+
+        def summary(values):
+            row = {f"p{round(q * 100)}": percentile(values, q) for q in QUANTILES}
+            row["max"] = values[-1] if values else 0.0
+            return row
+
+        return {
+            "stages": {
+                name: {"count": count, "sum": total, **summary(values)}
+                for name, (values, count, total) in sorted(stages.items())
+            },
+            "symbols": [
+                {"stage": stage, "symbol": symbol, "count": len(values), **summary(values)}
+                for (stage, symbol), values in sorted(symbols.items())
+            ],
+            "caches": {name: stats.snapshot() for name, stats in sorted(caches.items())},
+        }
+
+    def to_json(self):
+        return json.dumps({"generated_at": time.time(), **self.snapshot()}, indent=2)
+
+    def to_prometheus(self, prefix=METRICS_PREFIX):
+        """Prometheus 텍스트 형식"""
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_stage_seconds Script rerun stage duration (recent samples).",
+            f"# TYPE {prefix}_stage_seconds summary",
+        ]
+        for stage, row in snapshot["stages"].items():
+            for q in QUANTILES:
+                lines.append(f'{prefix}_stage_seconds{{stage="{stage}",quantile="{q}"}} {row[f"p{round(q * 100)}"]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {row["sum"]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {row["count"]}')
+        lines += [
+            f"# HELP {prefix}_symbol_stage_seconds Stage duration per symbol (recent samples).",
+            f"# TYPE {prefix}_symbol_stage_seconds summary",
+        ]
+        for row in snapshot["symbols"]:
+            labels = f'stage="{row["stage"]}",symbol="{_escape(row["symbol"])}"'
+            for q in QUANTILES:
+                lines.append(f'{prefix}_symbol_stage_seconds{{{labels},quantile="{q}"}} {row[f"p{round(q * 100)}"]:.6f}')
+            lines.append(f'{prefix}_symbol_stage_seconds_count{{{labels}}} {row["count"]}')
+        for counter in ("lookups", "hits", "misses", "evictions"):
+            lines += [
+                f"# HELP {prefix}_cache_{counter}_total Cache {counter}.",
+                f"# TYPE {prefix}_cache_{counter}_total counter",
+            ]
+            for name, row in snapshot["caches"].items():
+                lines.append(f'{prefix}_cache_{counter}_total{{cache="{name}"}} {row[counter]}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, directory="."):
+        """``metrics.prom`` 과 ``metrics.json`` 을 임시 파일에 쓴 뒤 교체"""
+        os.makedirs(directory, exist_ok=True)
+        for name, text in (("metrics.prom", self.to_prometheus()), ("metrics.json", self.to_json())):
+            path = os.path.join(directory, name)
+            with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(f"{path}.tmp", path)
+
+    def start_exporter(self, directory=".", interval=METRICS_EXPORT_INTERVAL):
+        """``interval`` 초마다 파일로 내보내는 데몬 스레드 (프로세스당 하나)"""
+        with self._lock:
+            if self._exporter is not None:
+                return self._exporter
+
+            def loop():
+                while True:
+                    time.sleep(interval)
+                    try:
+                        self.export(directory)
+                    except OSError:
+                        pass
+
+            self._exporter = threading.Thread(target=loop, name="metrics-exporter", daemon=True)
+            self._exporter.start()
+            return self._exporter
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+METRICS = Metrics()
@@ -0,0 +1,349 @@
+"""뉴스 수집기와 로컬 뉴스 인덱스
+
+백그라운드 스레드가 설정된 RSS 피드와 종목별 뉴스 피드를 주기적으로
+조회합니다. 피드마다 ETag / Last-Modified 를 저장해 조건부 요청을 보내므로
+바뀌지 않은 피드는 본문을 다시 받지 않습니다. 기사는 URL 해시로 중복을
+제거하고 본문에 나온 종목에 태그해 SQLite(WAL)에 저장합니다.
+
+탭에서는 ``NewsIndex.latest`` 로 종목별 최근 기사 목록을 메모리에서 바로
+읽습니다. 피드 주소는 파일 경로도 되므로 로컬 예제 피드로 동작을 확인할
+수 있습니다 (``fixtures/news``).
+"""
+import calendar
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit
+
+try:
+    import feedparser
+    FEEDPARSER_AVAILABLE = True
+except ImportError:
+    FEEDPARSER_AVAILABLE = False
+
+try:
+    from bs4 import BeautifulSoup
+    BS4_AVAILABLE = True
+except ImportError:
+    BS4_AVAILABLE = False
+
+from metrics import CacheStats
+
+NEWS_DB_FILE = "news_index.db"
+# 시장 전체 뉴스 (README 의 Investing.com RSS)
+DEFAULT_FEEDS = ["https://www.investing.com/rss/news_25.rss"]
+# 종목별 뉴스 피드
+SYMBOL_FEED_URL = "https://feeds.finance.yahoo.com/rss/2.0/headline?s={symbol}&region=US&lang=en-US"
+NEWS_POLL_INTERVAL = 600
+# 종목별로 메모리에 들고 있는 최근 기사 수
+NEWS_PER_SYMBOL = 20
+# 메모리 인덱스에 두는 종목 수 (오래 안 본 종목부터 밀려남)
+NEWS_CACHE_SYMBOLS = 512
+# 종목에 태그되지 않은 시장 뉴스용 태그
+MARKET_TAG = "*"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    url_hash TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    title TEXT NOT NULL,
+    summary TEXT,
+    source TEXT,
+    published REAL NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS article_symbols (
+    symbol TEXT NOT NULL,
+    url_hash TEXT NOT NULL REFERENCES articles(url_hash) ON DELETE CASCADE,
+    published REAL NOT NULL,
+    PRIMARY KEY (symbol, url_hash)
+);
+CREATE INDEX IF NOT EXISTS article_symbols_latest ON article_symbols(symbol, published DESC);
+CREATE TABLE IF NOT EXISTS feeds (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    modified TEXT,
+    checked_at REAL
+);
+"""
+
+_TICKER_TOKEN = re.compile(r"\$?\b[A-Z][A-Z0-9.]{0,5}\b")
+
+
+def normalize_url(url):
+    """추적용 쿼리/프래그먼트 차이로 같은 기사가 두 번 들어가지 않도록 정리"""
+    parts = urlsplit(url.strip())
+    query = "&".join(
+        q for q in parts.query.split("&") if q and not q.lower().startswith(("utm_", "guccounter", "ncid="))
+    )
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), query, ""))
+
+
+def url_hash(url):
+    return hashlib.sha1(normalize_url(url).encode()).hexdigest()
+
+
+def clean_text(html):
+    """RSS 요약의 HTML 태그 제거"""
+    if not html:
+        return ""
+    if BS4_AVAILABLE:
+        return BeautifulSoup(html, "html.parser").get_text(" ", strip=True)
+    return re.sub(r"<[^>]+>", " ", html).strip()
+
+
+def tag_symbols(text, symbols):
+    """제목/요약에 나온 종목 (``BTC-USD`` 는 ``BTC`` 로도 찾음)"""
+    tokens = set()
+    for token in _TICKER_TOKEN.findall(text):
+        if token.startswith("$"):
+            tokens.add(token[1:])
+        elif len(token) >= 2:
+            # 한 글자 대문자는 단어(A, I)와 구분되지 않으므로 $ 가 붙은 경우만
+            tokens.add(token)
+    return {s for s in symbols if s in tokens or s.split("-")[0] in tokens}
+
+
+def parse_entry(entry, source=None):
+    """feedparser 항목 -> 기사 dict (링크가 없으면 None)"""
+    link = entry.get("link")
+    if not link:
+        return None
+    published = entry.get("published_parsed") or entry.get("updated_parsed")
+    return {
+        "url": link,
+        "title": clean_text(entry.get("title", "")) or link,
+        "summary": clean_text(entry.get("summary", ""))[:1000],
+        "source": source,
+        "published": calendar.timegm(published) if published else time.time(),
+    }
+
+
+class NewsIndex:
+    """URL 해시로 중복을 제거한 기사 저장소 + 종목별 최근 기사 메모리 인덱스"""
+
+    def __init__(self, path=NEWS_DB_FILE, per_symbol=NEWS_PER_SYMBOL, max_symbols=NEWS_CACHE_SYMBOLS):
+        self.path = path
+        self.per_symbol = per_symbol
+        self.max_symbols = max_symbols
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # {symbol: 최신순 기사 목록} - 처음 조회할 때 DB 에서 채움, LRU
+        self._latest = OrderedDict()
+        self.cache_stats = CacheStats()
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def _load_latest(self, symbol):
+        rows = self._connect().execute(
+            "SELECT a.url, a.title, a.summary, a.source, a.published FROM article_symbols s "
+            "JOIN articles a ON a.url_hash = s.url_hash "
+            "WHERE s.symbol = ? ORDER BY s.published DESC LIMIT ?",
+            (symbol, self.per_symbol),
+        )
+        return [self._as_article(row) for row in rows]
+
+    @staticmethod
+    def _as_article(row):
+        # 기존 yfinance 뉴스와 같은 title / link 키
+        return {
+            "title": row["title"],
+            "link": row["url"],
+            "summary": row["summary"],
+            "source": row["source"],
+            "published": row["published"],
+        }
+
+    def latest(self, symbol, limit=5):
+        """종목의 최근 기사 (처음 한 번 이후에는 메모리에서 바로 반환)"""
+        self.cache_stats.lookup()
+        with self._lock:
+            articles = self._latest.get(symbol)
+            if articles is None:
+                self.cache_stats.miss()
+                articles = self._latest[symbol] = self._load_latest(symbol)
+                if len(self._latest) > self.max_symbols:
+                    self._latest.popitem(last=False)
+                    self.cache_stats.evict()
+            else:
+                self._latest.move_to_end(symbol)
+            return articles[:limit]
+
+    def add(self, articles, symbols=()):
+        """기사 저장 - ``symbols`` 와 기사별 ``symbols`` 에 태그, 새로 들어간 기사 수 반환"""
+        now = time.time()
+        added = 0
+        tagged = []
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for article in articles:
+                key = url_hash(article["url"])
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO articles (url_hash, url, title, summary, source, published, fetched_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, article["url"], article["title"], article.get("summary"), article.get("source"),
+                     article["published"], now),
+                )
+                added += cursor.rowcount
+                # 이미 있는 기사면 처음 저장된 내용 기준으로 태그만 추가
+                row = conn.execute(
+                    "SELECT url, title, summary, source, published FROM articles WHERE url_hash = ?", (key,)
+                ).fetchone()
+                for symbol in set(symbols) | set(article.get("symbols", ())) or {MARKET_TAG}:
+                    cursor = conn.execute(
+                        "INSERT OR IGNORE INTO article_symbols (symbol, url_hash, published) VALUES (?, ?, ?)",
+                        (symbol, key, row["published"]),
+                    )
+                    if cursor.rowcount:
+                        tagged.append((symbol, self._as_article(row)))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        with self._lock:
+            for symbol, article in tagged:
+                latest = self._latest.get(symbol)
+                if latest is None:
+                    continue
+                latest.append(article)
+                latest.sort(key=lambda a: a["published"], reverse=True)
+                del latest[self.per_symbol:]
+        return added
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def feed_state(self, url):
+        """조건부 요청용 (etag, modified)"""
+        row = self._connect().execute("SELECT etag, modified FROM feeds WHERE url = ?", (url,)).fetchone()
+        return (row["etag"], row["modified"]) if row else (None, None)
+
+    def save_feed_state(self, url, etag, modified):
+        self._connect().execute(
+            "INSERT INTO feeds (url, etag, modified, checked_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET etag = excluded.etag, modified = excluded.modified, "
+            "checked_at = excluded.checked_at",
+            (url, etag, modified, time.time()),
+        )
+
+
+class NewsIngestor:
+    """피드를 주기적으로 조회해 ``NewsIndex`` 에 넣는 백그라운드 수집기"""
+
+    def __init__(self, index, feeds=DEFAULT_FEEDS, symbol_feed_url=SYMBOL_FEED_URL,
+                 symbols=None, interval=NEWS_POLL_INTERVAL, parse=None):
+        self.index = index
+        self.feeds = list(feeds)
+        self.symbol_feed_url = symbol_feed_url
+        # 매 주기마다 호출해 조회할 종목 목록을 얻음 (관심 종목 전체)
+        self.symbols = symbols or (lambda: [])
+        self.interval = interval
+        self.parse = parse or (feedparser.parse if FEEDPARSER_AVAILABLE else None)
+        self.stats = {"polls": 0, "not_modified": 0, "errors": 0, "articles": 0}
+        self._wake = threading.Event()
+        self._requested = set()
+        # 한 번이라도 조회한 종목 (request 는 처음 보는 종목만 바로 조회)
+        self._polled = set()
+        self._requested_lock = threading.Lock()
+        self._thread = None
+
+    def fetch_feed(self, url):
+        """조건부 요청으로 피드 조회 - 바뀌지 않았으면 None"""
+        etag, modified = self.index.feed_state(url)
+        self.stats["polls"] += 1
+        try:
+            parsed = self.parse(url, etag=etag, modified=modified)
+        except Exception:
+            self.stats["errors"] += 1
+            return None
+        if parsed.get("status") == 304:
+            self.stats["not_modified"] += 1
+            return None
+        if parsed.get("bozo") and not parsed.get("entries"):
+            self.stats["errors"] += 1
+            return None
+        self.index.save_feed_state(url, parsed.get("etag"), parsed.get("modified"))
+        return parsed
+
+    def poll_feed(self, url, symbols):
+        """시장 뉴스 피드 - 본문에 나온 관심 종목에 태그"""
+        parsed = self.fetch_feed(url)
+        if parsed is None:
+            return 0
+        source = parsed.get("feed", {}).get("title")
+        articles = []
+        for entry in parsed.get("entries", []):
+            article = parse_entry(entry, source)
+            if article is None:
+                continue
+            article["symbols"] = tag_symbols(f"{article['title']} {article['summary']}", symbols)
+            articles.append(article)
+        added = self.index.add(articles)
+        self.stats["articles"] += added
+        return added
+
+    def poll_symbol(self, symbol):
+        """종목별 뉴스 피드 - 모든 기사를 해당 종목에 태그"""
+        self._polled.add(symbol)
+        parsed = self.fetch_feed(self.symbol_feed_url.format(symbol=symbol))
+        if parsed is None:
+            return 0
+        source = parsed.get("feed", {}).get("title")
+        articles = [a for a in (parse_entry(e, source) for e in parsed.get("entries", [])) if a]
+        added = self.index.add(articles, symbols=[symbol])
+        self.stats["articles"] += added
+        return added
+
+    def run_once(self, symbols=None):
+        """한 주기 - 시장 피드와 종목 피드를 모두 조회하고 새 기사 수 반환"""
+        symbols = sorted(set(self.symbols() if symbols is None else symbols))
+        added = sum(self.poll_feed(url, symbols) for url in self.feeds)
+        return added + sum(self.poll_symbol(symbol) for symbol in symbols)
+
+    def request(self, symbol):
+        """새로 추가된 종목을 다음 주기를 기다리지 않고 바로 조회"""
+        if symbol in self._polled:
+            return
+        with self._requested_lock:
+            self._requested.add(symbol)
+        self._wake.set()
+
+    def start(self):
+        if self.parse is None or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._thread = threading.Thread(target=self._loop, name="news-ingestor", daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        next_full = 0.0
+        while True:
+            # 꺼내기 전에 지워야 그 사이에 들어온 request() 의 깨움이 다음 wait 에 남음
+            self._wake.clear()
+            with self._requested_lock:
+                requested, self._requested = self._requested, set()
+            try:
+                if time.monotonic() >= next_full:
+                    watched = set(self.symbols())
+                    self.run_once(watched)
+                    requested -= watched
+                    next_full = time.monotonic() + self.interval
+                for symbol in requested:
+                    self.poll_symbol(symbol)
+            except Exception:
+                self.stats["errors"] += 1
+            self._wake.wait(max(0.0, next_full - time.monotonic()))
@@ -0,0 +1,248 @@
+"""공유 시세 폴러와 세션 간 pub/sub
+
+프로세스에 ``QuotePoller`` 하나만 두고, 모든 세션이 구독한 종목의 합집합을
+배치 요청 한 번으로 주기적으로 조회해 바뀐 시세만 ``QuoteBus`` 로 발행합니다.
+세션은 ``bus.subscribe(symbols)`` 로 받은 ``Subscription`` 에서 최신 시세를
+읽으므로, 업스트림 요청은 사용자 수가 아니라 서로 다른 종목 수에만 비례합니다.
+
+구독은 약한 참조로 관리하므로 세션 상태가 사라지면 자동으로 해지됩니다.
+네트워크 없이 쓸 때는 ``SimulatedFeed`` (랜덤 워크 시세)를 ``fetch`` 로 넘깁니다.
+"""
+import threading
+import time
+import weakref
+
+import numpy as np
+
+from market_data import fetch_history_batch
+from metrics import METRICS
+
+# 폴러 조회 주기와 화면 카드 갱신 주기 (초)
+QUOTE_POLL_INTERVAL = 15
+QUOTE_REFRESH_SECONDS = 5
+# 전일 종가를 구하려고 받는 기간
+QUOTE_PERIOD = "5d"
+
+
+class Quote:
+    """종목 하나의 최신 시세"""
+
+    __slots__ = ("symbol", "price", "previous_close", "time")
+
+    def __init__(self, symbol, price, previous_close, time):
+        self.symbol = symbol
+        self.price = price
+        self.previous_close = previous_close
+        # 마지막 바 시각 (epoch 초)
+        self.time = time
+
+    @property
+    def change_pct(self):
+        return (self.price / self.previous_close - 1) * 100 if self.previous_close else 0.0
+
+    def __eq__(self, other):
+        return (isinstance(other, Quote) and self.symbol == other.symbol and self.price == other.price
+                and self.previous_close == other.previous_close)
+
+    __hash__ = None
+
+
+def fetch_quotes(symbols, provider=None):
+    """``{symbol: Quote}`` - 배치 요청 하나로 최근 일봉을 받아 마지막/직전 종가 사용"""
+    quotes = {}
+    for symbol, df in fetch_history_batch(symbols, QUOTE_PERIOD, provider=provider).items():
+        close = df["Close"].dropna()
+        if close.empty:
+            continue
+        previous = close.iloc[-2] if len(close) > 1 else close.iloc[-1]
+        quotes[symbol] = Quote(symbol, float(close.iloc[-1]), float(previous), close.index[-1].timestamp())
+    return quotes
+
+
+class Subscription:
+    """세션 하나가 들고 있는 구독 - 구독 종목의 최신 시세와 버전"""
+
+    def __init__(self, bus, symbols):
+        self.bus = bus
+        self.symbols = frozenset(symbols)
+        # 새 시세가 들어올 때마다 1 증가
+        self.version = 0
+        self._quotes = {}
+        self._changed = threading.Condition()
+
+    def quotes(self):
+        """``{symbol: Quote}`` 현재 값 (아직 시세가 없는 종목은 빠짐)"""
+        with self._changed:
+            return dict(self._quotes)
+
+    def wait(self, version, timeout=None):
+        """``version`` 이후 새 시세가 들어올 때까지 대기 - 현재 버전 반환"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version > version, timeout)
+            return self.version
+
+    def update(self, symbols):
+        """구독 종목 변경 (관심 종목이 바뀌었을 때)"""
+        self.bus.resubscribe(self, symbols)
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+    def _deliver(self, quotes):
+        with self._changed:
+            self._quotes.update(quotes)
+            self.version += 1
+            self._changed.notify_all()
+
+    def _retain(self, symbols):
+        with self._changed:
+            self.symbols = frozenset(symbols)
+            self._quotes = {s: q for s, q in self._quotes.items() if s in self.symbols}
+
+
+class QuoteBus:
+    """프로세스 내 시세 pub/sub - 종목별 최신 값을 들고 있다가 구독자에게 전달"""
+
+    def __init__(self):
+        self._latest = {}
+        self._subscriptions = weakref.WeakSet()
+        self._lock = threading.Lock()
+        # 아직 시세가 없는 종목이 구독되면 켜짐 - 폴러가 주기를 기다리지 않고 바로 조회
+        self.wanted = threading.Event()
+        self.stats = {"published": 0, "delivered": 0}
+
+    def subscribe(self, symbols):
+        subscription = Subscription(self, symbols)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        self._prime(subscription)
+        return subscription
+
+    def resubscribe(self, subscription, symbols):
+        with self._lock:
+            subscription._retain(symbols)
+            self._subscriptions.add(subscription)
+        self._prime(subscription)
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def _prime(self, subscription):
+        """이미 받아 둔 시세를 새 구독자에게 바로 전달"""
+        with self._lock:
+            known = {s: self._latest[s] for s in subscription.symbols if s in self._latest}
+        if known:
+            subscription._deliver(known)
+        if len(known) < len(subscription.symbols):
+            self.wanted.set()
+
+    def symbols(self):
+        """살아 있는 구독 전체의 종목 합집합"""
+        with self._lock:
+            return set().union(*(s.symbols for s in list(self._subscriptions)))
+
+    def missing(self, symbols):
+        """아직 한 번도 발행되지 않은 종목"""
+        with self._lock:
+            return [s for s in symbols if s not in self._latest]
+
+    def latest(self, symbols):
+        with self._lock:
+            return {s: self._latest[s] for s in symbols if s in self._latest}
+
+    @property
+    def subscribers(self):
+        return len(self._subscriptions)
+
+    def publish(self, quotes):
+        """``{symbol: Quote}`` 중 바뀐 것만 발행 - 발행한 수 반환"""
+        with self._lock:
+            changed = {s: q for s, q in quotes.items() if self._latest.get(s) != q}
+            self._latest.update(changed)
+            subscriptions = list(self._subscriptions)
+            self.stats["published"] += len(changed)
+        if not changed:
+            return 0
+        delivered = 0
+        for subscription in subscriptions:
+            relevant = {s: q for s, q in changed.items() if s in subscription.symbols}
+            if relevant:
+                subscription._deliver(relevant)
+                delivered += 1
+        with self._lock:
+            self.stats["delivered"] += delivered
+        return len(changed)
+
+
+class QuotePoller:
+    """구독된 종목을 주기적으로 한꺼번에 조회해 버스로 발행하는 백그라운드 스레드"""
+
+    def __init__(self, bus, fetch=None, interval=QUOTE_POLL_INTERVAL, provider=None):
+        self.bus = bus
+        self.fetch = fetch or (lambda symbols: fetch_quotes(symbols, provider))
+        self.interval = interval
+        self.stats = {"polls": 0, "symbols": 0, "errors": 0}
+        self._thread = None
+        self._stop = threading.Event()
+
+    def poll(self, symbols=None):
+        """``symbols`` (기본: 구독 중인 전체)를 한 번 조회해 발행 - 발행한 수 반환"""
+        symbols = sorted(self.bus.symbols() if symbols is None else set(symbols))
+        if not symbols:
+            return 0
+        try:
+            with METRICS.span("quotes.poll"):
+                quotes = self.fetch(symbols)
+        except Exception:
+            self.stats["errors"] += 1
+            return 0
+        self.stats["polls"] += 1
+        self.stats["symbols"] += len(symbols)
+        return self.bus.publish(quotes)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="quote-poller", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.bus.wanted.set()
+
+    def _run(self):
+        next_poll = 0.0
+        while not self._stop.is_set():
+            if time.monotonic() >= next_poll:
+                self.poll()
+                next_poll = time.monotonic() + self.interval
+            else:
+                # 새 종목만 먼저 조회하고 전체 주기는 그대로 유지
+                self.poll(self.bus.missing(self.bus.symbols()))
+            self.bus.wanted.wait(max(0.0, next_poll - time.monotonic()))
+            self.bus.wanted.clear()
+
+
+class SimulatedFeed:
+    """네트워크 없이 쓰는 랜덤 워크 시세 - ``QuotePoller(bus, fetch=SimulatedFeed())``"""
+
+    def __init__(self, prices=None, volatility=0.002, seed=0):
+        # 시작 가격 (없는 종목은 심볼로 정한 10~500 사이 값) = 전일 종가
+        self.prices = dict(prices or {})
+        self.volatility = volatility
+        self._rng = np.random.default_rng(seed)
+        self._previous = dict(self.prices)
+        self._lock = threading.Lock()
+
+    def __call__(self, symbols):
+        now = time.time()
+        quotes = {}
+        with self._lock:
+            for symbol in symbols:
+                if symbol not in self.prices:
+                    start = 10 + sum(map(ord, symbol)) % 490
+                    self.prices[symbol] = self._previous[symbol] = float(start)
+                self.prices[symbol] *= float(np.exp(self._rng.normal(0, self.volatility)))
+                quotes[symbol] = Quote(symbol, self.prices[symbol], self._previous[symbol], now)
+        return quotes
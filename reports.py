@@ -0,0 +1,246 @@
+"""PDF 투자 리포트
+
+포트폴리오 하나당 PDF 하나 (보유 종목 평가, 지표 요약, 가격 차트, 분석)를
+만들어 ``BytesIO`` 로 반환합니다. 여러 사용자의 리포트를 만들 때는
+종목별 산출물(지표 요약, 축소된 차트 데이터, 분석 텍스트)을 한 번만 계산해
+프로세스 풀의 각 워커에 한 번씩 넘기고, 워커는 PDF 조립만 합니다.
+
+차트는 plotly 이미지 변환(kaleido) 없이 reportlab 그래픽으로 그립니다.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from reportlab.graphics.charts.lineplots import LinePlot
+from reportlab.graphics.shapes import Drawing, String
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+from reportlab.platypus import KeepTogether, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from analysis import perform_technical_analysis
+from charts import lttb_indices
+
+# 한글이 들어가므로 reportlab 내장 CID 글꼴 사용 (글꼴 파일 필요 없음)
+REPORT_FONT = "HYGothic-Medium"
+# 리포트 차트 하나에 그리는 점 수
+REPORT_CHART_POINTS = 120
+SNAPSHOT_COLUMNS = ("RSI", "MACD", "CCI", "MFI", "Stoch_K")
+# 리포트에 쓰는 가격/지표 기간
+REPORT_PERIOD = "6mo"
+REPORT_WORKERS = os.cpu_count() or 2
+
+pdfmetrics.registerFont(UnicodeCIDFont(REPORT_FONT))
+
+
+def _styles():
+    base = getSampleStyleSheet()
+    return {
+        name: ParagraphStyle(f"report_{name}", parent=base[parent], fontName=REPORT_FONT, **extra)
+        for name, parent, extra in (
+            ("title", "Title", {}),
+            ("h2", "Heading2", {}),
+            ("h3", "Heading3", {}),
+            ("body", "BodyText", {"leading": 14}),
+            ("bullet", "BodyText", {"leftIndent": 12, "bulletIndent": 2, "leading": 14}),
+            ("small", "BodyText", {"fontSize": 8, "textColor": colors.grey}),
+        )
+    }
+
+
+def symbol_artifacts(symbol, df, analysis=None):
+    """리포트용 종목 산출물 (지표가 계산된 df 에서 한 번만 만들고 모든 리포트가 공유)"""
+    if df.empty:
+        return None
+    latest = df.iloc[-1]
+    close = df["Close"].to_numpy(dtype="float64")
+    picks = lttb_indices(close, REPORT_CHART_POINTS)
+    sma = df["SMA_20"].to_numpy(dtype="float64")[picks] if "SMA_20" in df.columns else []
+    return {
+        "symbol": symbol,
+        "price": float(latest["Close"]),
+        "start": df.index[0].strftime("%Y-%m-%d"),
+        "end": df.index[-1].strftime("%Y-%m-%d"),
+        "close": [(int(i), float(v)) for i, v in zip(picks, close[picks])],
+        "sma": [(int(i), float(v)) for i, v in zip(picks, sma) if v == v],
+        "snapshot": {c: float(latest[c]) for c in SNAPSHOT_COLUMNS if c in df.columns},
+        "analysis": analysis or perform_technical_analysis(df, symbol),
+    }
+
+
+def collect_artifacts(symbols, load):
+    """``load(symbol)`` (지표가 계산된 df) 로 종목별 산출물을 한 번씩 계산"""
+    artifacts = {}
+    for symbol in sorted(set(symbols)):
+        item = symbol_artifacts(symbol, load(symbol))
+        if item is not None:
+            artifacts[symbol] = item
+    return artifacts
+
+
+def _price_chart(item, width=170 * mm, height=55 * mm):
+    drawing = Drawing(width, height)
+    plot = LinePlot()
+    plot.x, plot.y = 30, 15
+    plot.width, plot.height = width - 40, height - 30
+    lines = [item["close"]] + ([item["sma"]] if item["sma"] else [])
+    plot.data = lines
+    plot.lines[0].strokeColor = colors.HexColor("#1f77b4")
+    plot.lines[0].strokeWidth = 1.2
+    if len(lines) > 1:
+        plot.lines[1].strokeColor = colors.orange
+        plot.lines[1].strokeWidth = 0.8
+    plot.xValueAxis.visible = False
+    plot.yValueAxis.labels.fontSize = 7
+    drawing.add(plot)
+    drawing.add(String(30, height - 10, f"{item['symbol']}  {item['start']} ~ {item['end']}  (MA20)",
+                       fontName=REPORT_FONT, fontSize=8))
+    return drawing
+
+
+def _markdown(text, styles):
+    """분석 텍스트(간단한 마크다운)를 문단으로 변환"""
+    flowables = []
+    for line in text.strip().splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            level = len(line) - len(line.lstrip("#"))
+            flowables.append(Paragraph(escape(line.lstrip("#").strip()), styles["h2" if level <= 2 else "h3"]))
+        elif line.startswith(("- ", "* ")):
+            flowables.append(Paragraph(escape(line[2:]), styles["bullet"], bulletText="•"))
+        else:
+            flowables.append(Paragraph(escape(line.replace("**", "")), styles["body"]))
+    return flowables
+
+
+def _table(rows, widths=None):
+    table = Table(rows, colWidths=widths, repeatRows=1)
+    table.setStyle(TableStyle([
+        ("FONTNAME", (0, 0), (-1, -1), REPORT_FONT),
+        ("FONTSIZE", (0, 0), (-1, -1), 8),
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1e3c72")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.lightgrey),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f4f6fa")]),
+    ]))
+    return table
+
+
+def _holdings_table(portfolio, artifacts):
+    rows = [["종목", "수량", "매수가", "현재가", "평가금액", "손익", "수익률"]]
+    total_cost = total_value = 0.0
+    for symbol, holding in sorted(portfolio.items()):
+        item = artifacts.get(symbol)
+        shares, buy_price = holding["shares"], holding["buy_price"]
+        cost = shares * buy_price
+        if item is None:
+            rows.append([symbol, f"{shares:,.2f}", f"${buy_price:,.2f}", "-", "-", "-", "-"])
+            continue
+        value = shares * item["price"]
+        total_cost += cost
+        total_value += value
+        rate = (value / cost - 1) * 100 if cost else 0.0
+        rows.append([symbol, f"{shares:,.2f}", f"${buy_price:,.2f}", f"${item['price']:,.2f}",
+                     f"${value:,.2f}", f"${value - cost:,.2f}", f"{rate:+.2f}%"])
+    total_rate = (total_value / total_cost - 1) * 100 if total_cost else 0.0
+    rows.append(["합계", "", "", "", f"${total_value:,.2f}", f"${total_value - total_cost:,.2f}",
+                 f"{total_rate:+.2f}%"])
+    return _table(rows)
+
+
+def _snapshot_table(symbols, artifacts):
+    rows = [["종목", "현재가"] + list(SNAPSHOT_COLUMNS)]
+    for symbol in symbols:
+        item = artifacts.get(symbol)
+        if item is None:
+            rows.append([symbol, "데이터 없음"] + [""] * len(SNAPSHOT_COLUMNS))
+            continue
+        rows.append([symbol, f"${item['price']:,.2f}"] + [
+            f"{item['snapshot'][c]:.2f}" if c in item["snapshot"] else "N/A" for c in SNAPSHOT_COLUMNS
+        ])
+    return _table(rows)
+
+
+def build_report(username, portfolios, portfolio, artifacts, analyses=None, generated_at=None):
+    """포트폴리오 PDF 를 만들어 처음 위치로 되감은 ``BytesIO`` 로 반환
+
+    ``portfolios`` 는 ``{"stocks": [...], ...}`` 관심 종목, ``portfolio`` 는
+    ``{symbol: {"shares", "buy_price"}}`` 보유 종목입니다. ``analyses`` 로 넘긴
+    종목별 텍스트(예: 완료된 AI 분석)는 기본 기술적 분석 대신 들어갑니다.
+    """
+    styles = _styles()
+    analyses = analyses or {}
+    generated_at = generated_at or datetime.now()
+    symbols = list(dict.fromkeys(
+        [s for symbols in portfolios.values() for s in symbols] + sorted(portfolio)
+    ))
+
+    story = [
+        Paragraph(escape(f"{username} 포트폴리오 리포트"), styles["title"]),
+        Paragraph(generated_at.strftime("%Y-%m-%d %H:%M") + " 기준 · SmartInvestor Pro", styles["small"]),
+        Spacer(1, 6 * mm),
+    ]
+    if portfolio:
+        story += [Paragraph("보유 종목 평가", styles["h2"]), _holdings_table(portfolio, artifacts), Spacer(1, 6 * mm)]
+    story += [Paragraph("지표 요약", styles["h2"]), _snapshot_table(symbols, artifacts)]
+
+    for symbol in symbols:
+        item = artifacts.get(symbol)
+        if item is None:
+            continue
+        story.append(KeepTogether([Spacer(1, 6 * mm), _price_chart(item)]))
+        story += _markdown(analyses.get(symbol, item["analysis"]), styles)
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, title=f"{username} portfolio report",
+                            leftMargin=18 * mm, rightMargin=18 * mm, topMargin=18 * mm, bottomMargin=18 * mm)
+    doc.build(story)
+    buffer.seek(0)
+    return buffer
+
+
+# 일괄 생성 (프로세스 풀)
+_shared_artifacts = {}
+
+
+def _init_worker(artifacts):
+    """풀 워커마다 한 번 - 공유 산출물을 받아 둠"""
+    global _shared_artifacts
+    _shared_artifacts = artifacts
+
+
+def _render(job, artifacts=None):
+    """리포트 하나 - ``artifacts`` 가 없으면 풀 워커가 받아 둔 산출물 사용"""
+    username, user, generated_at = job
+    if artifacts is None:
+        artifacts = _shared_artifacts
+    buffer = build_report(username, user.get("portfolios", {}), user.get("portfolio", {}),
+                          artifacts, generated_at=generated_at)
+    return username, buffer.getvalue()
+
+
+def generate_reports(users, artifacts, max_workers=REPORT_WORKERS, generated_at=None):
+    """``{username: 사용자 레코드}`` 전체의 리포트 ``{username: PDF bytes}``
+
+    ``artifacts`` 는 ``collect_artifacts`` 결과이고, 워커 수가 1 이면 현재
+    프로세스에서 차례로 만듭니다. Streamlit 처럼 스레드가 여러 개인 프로세스에서
+    fork 하면 잠긴 락이 복사될 수 있으므로 워커는 spawn 으로 띄웁니다.
+    """
+    generated_at = generated_at or datetime.now()
+    jobs = [(username, user, generated_at) for username, user in users.items()]
+    max_workers = max(1, min(max_workers, len(jobs)))
+    if max_workers == 1:
+        # 같은 프로세스의 다른 세션과 겹치지 않도록 전역 대신 직접 넘김
+        return dict(_render(job, artifacts) for job in jobs)
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(artifacts,)) as pool:
+        return dict(pool.map(_render, jobs, chunksize=max(1, len(jobs) // (max_workers * 4))))
@@ -0,0 +1,248 @@
+"""포트폴리오 손익/위험 분석
+
+보유 종목(``{symbol: {"shares", "buy_price"}}``)의 평가 손익, 비중,
+공분산/상관 행렬, 과거(historical)·모수(parametric) VaR/CVaR, 낙폭을
+계산합니다.
+
+수익률은 ``ReturnsMatrix`` 하나에 날짜 축을 맞춰 모아 두고, 시세가 갱신되면
+새로 들어온 바(와 장중에 바뀌는 마지막 바)의 수익률만 다시 계산해 덧붙입니다.
+각 종목의 수익률은 자기 직전 바 대비로 저장하므로, 거래일이 다른 종목(주식과
+암호화폐)을 섞어도 빈 칸을 0 으로 채우면 종가를 앞으로 채운 것과 같습니다.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+# 위험 계산에 쓰는 시세 기간과 최근 관측 수
+RISK_PERIOD = "1y"
+RISK_LOOKBACK = 252
+# 행렬에 보관하는 달력 일수
+RISK_KEEP_DAYS = 400
+CONFIDENCE = 0.95
+TRADING_DAYS = 252
+
+POSITION_COLUMNS = ["shares", "buy_price", "price", "value", "cost", "pnl", "pnl_pct", "day_pnl", "weight",
+                    "volatility", "risk_contribution"]
+
+
+DAY_NS = 86_400 * 10**9
+
+
+def _dates(index):
+    """일봉 시간축을 날짜(ns)로 - 시간대가 있으면 현지 날짜
+
+    ``tz_localize(None)`` 은 매번 빈도를 추론해 느리므로 바마다 UTC 오프셋을 더함
+    """
+    stamps = index.as_unit("ns").asi8
+    if index.tz is not None:
+        stamps = stamps + np.array([int(t.utcoffset().total_seconds()) for t in index], dtype="int64") * 10**9
+    return stamps - stamps % DAY_NS
+
+
+class ReturnsMatrix:
+    """종목별 일간 수익률을 공통 날짜 축에 모은 행렬 - 새 바만 추가 계산"""
+
+    def __init__(self, keep_days=RISK_KEEP_DAYS):
+        self.keep_days = keep_days
+        # 날짜(int64, 오름차순) x 종목 수익률 - 직전 바 대비, 그날 바가 없으면 NaN
+        self._dates = np.empty(0, dtype="int64")
+        self._values = np.empty((0, 0))
+        self._columns = {}
+        # {symbol: (직전 바 시각, 직전 바 종가, 마지막 바 시각, 마지막 종가)}
+        self._anchors = {}
+        self._lock = threading.Lock()
+        self.stats = {"updates": 0, "appended": 0, "rebuilt": 0}
+
+    @property
+    def returns(self):
+        """전체 행렬 (index=날짜, columns=심볼)"""
+        with self._lock:
+            return pd.DataFrame(self._values.copy(), index=pd.DatetimeIndex(self._dates), columns=list(self._columns))
+
+    def _tail(self, symbol, df):
+        """새로 계산할 ``(날짜, 수익률, 전체 재계산 여부)`` - 바뀐 게 없으면 None"""
+        stamps = df.index.as_unit("ns").asi8
+        close = df["Close"].to_numpy(dtype="float64")
+        finite = np.isfinite(close)
+        if not finite.all():
+            stamps, close = stamps[finite], close[finite]
+        if len(close) < 2:
+            return None
+        anchor = self._anchors.get(symbol)
+        if anchor == (stamps[-2], close[-2], stamps[-1], close[-1]):
+            return None
+        start = np.searchsorted(stamps, anchor[0]) if anchor is not None else len(stamps)
+        if start < len(stamps) and stamps[start] == anchor[0] and close[start] == anchor[1]:
+            # 직전 바부터 다시 계산 (마지막 바는 장중에 바뀔 수 있음)
+            rebuild = False
+            self.stats["appended"] += int(len(stamps) - start - 2)
+        else:
+            rebuild = True
+            self.stats["rebuilt"] += 1
+            start = 0
+        self._anchors[symbol] = (stamps[-2], close[-2], stamps[-1], close[-1])
+        dates = _dates(df.index[finite][start:] if not finite.all() else df.index[start:])
+        returns = close[start + 1:] / close[start:-1] - 1
+        dates = dates[1:]
+        # 같은 날짜에 바가 여럿이면 마지막 값
+        last = np.r_[dates[1:] != dates[:-1], True]
+        return dates[last], returns[last], rebuild
+
+    def update(self, frames):
+        """``{symbol: OHLCV DataFrame}`` 반영 - 바뀐 종목이 있으면 True"""
+        with self._lock:
+            self.stats["updates"] += 1
+            fresh = {}
+            for symbol, df in frames.items():
+                if not df.empty:
+                    tail = self._tail(symbol, df)
+                    if tail is not None:
+                        fresh[symbol] = tail
+            if not fresh:
+                return False
+
+            # 날짜 축/종목 열 확장
+            dates = np.unique(np.concatenate([self._dates] + [d for d, _, _ in fresh.values()]))
+            added = [s for s in fresh if s not in self._columns]
+            values = self._values
+            if len(dates) != len(self._dates) or added:
+                values = np.full((len(dates), len(self._columns) + len(added)), np.nan)
+                values[np.searchsorted(dates, self._dates), :len(self._columns)] = self._values
+                for symbol in added:
+                    self._columns[symbol] = len(self._columns)
+            for symbol, (symbol_dates, returns, rebuild) in fresh.items():
+                column = self._columns[symbol]
+                if rebuild:
+                    values[:, column] = np.nan
+                values[np.searchsorted(dates, symbol_dates), column] = returns
+
+            # 보관 기간 밖의 오래된 날짜 정리
+            cutoff = dates[-1] - pd.Timedelta(days=self.keep_days).value
+            keep = np.searchsorted(dates, cutoff, side="right")
+            self._dates, self._values = dates[keep:], values[keep:]
+            return True
+
+    def prices(self, symbols):
+        """``{symbol: (직전 종가, 마지막 종가)}``"""
+        with self._lock:
+            return {s: (self._anchors[s][1], self._anchors[s][3]) for s in symbols if s in self._anchors}
+
+    def window(self, symbols, lookback=RISK_LOOKBACK, fill=0.0):
+        """``symbols`` 중 하나라도 바가 있는 최근 ``lookback`` 일의 수익률 (없는 칸은 ``fill``, None 이면 NaN)"""
+        with self._lock:
+            columns = [s for s in symbols if s in self._columns]
+            block = self._values[:, [self._columns[s] for s in columns]]
+            rows = np.flatnonzero(np.isfinite(block).any(axis=1))[-lookback:]
+            block, dates = block[rows], self._dates[rows]
+        if fill is not None:
+            block = np.nan_to_num(block, nan=fill)
+        return pd.DataFrame(block, index=pd.DatetimeIndex(dates), columns=columns)
+
+
+class PortfolioRisk:
+    """``portfolio_risk`` 결과"""
+
+    def __init__(self, positions, summary, covariance, correlation, returns, drawdown):
+        # 종목별 평가 손익/비중/위험 기여도 (index=symbol)
+        self.positions = positions
+        # 포트폴리오 합계와 위험 지표
+        self.summary = summary
+        # 일간 수익률 공분산/상관 행렬
+        self.covariance = covariance
+        self.correlation = correlation
+        # 현재 비중으로 계산한 과거 일간 수익률과 낙폭
+        self.returns = returns
+        self.drawdown = drawdown
+
+
+def value_at_risk(returns, confidence=CONFIDENCE):
+    """과거 수익률 분포의 VaR/CVaR (손실을 양수로)"""
+    if len(returns) == 0:
+        return np.nan, np.nan
+    cutoff = np.quantile(returns, 1 - confidence)
+    return -cutoff, -returns[returns <= cutoff].mean()
+
+
+def parametric_var(mean, std, confidence=CONFIDENCE):
+    """정규분포 가정 VaR/CVaR (손실을 양수로)"""
+    from scipy.stats import norm
+
+    z = norm.ppf(confidence)
+    return -(mean - z * std), -(mean - std * norm.pdf(z) / (1 - confidence))
+
+
+def portfolio_risk(portfolio, matrix, confidence=CONFIDENCE, lookback=RISK_LOOKBACK):
+    """보유 종목 전체의 손익/위험 (시세가 없는 종목은 평가에서 빠짐)"""
+    symbols = sorted(portfolio)
+    prices = matrix.prices(symbols)
+    symbols = [s for s in symbols if s in prices]
+    if not symbols:
+        return None
+
+    shares = np.array([portfolio[s]["shares"] for s in symbols], dtype="float64")
+    buy_price = np.array([portfolio[s]["buy_price"] for s in symbols], dtype="float64")
+    previous, price = (np.array(v, dtype="float64") for v in zip(*(prices[s] for s in symbols)))
+    value = shares * price
+    cost = shares * buy_price
+    total_value, total_cost = value.sum(), cost.sum()
+    weights = value / total_value if total_value else np.zeros(len(symbols))
+
+    window = matrix.window(symbols, lookback)
+    returns = window.reindex(columns=symbols, fill_value=0.0).to_numpy()
+    if len(returns) > 1:
+        covariance = np.atleast_2d(np.cov(returns, rowvar=False))
+    else:
+        covariance = np.zeros((len(symbols), len(symbols)))
+    std = np.sqrt(np.diag(covariance))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        correlation = covariance / np.outer(std, std)
+        marginal = covariance @ weights
+        portfolio_std = np.sqrt(weights @ marginal)
+        contribution = weights * marginal / portfolio_std ** 2
+
+    daily = returns @ weights
+    equity = np.cumprod(1 + daily)
+    drawdown = equity / np.maximum.accumulate(equity) - 1 if len(equity) else equity
+    historical_var, historical_cvar = value_at_risk(daily, confidence)
+    normal_var, normal_cvar = parametric_var(daily.mean() if len(daily) else 0.0, portfolio_std, confidence)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        positions = pd.DataFrame({
+            "shares": shares,
+            "buy_price": buy_price,
+            "price": price,
+            "value": value,
+            "cost": cost,
+            "pnl": value - cost,
+            "pnl_pct": np.where(cost > 0, value / cost - 1, np.nan),
+            "day_pnl": shares * (price - previous),
+            "weight": weights,
+            "volatility": std * np.sqrt(TRADING_DAYS),
+            "risk_contribution": contribution,
+        }, index=pd.Index(symbols, name="symbol"))[POSITION_COLUMNS]
+
+    summary = {
+        "value": total_value,
+        "cost": total_cost,
+        "pnl": total_value - total_cost,
+        "pnl_pct": total_value / total_cost - 1 if total_cost else np.nan,
+        "day_pnl": positions["day_pnl"].sum(),
+        "volatility": portfolio_std * np.sqrt(TRADING_DAYS),
+        "confidence": confidence,
+        "observations": len(daily),
+        "historical_var": historical_var,
+        "historical_cvar": historical_cvar,
+        "parametric_var": normal_var,
+        "parametric_cvar": normal_cvar,
+        "max_drawdown": drawdown.min() if len(drawdown) else 0.0,
+        "current_drawdown": drawdown[-1] if len(drawdown) else 0.0,
+    }
+    index = window.index
+    return PortfolioRisk(
+        positions, summary,
+        pd.DataFrame(covariance, index=symbols, columns=symbols),
+        pd.DataFrame(correlation, index=symbols, columns=symbols),
+        pd.Series(daily, index=index, name="portfolio"),
+        pd.Series(drawdown, index=index, name="drawdown"),
+    )
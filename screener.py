@@ -0,0 +1,178 @@
+"""매수 신호 스크리너 (5점 만점)
+
+README 의 매수 신호 기준을 종목 묶음(S&P 500, 트렌딩 암호화폐, 직접 입력한
+목록) 전체에 적용해 점수순으로 정렬한 표를 만듭니다.
+
+| 지표     | 조건                      |
+|----------|---------------------------|
+| RSI      | < 30                      |
+| MACD     | 골든크로스 (마지막 바)    |
+| CCI      | < -100                    |
+| MFI      | < 20                      |
+| StochRSI | < 0.2                     |
+
+시세는 ``BarStore.update_many`` 로 배치 조회(델타만)하고, 지표는
+``calculate_indicators_panel`` 로 한 번에 계산합니다. 종목별 결과는 마지막
+바 기준으로 캐시하므로 다시 스캔하면 새 바가 들어온 종목만 계산합니다.
+"""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from indicators import build_panel, calculate_indicators_panel
+
+UNIVERSE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "universes")
+
+RSI_OVERSOLD = 30
+CCI_OVERSOLD = -100
+MFI_OVERSOLD = 20
+STOCH_RSI_OVERSOLD = 0.2
+STOCH_RSI_WINDOW = 14
+# 5개 조건 중 이 개수 이상이면 매수 추천
+BUY_SIGNAL_THRESHOLD = 3
+
+# 스캔에 쓰는 조회 기간과 지표 계산에 넘기는 최근 바 수 (EWM 이 수렴하기에 충분한 길이)
+SCREEN_PERIOD = "1y"
+SCREEN_LOOKBACK = 250
+
+SCREEN_COLUMNS = ["Symbol", "Score", "Close", "RSI", "MACD_diff", "CCI", "MFI", "StochRSI", "Signals", "Date"]
+
+SIGNAL_LABELS = {
+    "RSI": "RSI 과매도",
+    "MACD": "MACD 골든크로스",
+    "CCI": "CCI 과매도",
+    "MFI": "MFI 과매도",
+    "StochRSI": "StochRSI 극도의 과매도",
+}
+
+
+def load_universe(name):
+    """``universes/{name}.txt`` 의 심볼 목록 (# 주석과 빈 줄 제외)"""
+    path = os.path.join(UNIVERSE_DIR, f"{name}.txt")
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip().upper() for line in f if line.strip() and not line.startswith("#")]
+
+
+def parse_symbols(text):
+    """쉼표/공백으로 구분된 사용자 입력 심볼 목록"""
+    return list(dict.fromkeys(s.upper() for s in text.replace(",", " ").split()))
+
+
+def _stoch_rsi(rsi):
+    """마지막 StochRSI - 최근 14개 RSI 중 위치 (0~1)"""
+    rsi = rsi[np.isfinite(rsi)][-STOCH_RSI_WINDOW:]
+    if len(rsi) < STOCH_RSI_WINDOW:
+        return np.nan
+    lowest, highest = rsi.min(), rsi.max()
+    return (rsi[-1] - lowest) / (highest - lowest) if highest > lowest else np.nan
+
+
+def _golden_cross(macd_diff):
+    """마지막 바에서 MACD 가 시그널선을 위로 돌파했는지"""
+    macd_diff = macd_diff[np.isfinite(macd_diff)]
+    return len(macd_diff) >= 2 and macd_diff[-2] <= 0 < macd_diff[-1]
+
+
+def score_values(rsi, macd_cross, cci, mfi, stoch_rsi):
+    """마지막 바 지표값으로 점수와 만족한 조건 목록 (NaN 은 불만족)"""
+    checks = {
+        "RSI": rsi < RSI_OVERSOLD,
+        "MACD": bool(macd_cross),
+        "CCI": cci < CCI_OVERSOLD,
+        "MFI": mfi < MFI_OVERSOLD,
+        "StochRSI": stoch_rsi < STOCH_RSI_OVERSOLD,
+    }
+    signals = [SIGNAL_LABELS[name] for name, ok in checks.items() if ok]
+    return len(signals), signals
+
+
+def score_frame(df):
+    """``calculate_indicators`` 결과 하나의 점수 - ``(score, signals, stoch_rsi)``"""
+    if df.empty or "RSI" not in df.columns:
+        return 0, [], np.nan
+    latest = df.iloc[-1]
+    rsi = df["RSI"].to_numpy(dtype="float64")
+    stoch_rsi = _stoch_rsi(rsi)
+    macd_cross = "MACD_diff" in df.columns and _golden_cross(df["MACD_diff"].to_numpy(dtype="float64"))
+    score, signals = score_values(latest["RSI"], macd_cross, latest.get("CCI", np.nan),
+                                  latest.get("MFI", np.nan), stoch_rsi)
+    return score, signals, stoch_rsi
+
+
+def score_panel(frames):
+    """``{symbol: OHLCV DataFrame}`` 전체를 한 번에 계산해 종목별 결과 행 ``{symbol: dict}``"""
+    frames = {s: df.iloc[-SCREEN_LOOKBACK:] for s, df in frames.items() if not df.empty}
+    symbols, index, panels = build_panel(frames)
+    if not symbols:
+        return {}
+    values = calculate_indicators_panel(panels["Close"], panels["High"], panels["Low"], panels["Volume"])
+    close = panels["Close"]
+    rows = {}
+    for row, symbol in enumerate(symbols):
+        valid = np.isfinite(close[row])
+        if not valid.any():
+            continue
+        last = np.flatnonzero(valid)[-1]
+        rsi, cci, mfi = values["RSI"][row, last], values["CCI"][row, last], values["MFI"][row, last]
+        stoch_rsi = _stoch_rsi(values["RSI"][row])
+        macd_cross = _golden_cross(values["MACD_diff"][row])
+        score, signals = score_values(rsi, macd_cross, cci, mfi, stoch_rsi)
+        rows[symbol] = {
+            "Symbol": symbol,
+            "Score": score,
+            "Close": close[row, last],
+            "RSI": rsi,
+            "MACD_diff": values["MACD_diff"][row, last],
+            "CCI": cci,
+            "MFI": mfi,
+            "StochRSI": stoch_rsi,
+            "Signals": ", ".join(signals),
+            "Date": index[last],
+        }
+    return rows
+
+
+def rank(rows):
+    """점수 높은 순, 같은 점수면 RSI 낮은 순"""
+    if not rows:
+        return pd.DataFrame(columns=SCREEN_COLUMNS)
+    table = pd.DataFrame(list(rows), columns=SCREEN_COLUMNS)
+    return table.sort_values(["Score", "RSI"], ascending=[False, True], na_position="last").reset_index(drop=True)
+
+
+class Screener:
+    """종목 묶음 스캔 - 마지막 바가 바뀐 종목만 다시 계산"""
+
+    def __init__(self, bar_store, period=SCREEN_PERIOD, interval="1d"):
+        self.bar_store = bar_store
+        self.period = period
+        self.interval = interval
+        # {symbol: (데이터 버전, 결과 행)}
+        self._rows = {}
+        self._lock = threading.Lock()
+        self.stats = {"scans": 0, "computed": 0, "reused": 0}
+
+    @staticmethod
+    def _version(df):
+        return len(df), df.index[-1].value, float(df["Close"].iloc[-1])
+
+    def scan(self, symbols):
+        """심볼 목록을 스캔해 점수순 표 반환 (데이터가 없는 심볼은 빠짐)"""
+        symbols = list(dict.fromkeys(symbols))
+        frames = self.bar_store.update_many(symbols, self.interval, self.period)
+        with self._lock:
+            stale = {
+                symbol: df for symbol, df in frames.items()
+                if not df.empty and self._rows.get(symbol, (None,))[0] != self._version(df)
+            }
+        computed = score_panel(stale)
+        with self._lock:
+            for symbol, row in computed.items():
+                self._rows[symbol] = (self._version(stale[symbol]), row)
+            rows = [self._rows[s][1] for s in symbols if s in frames and s in self._rows]
+            self.stats["scans"] += 1
+            self.stats["computed"] += len(computed)
+            self.stats["reused"] += len(rows) - len(computed)
+        return rank(rows)
@@ -0,0 +1,212 @@
+"""프로세스 간 공유 DataFrame 캐시 (Arrow IPC + 메모리 맵)
+
+Streamlit 워커 여러 개를 띄워도 같은 종목의 시세/지표 프레임을 한 벌만 두도록
+공유 메모리(``/dev/shm``, 없으면 임시 디렉터리)에 Arrow IPC 파일로 저장합니다.
+
+- 읽을 때는 파일을 메모리 맵으로 열어 복사 없이 DataFrame 으로 만들며, 배열은
+  읽기 전용이라 제자리 수정은 오류가 납니다 (열 추가/슬라이스 등은 새 프레임)
+- 한 프로세스 안에서는 한 번 연 프레임을 그대로 돌려줘 적중이 dict 조회 수준
+- 항목 목록과 크기, 마지막 사용 시각은 SQLite(WAL) 인덱스에 두어 모든 프로세스가
+  같이 보며, 전체 크기가 예산을 넘으면 오래 안 쓴 항목부터 지움
+- 값을 바꿀 때는 새 파일을 쓰고 옛 파일을 지우므로, 이미 옛 파일을 연 프로세스는
+  닫을 때까지 그대로 읽을 수 있음
+
+키는 ``cache_key(...)`` 문자열이며 데이터 버전을 키에 넣거나 ``ttl`` 로 만료시킵니다.
+"""
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+from metrics import CacheStats
+
+SHARED_CACHE_DIR = os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+                                "smartinvestor_frames")
+# 모든 프로세스를 합친 캐시 파일 크기 상한
+SHARED_CACHE_BYTES = 512 * 2**20
+SHARED_CACHE_TTL = 300
+# 프로세스 안에서 열어 두는 프레임 수
+OPEN_VIEWS = 1024
+# 적중 때 마지막 사용 시각을 인덱스에 쓰는 최소 간격 (초) - 적중마다 쓰지 않도록
+TOUCH_INTERVAL = 5
+INDEX_FILE = "index.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    file TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_lru ON entries(last_used);
+"""
+
+
+def cache_key(*parts):
+    return "|".join(str(part) for part in parts)
+
+
+def write_frame(df, path):
+    """DataFrame 을 Arrow IPC 파일로 (인덱스 포함) - 파일 크기 반환"""
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    tmp = f"{path}.tmp"
+    with pa.OSFile(tmp, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+    return os.path.getsize(path)
+
+
+def read_frame(path):
+    """메모리 맵으로 열어 복사 없는 읽기 전용 DataFrame (숫자 열 기준)"""
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    # 열마다 블록을 따로 두어야 합치면서 복사하지 않음
+    return table.to_pandas(split_blocks=True, self_destruct=False)
+
+
+class SharedFrameCache:
+    """여러 프로세스가 같은 디렉터리를 쓰는 LRU 프레임 캐시"""
+
+    def __init__(self, root=SHARED_CACHE_DIR, budget=SHARED_CACHE_BYTES, clock=time.time):
+        os.makedirs(root, exist_ok=True)
+        self.root = root
+        self.budget = budget
+        self.clock = clock
+        self.path = os.path.join(root, INDEX_FILE)
+        self.cache_stats = CacheStats()
+        self._local = threading.local()
+        # {key: [파일, 만든 시각, DataFrame, 인덱스에 쓴 마지막 사용 시각]} - LRU
+        self._views = OrderedDict()
+        self._lock = threading.Lock()
+        # 채우는 중인 키별 잠금 - 같은 키를 동시에 요청하면 하나만 계산
+        self._inflight = {}
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _file_path(self, file):
+        return os.path.join(self.root, file)
+
+    def _remember(self, key, file, created, df, touched):
+        with self._lock:
+            self._views[key] = [file, created, df, touched]
+            self._views.move_to_end(key)
+            while len(self._views) > OPEN_VIEWS:
+                self._views.popitem(last=False)
+
+    def _touch(self, key, now):
+        self._connect().execute("UPDATE entries SET last_used = ? WHERE key = ?", (now, key))
+
+    def get(self, key, ttl=SHARED_CACHE_TTL):
+        """읽기 전용 DataFrame - 없거나 ``ttl`` 초보다 오래됐거나 다른 프로세스가 지웠으면 None"""
+        now = self.clock()
+        with self._lock:
+            view = self._views.get(key)
+            if view is not None:
+                self._views.move_to_end(key)
+        if view is not None:
+            file, created, df, touched = view
+            if now - created <= ttl and os.path.exists(self._file_path(file)):
+                if now - touched >= TOUCH_INTERVAL:
+                    view[3] = now
+                    self._touch(key, now)
+                return df
+            with self._lock:
+                self._views.pop(key, None)
+
+        row = self._connect().execute("SELECT file, created FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None or now - row[1] > ttl:
+            return None
+        try:
+            df = read_frame(self._file_path(row[0]))
+        except (OSError, pa.ArrowInvalid):
+            # 읽는 사이에 다른 프로세스가 지움
+            return None
+        self._touch(key, now)
+        self._remember(key, row[0], row[1], df, now)
+        return df
+
+    def put(self, key, df):
+        """저장하고 그 읽기 전용 뷰를 반환 - 예산을 넘으면 오래 안 쓴 항목부터 지움"""
+        now = self.clock()
+        file = f"{hashlib.sha1(key.encode()).hexdigest()[:16]}-{uuid.uuid4().hex[:8]}.arrow"
+        size = write_frame(df, self._file_path(file))
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            replaced = conn.execute("SELECT file FROM entries WHERE key = ?", (key,)).fetchone()
+            conn.execute("INSERT OR REPLACE INTO entries (key, file, bytes, created, last_used) VALUES (?, ?, ?, ?, ?)",
+                         (key, file, size, now, now))
+            total = conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM entries").fetchone()[0]
+            victims = []
+            if total > self.budget:
+                for victim_key, victim_file, victim_bytes in conn.execute(
+                        "SELECT key, file, bytes FROM entries WHERE key != ? ORDER BY last_used", (key,)):
+                    if total <= self.budget:
+                        break
+                    victims.append((victim_key, victim_file))
+                    total -= victim_bytes
+                conn.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k, _ in victims])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            os.remove(self._file_path(file))
+            raise
+
+        # 이미 연 프로세스는 메모리 맵으로 계속 읽을 수 있음 (닫으면 해제)
+        for stale in ([replaced[0]] if replaced else []) + [f for _, f in victims]:
+            try:
+                os.remove(self._file_path(stale))
+            except FileNotFoundError:
+                pass
+        if victims:
+            self.cache_stats.evict(len(victims))
+            with self._lock:
+                for victim_key, _ in victims:
+                    self._views.pop(victim_key, None)
+
+        view = read_frame(self._file_path(file))
+        self._remember(key, file, now, view, now)
+        return view
+
+    def get_or_load(self, key, load, ttl=SHARED_CACHE_TTL):
+        """캐시된 프레임, 없으면 ``load()`` 결과를 저장해서 반환 (빈 프레임은 저장하지 않음)"""
+        self.cache_stats.lookup()
+        df = self.get(key, ttl)
+        if df is not None:
+            return df
+        with self._lock:
+            lock = self._inflight.setdefault(key, threading.Lock())
+        with lock:
+            df = self.get(key, ttl)
+            if df is None:
+                self.cache_stats.miss(key)
+                df = load()
+                if not df.empty:
+                    df = self.put(key, df)
+        with self._lock:
+            self._inflight.pop(key, None)
+        return df
+
+    def usage(self):
+        """``(항목 수, 전체 바이트)`` - 모든 프로세스 합계"""
+        return self._connect().execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM entries").fetchone()
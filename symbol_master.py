@@ -0,0 +1,244 @@
+"""로컬 종목 마스터 - 심볼/종목명 자동완성과 오프라인 검증
+
+``universes/symbols.csv`` 스냅샷(symbol, name, name_ko, exchange, asset_type, sector)을
+메모리에 올려 두고 네트워크 없이 종목을 찾습니다. ``asset_type`` 은 사용자
+저장소의 관심 종목 분류와 같은 ``stocks`` / ``crypto`` / ``etf`` 이고, ``sector`` 는
+주식의 GICS 섹터(영문, 없으면 빈 값)입니다.
+
+- 접두사 검색: 심볼과 이름 단어를 정렬된 키 배열에 두고 이진 탐색으로 범위를
+  찾음 (트라이를 평탄화한 형태 - 같은 접두사의 키는 연속 구간에 모임)
+- 오타 검색: 심볼은 SymSpell 방식 삭제 변형 인덱스(처음 쓸 때 생성)로 편집 거리 1
+  안팎을, 이름 단어는 입력의 삭제/자리 바꿈 변형으로 찾음
+- ``refresh()`` 는 스냅샷 파일이 바뀌었을 때만 다시 읽음
+"""
+import csv
+import os
+import re
+import threading
+from bisect import bisect_left, insort
+
+SYMBOLS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "universes", "symbols.csv")
+ASSET_TYPES = ("stocks", "crypto", "etf")
+SEARCH_LIMIT = 8
+# 자산 유형을 거르면서 접두사 구간을 훑을 최대 키 수
+MAX_SCAN = 2000
+# 이보다 짧은 입력은 오타 검색을 하지 않음 (한두 글자 심볼이 너무 많이 걸림)
+FUZZY_MIN_LENGTH = 3
+
+_TOKEN = re.compile(r"[0-9A-Z가-힣]+")
+# 심볼 접미사 (BTC-USD, 005930.KS) - 앞부분만으로도 찾을 수 있게 함
+_SUFFIX = re.compile(r"(-USD|\.[A-Z]{1,2})$")
+
+
+class Instrument:
+    """종목 하나"""
+
+    __slots__ = ("symbol", "name", "name_ko", "exchange", "asset_type", "sector")
+
+    def __init__(self, symbol, name="", name_ko="", exchange="", asset_type="stocks", sector=""):
+        self.symbol = symbol
+        self.name = name
+        self.name_ko = name_ko
+        self.exchange = exchange
+        self.asset_type = asset_type
+        self.sector = sector
+
+    @property
+    def label(self):
+        """자동완성 목록에 보여 줄 문자열"""
+        names = " · ".join(n for n in (self.name, self.name_ko) if n)
+        text = f"{self.symbol} · {names}" if names else self.symbol
+        return f"{text} ({self.exchange})" if self.exchange else text
+
+    def __repr__(self):
+        return f"Instrument({self.symbol!r}, {self.asset_type!r})"
+
+
+def _keys_for_symbol(symbol):
+    base = _SUFFIX.sub("", symbol)
+    return (symbol, base) if base and base != symbol else (symbol,)
+
+
+def _keys_for_name(instrument):
+    keys = set(_TOKEN.findall(instrument.name.upper()))
+    if instrument.name_ko:
+        keys.update(_TOKEN.findall(instrument.name_ko.upper()))
+        # 띄어 쓰지 않고 입력해도 찾도록 (버크셔 해서웨이 → 버크셔해서웨이)
+        keys.add("".join(_TOKEN.findall(instrument.name_ko.upper())))
+    keys.discard("")
+    return keys
+
+
+def _deletes(word):
+    return [word[:i] + word[i + 1:] for i in range(len(word))]
+
+
+def _transposes(word):
+    return [word[:i] + word[i + 1] + word[i] + word[i + 2:] for i in range(len(word) - 1)]
+
+
+class SymbolIndex:
+    """종목 목록의 검색 인덱스"""
+
+    def __init__(self, instruments=()):
+        self._instruments = []
+        self._by_symbol = {}
+        # {키: [종목 번호]} 와 정렬된 키 목록 - 심볼 키를 이름 키보다 먼저 검색
+        self._symbol_postings = {}
+        self._name_postings = {}
+        for instrument in instruments:
+            self._insert(instrument)
+        self._symbol_keys = sorted(self._symbol_postings)
+        self._name_keys = sorted(self._name_postings)
+        # {심볼 키 또는 그 삭제 변형: [심볼 키]} - 오타 검색을 처음 할 때 생성
+        self._fuzzy = None
+
+    def _insert(self, instrument):
+        """추가된 키 목록 ``(심볼 키, 이름 키)`` 반환"""
+        existing = self._by_symbol.get(instrument.symbol)
+        if existing is not None:
+            return (), ()
+        position = len(self._instruments)
+        self._instruments.append(instrument)
+        self._by_symbol[instrument.symbol] = instrument
+        added = ([], [])
+        for postings, keys, new in ((self._symbol_postings, _keys_for_symbol(instrument.symbol), added[0]),
+                                    (self._name_postings, _keys_for_name(instrument), added[1])):
+            for key in keys:
+                ids = postings.get(key)
+                if ids is None:
+                    postings[key] = [position]
+                    new.append(key)
+                elif ids[-1] != position:
+                    ids.append(position)
+        return added
+
+    def add(self, instrument):
+        """종목 추가 (이미 있으면 무시)"""
+        symbol_keys, name_keys = self._insert(instrument)
+        for key in symbol_keys:
+            insort(self._symbol_keys, key)
+            if self._fuzzy is not None:
+                self._index_fuzzy(self._fuzzy, key)
+        for key in name_keys:
+            insort(self._name_keys, key)
+
+    @staticmethod
+    def _index_fuzzy(fuzzy, key):
+        if len(key) >= FUZZY_MIN_LENGTH:
+            for variant in dict.fromkeys([key] + _deletes(key)):
+                fuzzy.setdefault(variant, []).append(key)
+
+    def _fuzzy_index(self):
+        if self._fuzzy is None:
+            fuzzy = {}
+            for key in self._symbol_keys:
+                self._index_fuzzy(fuzzy, key)
+            self._fuzzy = fuzzy
+        return self._fuzzy
+
+    def __len__(self):
+        return len(self._instruments)
+
+    def __contains__(self, symbol):
+        return symbol.upper() in self._by_symbol
+
+    def get(self, symbol):
+        """정확히 일치하는 종목 (없으면 None)"""
+        return self._by_symbol.get(symbol.strip().upper())
+
+    def search(self, query, asset_type=None, limit=SEARCH_LIMIT):
+        """심볼/종목명 접두사로 찾고, 모자라면 오타를 고려해 채움"""
+        query = query.strip().upper()
+        if not query:
+            return []
+        found = {}
+
+        def take(positions):
+            for position in positions:
+                instrument = self._instruments[position]
+                if asset_type is not None and instrument.asset_type != asset_type:
+                    continue
+                found.setdefault(instrument.symbol, instrument)
+                if len(found) >= limit:
+                    return True
+            return False
+
+        for keys, postings in ((self._symbol_keys, self._symbol_postings),
+                               (self._name_keys, self._name_postings)):
+            start = bisect_left(keys, query)
+            for key in keys[start:start + MAX_SCAN]:
+                if not key.startswith(query):
+                    break
+                if take(postings[key]):
+                    return list(found.values())
+
+        if len(query) >= FUZZY_MIN_LENGTH:
+            # 입력과 삭제 변형을 공유하는 심볼 = 삽입/삭제/치환 한 번 차이
+            deletes = _deletes(query)
+            fuzzy = self._fuzzy_index()
+            for variant in [query] + deletes:
+                for key in fuzzy.get(variant, ()):
+                    if take(self._symbol_postings[key]):
+                        return list(found.values())
+            for edit in deletes + _transposes(query):
+                positions = self._name_postings.get(edit)
+                if positions and take(positions):
+                    return list(found.values())
+        return list(found.values())
+
+
+def read_snapshot(path=SYMBOLS_FILE):
+    """스냅샷 CSV 를 ``Instrument`` 목록으로"""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return [
+            Instrument(row["symbol"].strip().upper(), row.get("name") or "", row.get("name_ko") or "",
+                       row.get("exchange") or "", row.get("asset_type") or "stocks", row.get("sector") or "")
+            for row in csv.DictReader(f) if row.get("symbol")
+        ]
+
+
+class SymbolMaster:
+    """스냅샷 파일에서 만든 ``SymbolIndex`` - 파일이 바뀌면 ``refresh()`` 로 교체"""
+
+    def __init__(self, path=SYMBOLS_FILE):
+        self.path = path
+        self._mtime = None
+        # 스냅샷에 없어서 온라인으로 확인한 뒤 추가한 종목 (다시 읽어도 유지)
+        self._added = []
+        self._lock = threading.Lock()
+        self.index = SymbolIndex()
+        self.refresh()
+
+    def refresh(self):
+        """스냅샷 파일이 바뀌었으면 다시 읽음 - 다시 읽었으면 True"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        with self._lock:
+            if mtime == self._mtime:
+                return False
+            # 새 인덱스를 다 만든 뒤 한 번에 바꿔서 검색 중인 쪽이 반쯤 만든 인덱스를 보지 않도록 함
+            self.index = SymbolIndex(read_snapshot(self.path) + self._added)
+            self._mtime = mtime
+            return True
+
+    def add(self, instrument):
+        with self._lock:
+            self._added.append(instrument)
+            self.index.add(instrument)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, symbol):
+        return symbol in self.index
+
+    def get(self, symbol):
+        return self.index.get(symbol)
+
+    def search(self, query, asset_type=None, limit=SEARCH_LIMIT):
+        return self.index.search(query, asset_type, limit)
@@ -0,0 +1,40 @@
+"""``AnalysisService`` - 검증을 통과한 기간/봉은 모두 분석 결과를 내야 함 (500 이 되지 않음)"""
+import json
+
+import pytest
+
+from api import AnalysisService, ApiError
+from bar_store import PERIOD_DAYS, BarStore, intervals_for
+from benchmarks.fake_provider import FakeProvider
+
+SYMBOLS = ["AAPL", "MSFT"]
+CASES = [(period, interval) for period in PERIOD_DAYS for interval in [None] + intervals_for(period)]
+
+
+@pytest.fixture(scope="module")
+def service(tmp_path_factory):
+    provider = FakeProvider.synthetic(SYMBOLS, n_bars=3000, end="2024-06-28")
+    return AnalysisService(BarStore(str(tmp_path_factory.mktemp("bars")), provider=provider))
+
+
+@pytest.mark.parametrize("period,interval", CASES)
+def test_analysis_every_period(service, period, interval):
+    result = json.loads(service.analysis("AAPL", period, interval))
+    assert result["period"] == period
+    assert result["interval"] == AnalysisService.normalize_range(period, interval)[1]
+    assert result["bars"] > 0
+    assert result["analysis_source"] == "technical"
+
+
+@pytest.mark.parametrize("period", list(PERIOD_DAYS))
+def test_batch_every_period(service, period):
+    result = service.batch(SYMBOLS + ["bad symbol!"], period)
+    assert [r["symbol"] for r in result["results"]] == SYMBOLS
+    assert list(result["errors"]) == ["BAD SYMBOL!"]
+
+
+@pytest.mark.parametrize("period,interval", [("7y", None), ("1y", "1m"), ("max", "1h")])
+def test_invalid_range_is_400(service, period, interval):
+    with pytest.raises(ApiError) as info:
+        service.analysis("AAPL", period, interval)
+    assert info.value.status == 400
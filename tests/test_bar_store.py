@@ -0,0 +1,44 @@
+"""``slice_period`` - 모든 기간이 일봉/장중 봉 양쪽에서 잘리는지 확인"""
+import pandas as pd
+import pytest
+
+from bar_store import PERIOD_DAYS, PERIOD_OFFSETS, RESAMPLE_RULES, slice_period
+from benchmarks.synthetic import make_ohlcv
+
+FRAMES = {
+    # 연말을 넘기는 이력 (ytd 가 해가 바뀐 뒤만 남는지 보려고)
+    "1d": make_ohlcv(3000, seed=3, start="2010-06-01"),
+    "1h": make_ohlcv(24 * 200, seed=4, start="2023-09-01", freq="h"),
+    "5m": make_ohlcv(12 * 24 * 30, seed=5, start="2023-12-15", freq="5min"),
+}
+
+
+@pytest.mark.parametrize("interval", list(FRAMES))
+@pytest.mark.parametrize("period", list(PERIOD_DAYS))
+def test_slice_period(period, interval):
+    df = FRAMES[interval]
+    sliced = slice_period(df, period, interval)
+    assert not sliced.empty
+    assert sliced.index[-1] == df.index[-1]
+    pd.testing.assert_frame_equal(sliced, df.iloc[-len(sliced):])
+
+    last = df.index[-1]
+    if period == "max":
+        assert len(sliced) == len(df)
+    elif period == "ytd":
+        assert (sliced.index.year == last.year).all()
+        assert len(sliced) == (df.index.year == last.year).sum()
+    elif period in PERIOD_OFFSETS:
+        assert sliced.index[0] > last - PERIOD_OFFSETS[period]
+        if len(sliced) < len(df):
+            assert df.index[-len(sliced) - 1] <= last - PERIOD_OFFSETS[period]
+    elif interval in RESAMPLE_RULES:
+        assert sliced.index.normalize().nunique() == PERIOD_DAYS[period]
+    else:
+        assert len(sliced) == PERIOD_DAYS[period]
+
+
+def test_slice_period_empty():
+    empty = FRAMES["1d"].iloc[:0]
+    for period in PERIOD_DAYS:
+        assert slice_period(empty, period).empty
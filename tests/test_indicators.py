@@ -0,0 +1,108 @@
+"""지표 계산 정합성 - ``ta`` 기준값(``calculate_indicators_ta``)과 비교
+
+전체 계산, 증분 엔진(바 추가 / 마지막 바 수정 / 시작점 이동), 패널 일괄 계산이
+모두 같은 값을 내는지 고정된 합성 시세로 확인합니다.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import make_ohlcv
+from indicators import (INDICATOR_COLUMNS, IndicatorEngine, build_panel, calculate_indicators,
+                        calculate_indicators_panel, calculate_indicators_ta)
+
+pytest.importorskip("ta")
+
+RTOL = 1e-9
+ATOL = 1e-8
+
+
+@pytest.fixture(scope="module")
+def ohlcv():
+    return make_ohlcv(400, seed=7)
+
+
+def assert_matches_ta(actual, source):
+    expected = calculate_indicators_ta(source)
+    columns = [c for c in INDICATOR_COLUMNS if c in expected.columns]
+    assert columns
+    assert [c for c in INDICATOR_COLUMNS if c in actual.columns] == columns
+    for column in columns:
+        np.testing.assert_allclose(actual[column].to_numpy(dtype="float64"),
+                                   expected[column].to_numpy(dtype="float64"),
+                                   rtol=RTOL, atol=ATOL, equal_nan=True, err_msg=column)
+
+
+@pytest.mark.parametrize("n_bars", [20, 30, 60, 400])
+def test_full_calculation(ohlcv, n_bars):
+    df = ohlcv.iloc[:n_bars]
+    assert_matches_ta(calculate_indicators(df), df)
+
+
+def test_short_input_is_returned_unchanged(ohlcv):
+    df = ohlcv.iloc[:19]
+    assert calculate_indicators(df) is df
+
+
+def test_input_is_not_modified(ohlcv):
+    df = ohlcv.iloc[:100].copy()
+    before = df.copy()
+    calculate_indicators(df)
+    pd.testing.assert_frame_equal(df, before)
+
+
+def test_engine_append(ohlcv):
+    engine = IndicatorEngine()
+    engine.update("SYN", "1d", ohlcv.iloc[:300])
+    for end in (301, 320, 400):
+        df = ohlcv.iloc[:end]
+        assert_matches_ta(engine.update("SYN", "1d", df), df)
+
+
+def test_engine_revised_last_bar(ohlcv):
+    engine = IndicatorEngine()
+    engine.update("SYN", "1d", ohlcv.iloc[:300])
+    revised = ohlcv.iloc[:300].copy()
+    last = revised.index[-1]
+    revised.loc[last, "Close"] *= 1.03
+    revised.loc[last, "High"] = max(revised.loc[last, "High"], revised.loc[last, "Close"])
+    revised.loc[last, "Volume"] += 1000
+    assert_matches_ta(engine.update("SYN", "1d", revised), revised)
+    # 수정된 바 뒤에 새 바가 붙어도 같은 값
+    appended = pd.concat([revised, ohlcv.iloc[300:310]])
+    assert_matches_ta(engine.update("SYN", "1d", appended), appended)
+
+
+@pytest.mark.parametrize("window", [(10, 310), (0, 250), (50, 400)])
+def test_engine_shifted_start_or_trim(ohlcv, window):
+    engine = IndicatorEngine()
+    engine.update("SYN", "1d", ohlcv.iloc[:300])
+    df = ohlcv.iloc[window[0]:window[1]]
+    assert_matches_ta(engine.update("SYN", "1d", df), df)
+
+
+def test_panel_ragged(ohlcv):
+    # 상장 시점/마지막 바가 다른 종목들 (20개 미만 종목 포함)
+    frames = {
+        "FULL": ohlcv,
+        "LATE": make_ohlcv(400, seed=11).iloc[150:],
+        "TRIM": make_ohlcv(400, seed=12).iloc[30:380],
+        "SHORT": make_ohlcv(400, seed=13).iloc[-40:],
+        "TINY": make_ohlcv(400, seed=14).iloc[-15:],
+    }
+    symbols, index, panels = build_panel(frames)
+    values = calculate_indicators_panel(panels["Close"], panels["High"], panels["Low"], panels["Volume"])
+    for row, symbol in enumerate(symbols):
+        df = frames[symbol]
+        positions = index.get_indexer(df.index)
+        result = pd.DataFrame({name: values[name][row, positions] for name in INDICATOR_COLUMNS}, index=df.index)
+        if len(df) < 20:
+            assert result.isna().all().all(), symbol
+            continue
+        expected = calculate_indicators_ta(df)
+        missing = [c for c in INDICATOR_COLUMNS if c not in expected.columns]
+        assert result[missing].isna().all().all(), symbol
+        assert_matches_ta(result.drop(columns=missing), df)
+        # 그 종목에 바가 없는 시점은 NaN
+        outside = np.setdiff1d(np.arange(len(index)), positions)
+        assert np.isnan(values["RSI"][row, outside]).all(), symbol
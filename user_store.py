@@ -0,0 +1,404 @@
+"""사용자 저장소 (SQLite, WAL)
+
+``user_data.json`` 전체를 다시 쓰는 대신 사용자/관심 종목/보유 종목을
+행 단위로 갱신합니다. 모든 세션이 하나의 ``UserStore`` 를 공유하고,
+스레드마다 커넥션을 하나씩 열어 WAL 모드로 동시에 읽고 씁니다.
+"""
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+try:
+    import bcrypt
+    BCRYPT_AVAILABLE = True
+except ImportError:
+    BCRYPT_AVAILABLE = False
+
+USER_DB_FILE = "smartinvestor.db"
+LEGACY_USER_DATA_FILE = "user_data.json"
+LEGACY_USERS_CSV = "users.csv"
+ADMIN_USERNAME = "admin"
+
+# 관심 종목 분류 (session_state 의 stock_list / crypto_list / etf_list 와 대응)
+ASSET_TYPES = ("stocks", "crypto", "etf")
+
+DEFAULT_ADMIN_PORTFOLIOS = {
+    "stocks": ["AAPL", "GOOGL", "MSFT"],
+    "crypto": ["BTC-USD", "ETH-USD"],
+    "etf": ["SPY", "QQQ"],
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password TEXT NOT NULL,
+    is_admin INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    email TEXT,
+    show_heatmap INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS watchlist (
+    username TEXT NOT NULL REFERENCES users(username) ON DELETE CASCADE,
+    asset_type TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (username, asset_type, symbol)
+);
+CREATE TABLE IF NOT EXISTS holdings (
+    username TEXT NOT NULL REFERENCES users(username) ON DELETE CASCADE,
+    symbol TEXT NOT NULL,
+    shares REAL NOT NULL,
+    buy_price REAL NOT NULL,
+    PRIMARY KEY (username, symbol)
+);
+CREATE INDEX IF NOT EXISTS watchlist_symbol ON watchlist(symbol);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS alert_rules (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL REFERENCES users(username) ON DELETE CASCADE,
+    symbol TEXT,
+    kind TEXT NOT NULL,
+    value REAL,
+    cooldown INTEGER NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS alert_outbox (
+    id INTEGER PRIMARY KEY,
+    rule_id INTEGER NOT NULL REFERENCES alert_rules(id) ON DELETE CASCADE,
+    username TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    message TEXT NOT NULL,
+    bar_time TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    delivered_at REAL,
+    UNIQUE (rule_id, symbol, bar_time)
+);
+CREATE INDEX IF NOT EXISTS alert_outbox_pending ON alert_outbox(username, delivered_at);
+CREATE INDEX IF NOT EXISTS alert_outbox_last ON alert_outbox(rule_id, symbol, created_at);
+"""
+
+# 같은 규칙/종목 알림 사이의 기본 간격 (초)
+ALERT_COOLDOWN = 86400
+
+
+def hash_password(password):
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+def verify_password(stored, password):
+    """저장된 해시와 비교 (users.csv 에서 옮겨온 bcrypt 해시도 지원)"""
+    if stored.startswith("$2"):
+        if not BCRYPT_AVAILABLE:
+            return False
+        try:
+            return bcrypt.checkpw(password.encode(), stored.encode())
+        except ValueError:
+            return False
+    return stored == hash_password(password)
+
+
+class UserStore:
+    """사용자 데이터 저장소 - 모든 쓰기는 트랜잭션 하나로 원자적으로 처리"""
+
+    def __init__(self, path=USER_DB_FILE):
+        self.path = path
+        self._local = threading.local()
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        return _Transaction(self._connect())
+
+    # 조회
+    def get_user(self, username):
+        """기존 user_data.json 의 사용자 레코드와 같은 모양의 dict (없으면 None)"""
+        conn = self._connect()
+        row = conn.execute("SELECT * FROM users WHERE username = ?", (username,)).fetchone()
+        if row is None:
+            return None
+
+        portfolios = {asset_type: [] for asset_type in ASSET_TYPES}
+        for item in conn.execute(
+            "SELECT asset_type, symbol FROM watchlist WHERE username = ? ORDER BY position",
+            (username,),
+        ):
+            portfolios.setdefault(item["asset_type"], []).append(item["symbol"])
+
+        portfolio = {
+            item["symbol"]: {"shares": item["shares"], "buy_price": item["buy_price"]}
+            for item in conn.execute(
+                "SELECT symbol, shares, buy_price FROM holdings WHERE username = ?", (username,)
+            )
+        }
+        return {
+            "password": row["password"],
+            "is_admin": bool(row["is_admin"]),
+            "created_at": row["created_at"],
+            "email": row["email"],
+            "show_heatmap": bool(row["show_heatmap"]),
+            "portfolios": portfolios,
+            "portfolio": portfolio,
+        }
+
+    def authenticate(self, username, password):
+        """로그인 확인 - 성공하면 사용자 레코드, 실패하면 None"""
+        user = self.get_user(username)
+        if user is None or not verify_password(user["password"], password):
+            return None
+        return user
+
+    def usernames(self):
+        return [row[0] for row in self._connect().execute("SELECT username FROM users ORDER BY username")]
+
+    def count_users(self):
+        return self._connect().execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def watched_symbols(self):
+        """전체 사용자의 관심 종목 ``{symbol: [username, ...]}``"""
+        watchers = {}
+        for row in self._connect().execute("SELECT symbol, username FROM watchlist ORDER BY symbol"):
+            watchers.setdefault(row["symbol"], []).append(row["username"])
+        return watchers
+
+    def watchlists(self):
+        """전체 사용자의 관심 종목 ``{username: [symbol, ...]}`` (분류 구분 없이)"""
+        lists = {}
+        for row in self._connect().execute("SELECT username, symbol FROM watchlist ORDER BY username, position"):
+            symbols = lists.setdefault(row["username"], [])
+            if row["symbol"] not in symbols:
+                symbols.append(row["symbol"])
+        return lists
+
+    def buy_prices(self):
+        """전체 보유 종목 매수가 ``{(username, symbol): buy_price}``"""
+        return {(row["username"], row["symbol"]): row["buy_price"]
+                for row in self._connect().execute("SELECT username, symbol, buy_price FROM holdings")}
+
+    def alert_rules(self, username=None):
+        """알림 규칙 목록 (``symbol`` 이 None 이면 그 사용자의 관심 종목 전체)"""
+        query = "SELECT id, username, symbol, kind, value, cooldown, created_at FROM alert_rules"
+        rows = (self._connect().execute(query + " ORDER BY id") if username is None
+                else self._connect().execute(query + " WHERE username = ? ORDER BY id", (username,)))
+        return [dict(row) for row in rows]
+
+    def pending_alerts(self, username, limit=50):
+        """아직 확인하지 않은 알림 (최신순)"""
+        return [dict(row) for row in self._connect().execute(
+            "SELECT id, rule_id, symbol, message, bar_time, created_at FROM alert_outbox "
+            "WHERE username = ? AND delivered_at IS NULL ORDER BY created_at DESC, id DESC LIMIT ?",
+            (username, limit),
+        )]
+
+    # 쓰기
+    def create_user(self, username, password_hash, is_admin=False, created_at=None,
+                    email=None, show_heatmap=False, portfolios=None, portfolio=None):
+        """사용자 생성 - 이미 있으면 False"""
+        with self._transaction() as conn:
+            return self._create_user(conn, username, password_hash, is_admin, created_at,
+                                     email, show_heatmap, portfolios, portfolio)
+
+    def _create_user(self, conn, username, password_hash, is_admin=False, created_at=None,
+                     email=None, show_heatmap=False, portfolios=None, portfolio=None):
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO users (username, password, is_admin, created_at, email, show_heatmap) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (username, password_hash, int(is_admin), created_at or datetime.now().isoformat(),
+             email, int(show_heatmap)),
+        )
+        if cursor.rowcount == 0:
+            return False
+        for asset_type, symbols in (portfolios or {}).items():
+            for symbol in symbols:
+                self._add_symbol(conn, username, asset_type, symbol)
+        for symbol, holding in (portfolio or {}).items():
+            self._set_holding(conn, username, symbol, holding["shares"], holding["buy_price"])
+        return True
+
+    @staticmethod
+    def _add_symbol(conn, username, asset_type, symbol):
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO watchlist (username, asset_type, symbol, position) "
+            "SELECT ?, ?, ?, COALESCE(MAX(position) + 1, 0) FROM watchlist "
+            "WHERE username = ? AND asset_type = ?",
+            (username, asset_type, symbol, username, asset_type),
+        )
+        return cursor.rowcount > 0
+
+    def add_symbol(self, username, asset_type, symbol):
+        """관심 종목 추가 - 이미 있으면 False"""
+        with self._transaction() as conn:
+            return self._add_symbol(conn, username, asset_type, symbol)
+
+    def remove_symbol(self, username, asset_type, symbol):
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM watchlist WHERE username = ? AND asset_type = ? AND symbol = ?",
+                (username, asset_type, symbol),
+            )
+
+    @staticmethod
+    def _set_holding(conn, username, symbol, shares, buy_price):
+        conn.execute(
+            "INSERT INTO holdings (username, symbol, shares, buy_price) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(username, symbol) DO UPDATE SET shares = excluded.shares, buy_price = excluded.buy_price",
+            (username, symbol, float(shares), float(buy_price)),
+        )
+
+    def set_holding(self, username, symbol, shares, buy_price):
+        """보유 종목 저장 (있으면 수량/매수가 갱신)"""
+        with self._transaction() as conn:
+            self._set_holding(conn, username, symbol, shares, buy_price)
+
+    def remove_holding(self, username, symbol):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM holdings WHERE username = ? AND symbol = ?", (username, symbol))
+
+    def set_show_heatmap(self, username, show):
+        with self._transaction() as conn:
+            conn.execute("UPDATE users SET show_heatmap = ? WHERE username = ?", (int(bool(show)), username))
+
+    def add_alert_rule(self, username, kind, value=None, symbol=None, cooldown=ALERT_COOLDOWN):
+        """알림 규칙 추가 - 규칙 id 반환"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO alert_rules (username, symbol, kind, value, cooldown, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (username, symbol, kind, value, int(cooldown), datetime.now().isoformat()),
+            )
+            return cursor.lastrowid
+
+    def remove_alert_rule(self, username, rule_id):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM alert_rules WHERE id = ? AND username = ?", (rule_id, username))
+
+    def enqueue_alerts(self, alerts, now):
+        """발생한 알림을 outbox 에 넣음 - ``(넣은 수, 쿨다운으로 건너뛴 수)``
+
+        ``alerts`` 는 ``(rule_id, username, symbol, message, bar_time, cooldown)`` 목록이며,
+        같은 규칙/종목/바는 한 번만 들어가고 마지막 알림 후 ``cooldown`` 초 안에는 건너뜀
+        """
+        queued = suppressed = 0
+        with self._transaction() as conn:
+            for rule_id, username, symbol, message, bar_time, cooldown in alerts:
+                last = conn.execute(
+                    "SELECT MAX(created_at) FROM alert_outbox WHERE rule_id = ? AND symbol = ?", (rule_id, symbol)
+                ).fetchone()[0]
+                if last is not None and now - last < cooldown:
+                    suppressed += 1
+                    continue
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO alert_outbox (rule_id, username, symbol, message, bar_time, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (rule_id, username, symbol, message, bar_time, now),
+                )
+                queued += cursor.rowcount
+        return queued, suppressed
+
+    def mark_alerts_delivered(self, username, ids=None, now=None):
+        """알림 확인 처리 (``ids`` 가 없으면 전체)"""
+        now = now if now is not None else datetime.now().timestamp()
+        with self._transaction() as conn:
+            if ids is None:
+                conn.execute("UPDATE alert_outbox SET delivered_at = ? WHERE username = ? AND delivered_at IS NULL",
+                             (now, username))
+            else:
+                conn.executemany("UPDATE alert_outbox SET delivered_at = ? WHERE username = ? AND id = ?",
+                                 [(now, username, i) for i in ids])
+
+    # 이전 데이터 이관
+    def migrate(self, json_path=LEGACY_USER_DATA_FILE, csv_path=LEGACY_USERS_CSV):
+        """처음 한 번만 user_data.json 과 users.csv 를 가져옴 (JSON 이 없으면 기본 관리자 생성)
+
+        가져오기와 완료 표시를 한 트랜잭션으로 묶어, 중간에 실패하면 아무것도 남지 않고
+        다음 실행에서 다시 시도합니다.
+        """
+        with self._transaction() as conn:
+            done = conn.execute("SELECT value FROM meta WHERE key = 'migrated'").fetchone()
+            if done is not None:
+                return 0
+            imported = self._import_json(conn, json_path) + self._import_users_csv(conn, csv_path)
+            if not os.path.exists(json_path):
+                # 기존 load_user_data 와 같이 새 설치에는 데모 관리자 계정 생성
+                self._create_user(conn, ADMIN_USERNAME, hash_password("admin123"), is_admin=True,
+                                  portfolios=DEFAULT_ADMIN_PORTFOLIOS)
+            conn.execute("INSERT INTO meta (key, value) VALUES ('migrated', ?)", (datetime.now().isoformat(),))
+        return imported
+
+    def import_json(self, path):
+        """기존 user_data.json 가져오기 - 가져온 사용자 수 반환"""
+        with self._transaction() as conn:
+            return self._import_json(conn, path)
+
+    def _import_json(self, conn, path):
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        imported = 0
+        for username, record in data.items():
+            imported += self._create_user(
+                conn,
+                username,
+                record["password"],
+                is_admin=record.get("is_admin", False),
+                created_at=record.get("created_at"),
+                portfolios=record.get("portfolios", {}),
+                portfolio=record.get("portfolio", {}),
+            )
+        return imported
+
+    def import_users_csv(self, path):
+        """users.csv (이메일 로그인, bcrypt 해시) 가져오기 - 가져온 사용자 수 반환"""
+        with self._transaction() as conn:
+            return self._import_users_csv(conn, path)
+
+    def _import_users_csv(self, conn, path):
+        if not os.path.exists(path):
+            return 0
+        imported = 0
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                imported += self._create_user(
+                    conn,
+                    row["email"],
+                    row["password_hash"],
+                    is_admin=row.get("is_admin", "").strip().lower() == "true",
+                    email=row["email"],
+                    show_heatmap=row.get("show_heatmap", "").strip().lower() == "true",
+                )
+        return imported
+
+
+class _Transaction:
+    """``BEGIN IMMEDIATE`` ... ``COMMIT`` - 예외가 나면 롤백"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.execute("COMMIT")
+        else:
+            self.conn.execute("ROLLBACK")
+        return False